@@ -32,6 +32,7 @@ import os
 from langchain_groq import ChatGroq
 from mongo.constants import DATABASE_NAME, mongodb_tools
 from mongo.conversations import save_assistant_message, save_action_event
+from mongo.request_context import request_context
 from agent.callback_handler import AgentCallbackHandler
 
 
@@ -377,8 +378,20 @@ class AgentExecutor:
         pass
 
 
-    async def run_streaming(self, query: str, websocket=None, conversation_id: Optional[str] = None) -> AsyncGenerator[str, None]:
-        """Run the agent with streaming support and conversation context"""
+    async def run_streaming(
+        self,
+        query: str,
+        websocket=None,
+        conversation_id: Optional[str] = None,
+        member_id: Optional[str] = None,
+        business_id: Optional[str] = None,
+    ) -> AsyncGenerator[str, None]:
+        """Run the agent with streaming support and conversation context.
+
+        ``member_id``/``business_id`` scope every tool, retriever and Mongo
+        query of this run via the request context; when omitted the caller's
+        current context applies.
+        """
         if not self.connected:
             await self.connect()
 
@@ -397,7 +410,7 @@ class AgentExecutor:
             else:
                 span_cm = None
 
-            with (span_cm if span_cm is not None else contextlib.nullcontext()):
+            with (span_cm if span_cm is not None else contextlib.nullcontext()), request_context(member_id, business_id):
                 # Use default conversation ID if none provided
                 if not conversation_id:
                     conversation_id = f"conv_{int(time.time())}"
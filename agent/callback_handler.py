@@ -30,6 +30,7 @@ import os
 from langchain_groq import ChatGroq
 from mongo.constants import DATABASE_NAME, mongodb_tools
 from mongo.conversations import save_assistant_message, save_action_event
+from agent.token_stream import TokenCoalescer, get_token_stream_options
 
 
 def _generate_natural_action_text(tool_name: str, tool_args: Dict[str, Any]) -> str:
@@ -206,6 +207,8 @@ class AgentCallbackHandler(AsyncCallbackHandler):
         self._step_counter = 0
         # Whether a dynamic, high-level action statement was already emitted for this step
         self._dynamic_action_emitted = False
+        # Batches token frames when the client negotiated it in the handshake
+        self._tokens = TokenCoalescer(websocket.send_json, get_token_stream_options(websocket)) if websocket else None
 
     def _safe_extract(self, input_str: str) -> dict:
         """Best-effort parse of tool arg string to a dict without raising.
@@ -231,7 +234,7 @@ class AgentCallbackHandler(AsyncCallbackHandler):
 
     async def _emit_action(self, text: str) -> None:
         if not self.websocket:
-            # Still log action to DB if possible
+            # Still log action to DB if possible (buffered; flushed after the turn)
             try:
                 if self.conversation_id:
                     await save_action_event(self.conversation_id, "action", text, step=self._step_counter + 1)
@@ -239,6 +242,7 @@ class AgentCallbackHandler(AsyncCallbackHandler):
                 pass
             return
         self._step_counter += 1
+        await self._tokens.flush()
         payload = {
             "type": "agent_action",
             "text": text,
@@ -262,6 +266,8 @@ class AgentCallbackHandler(AsyncCallbackHandler):
         # Reset dynamic action emission flag at the beginning of a reasoning step
         self._dynamic_action_emitted = False
         if self.websocket:
+            await self._tokens.flush()
+            self._tokens.reset()
             await self.websocket.send_json({
                 "type": "llm_start",
                 "timestamp": datetime.now().isoformat()
@@ -270,16 +276,13 @@ class AgentCallbackHandler(AsyncCallbackHandler):
     async def on_llm_new_token(self, token: str, **kwargs):
         """Stream each token as it's generated"""
         if self.websocket:
-            await self.websocket.send_json({
-                "type": "token",
-                "content": token,
-                "timestamp": datetime.now().isoformat()
-            })
+            await self._tokens.add(token)
 
     async def on_llm_end(self, *args, **kwargs):
         """Called when LLM finishes generating"""
         elapsed_time = time.time() - self.start_time if self.start_time else 0
         if self.websocket:
+            await self._tokens.close()
             await self.websocket.send_json({
                 "type": "llm_end",
                 "elapsed_time": elapsed_time,
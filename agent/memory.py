@@ -459,24 +459,19 @@ class RedisConversationMemory:
         mongo_start_time = perf_counter()
         try:
             # Import here to avoid circular dependency
-            from mongo.conversations import conversation_mongo_client, CONVERSATIONS_DB_NAME, CONVERSATIONS_COLLECTION_NAME
+            from mongo.conversations import get_messages_page
             
-            # ✅ OPTIMIZED: Use projection with $slice to fetch only recent messages
+            # ✅ OPTIMIZED: Read only the tail bucket(s) of the conversation
             # Estimate: ~100 tokens per message, so fetch last N messages where N = max_tokens / 100
             estimated_messages = max(10, min(50, max_tokens // 100))
             
-            coll = await conversation_mongo_client.get_collection(CONVERSATIONS_DB_NAME, CONVERSATIONS_COLLECTION_NAME)
-            # Use projection to fetch only the last N messages
-            doc = await coll.find_one(
-                {"conversationId": conversation_id},
-                {"messages": {"$slice": -estimated_messages}}  # Only fetch last N messages
-            )
+            page = await get_messages_page(conversation_id, limit=estimated_messages)
             db_elapsed_ms = (perf_counter() - mongo_start_time) * 1000
-            if not doc:
-                print(f"_load_recent_from_mongodb (find_one) miss in {db_elapsed_ms:.2f} ms")
+            if not page:
+                print(f"_load_recent_from_mongodb (tail bucket) miss in {db_elapsed_ms:.2f} ms")
                 return []
             
-            messages = doc.get("messages") or []
+            messages = page.get("messages") or []
             if not messages:
                 return []
             
@@ -527,7 +522,7 @@ class RedisConversationMemory:
             if recent_messages:
                 asyncio.create_task(self._cache_messages_background(conversation_id, recent_messages))
             total_elapsed_ms = (perf_counter() - mongo_start_time) * 1000
-            print(f"_load_recent_from_mongodb (find_one + process) took {total_elapsed_ms:.2f} ms. Found {len(recent_messages)} messages.")
+            print(f"_load_recent_from_mongodb (tail bucket + process) took {total_elapsed_ms:.2f} ms. Found {len(recent_messages)} messages.")
             return recent_messages
             
         except Exception as e:
@@ -638,16 +633,10 @@ class RedisConversationMemory:
         mongo_start_time = perf_counter()
         try:
             # Import here to avoid circular dependency
-            from mongo.conversations import conversation_mongo_client, CONVERSATIONS_DB_NAME, CONVERSATIONS_COLLECTION_NAME
-            
-            # Fetch conversation from MongoDB
-            coll = await conversation_mongo_client.get_collection(CONVERSATIONS_DB_NAME, CONVERSATIONS_COLLECTION_NAME)
-            doc = await coll.find_one({"conversationId": conversation_id})
-            
-            if not doc:
-                return False
+            from mongo.conversations import get_all_messages
             
-            messages = doc.get("messages") or []
+            # Fetch conversation history (header + buckets) from MongoDB
+            messages = await get_all_messages(conversation_id)
             if not messages:
                 return False
             
@@ -670,7 +659,7 @@ class RedisConversationMemory:
                     continue
                 lc_messages.append(lc_message)
             total_elapsed_ms = (perf_counter() - mongo_start_time) * 1000
-            print(f"load_conversation_from_mongodb (find_one + process) took {total_elapsed_ms:.2f} ms. Found {len(lc_messages)} messages.")
+            print(f"load_conversation_from_mongodb (buckets + process) took {total_elapsed_ms:.2f} ms. Found {len(lc_messages)} messages.")
             if not lc_messages:
                 return False
 
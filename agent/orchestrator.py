@@ -13,6 +13,7 @@ import hashlib
 import json
 import logging
 import time
+from collections import OrderedDict
 from time import perf_counter
 from dataclasses import dataclass, field
 from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
@@ -44,6 +45,7 @@ class StepSpec:
     - retries: number of retries on failure
     - retry_backoff_s: base backoff for exponential backoff with jitter
     - cache_key: optional static cache key; if not provided, derived from inputs
+    - cacheable: set False for steps whose result must not be reused (e.g. live queries)
     - validator: optional callable(result, context) -> bool to gate downstream steps
     - parallel_group: identifier to group steps that can run in parallel together
     """
@@ -56,6 +58,7 @@ class StepSpec:
     retries: int = 0
     retry_backoff_s: float = 0.5
     cache_key: Optional[str] = None
+    cacheable: bool = True
     validator: Optional[Callable[[Any, Dict[str, Any]], bool]] = None
     parallel_group: Optional[str] = None
 
@@ -67,16 +70,44 @@ class Orchestrator:
     - Runs independent steps in parallel per tick using parallel_group labels
     - Enforces requires/provides contracts via a shared context dict
     - Retries with exponential backoff and optional timeouts
-    - Simple in-memory caching keyed by inputs
+    - Bounded in-memory LRU caching keyed by inputs, with a TTL
     - OpenTelemetry tracing per step
     """
 
-    def __init__(self, tracer_name: str = __name__, max_parallel: int = 5):
+    def __init__(
+        self,
+        tracer_name: str = __name__,
+        max_parallel: int = 5,
+        cache_size: Optional[int] = None,
+        cache_ttl_s: Optional[float] = None,
+    ):
         self.tracer = None
         self.max_parallel = max_parallel
-        self._cache: Dict[str, Any] = {}
+        self.cache_size = cache_size or int(os.getenv("ORCHESTRATOR_CACHE_SIZE", "512"))
+        self.cache_ttl_s = cache_ttl_s or float(os.getenv("ORCHESTRATOR_CACHE_TTL_SECONDS", "300"))
+        # key -> (stored_at, result), oldest first
+        self._cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def _cache_get(self, key: str) -> Tuple[bool, Any]:
+        record = self._cache.get(key)
+        if record is None:
+            return False, None
+        stored_at, value = record
+        if time.monotonic() - stored_at > self.cache_ttl_s:
+            self._cache.pop(key, None)
+            return False, None
+        self._cache.move_to_end(key)
+        return True, value
+
+    def _cache_set(self, key: str, value: Any) -> None:
+        self._cache[key] = (time.monotonic(), value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
 
     def _make_cache_key(self, step: StepSpec, context: Dict[str, Any]) -> Optional[str]:
+        if not step.cacheable:
+            return None
         if step.cache_key:
             return step.cache_key
         if not step.requires:
@@ -86,8 +117,10 @@ class Orchestrator:
 
     async def _execute_one(self, step: StepSpec, context: Dict[str, Any], correlation_id: Optional[str]) -> Tuple[str, Any, Optional[Exception]]:
         cache_key = self._make_cache_key(step, context)
-        if cache_key and cache_key in self._cache:
-            return step.name, self._cache[cache_key], None
+        if cache_key:
+            hit, cached = self._cache_get(cache_key)
+            if hit:
+                return step.name, cached, None
 
         attempt = 0
         last_exc: Optional[Exception] = None
@@ -109,7 +142,7 @@ class Orchestrator:
                         raise RuntimeError(f"Validation failed for step '{step.name}'")
 
                 if cache_key:
-                    self._cache[cache_key] = result
+                    self._cache_set(cache_key, result)
                 # duration and preview kept for potential future logging (no-op here)
                 _ = int((time.time() - start) * 1000)
                 try:
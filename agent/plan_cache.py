@@ -0,0 +1,260 @@
+"""
+Caches for the Mongo query planner.
+
+1. PlanCache: normalized query + business scope -> parsed QueryIntent (and the
+   generated pipeline when it has no time-relative values), so repeated
+   questions skip the Groq intent-parsing round-trip.
+2. ResultCache (opt-in, PLANNER_RESULT_CACHE=true): short-TTL cache of query
+   results. Keys embed per-collection version counters that the data-sync
+   consumer bumps in Redis (``mongo:collection_version:{collection}``) for
+   every change event it receives. Only collections the Mongo source
+   connector streams (STREAMED_COLLECTIONS) ever get bumped, so pipelines
+   reading any other collection (e.g. a ``$lookup`` into ``projectState``)
+   bypass the cache instead of serving results no write would invalidate.
+"""
+
+from cachetools import TTLCache
+from datetime import datetime
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+import copy
+import hashlib
+import logging
+import os
+import re
+
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Shared with data-sync/consumer/app/main.py, which INCRs these on change events
+COLLECTION_VERSION_PREFIX = "mongo:collection_version:"
+
+# Collections streamed by data-sync/connectors/setup-connectors.sh; keep the two in sync
+STREAMED_COLLECTIONS = frozenset({
+    "page",
+    "workItem",
+    "project",
+    "cycle",
+    "module",
+    "epic",
+    "features",
+    "userStory",
+    "members",
+})
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCT_RE = re.compile(r"[\s?.!,;:]+$")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    text = _WHITESPACE_RE.sub(" ", (query or "").strip().lower())
+    return _TRAILING_PUNCT_RE.sub("", text)
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def _has_datetime(value: Any) -> bool:
+    if isinstance(value, datetime):
+        return True
+    if isinstance(value, dict):
+        return any(_has_datetime(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_datetime(v) for v in value)
+    return False
+
+
+def pipeline_collections(collection: str, pipeline: List[Dict[str, Any]]) -> Set[str]:
+    """Collections a pipeline reads: the primary plus every $lookup/$graphLookup/$unionWith source."""
+    found: Set[str] = {collection}
+
+    def _walk(node: Any) -> None:
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key in ("$lookup", "$graphLookup") and isinstance(value, dict) and value.get("from"):
+                    found.add(value["from"])
+                elif key == "$unionWith":
+                    found.add(value if isinstance(value, str) else value.get("coll", ""))
+                _walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                _walk(item)
+
+    _walk(pipeline)
+    found.discard("")
+    return found
+
+
+class PlanCache:
+    """Bounded TTL cache of parsed intents (and reusable pipelines) per query and business."""
+
+    def __init__(self, maxsize: Optional[int] = None, ttl_seconds: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds or int(os.getenv("PLANNER_CACHE_TTL_SECONDS", "1800"))
+        self.cache: TTLCache[str, Dict[str, Any]] = TTLCache(
+            maxsize=maxsize or int(os.getenv("PLANNER_CACHE_SIZE", "512")),
+            ttl=self.ttl_seconds,
+        )
+        self.lock = Lock()
+        self.enabled = os.getenv("PLANNER_CACHE", "true").lower() in {"1", "true", "yes"}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(query: str, business_scope: Optional[str]) -> str:
+        return _digest(normalize_query(query), business_scope or "")
+
+    def get(self, query: str, business_scope: Optional[str]) -> Optional[Tuple[Any, Optional[List[Dict[str, Any]]]]]:
+        """Return ``(intent, pipeline_or_None)`` copies; pipeline is None when it must be regenerated."""
+        if not self.enabled:
+            return None
+        with self.lock:
+            entry = self.cache.get(self._key(query, business_scope))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        pipeline = copy.deepcopy(entry["pipeline"]) if entry["pipeline"] is not None else None
+        return copy.deepcopy(entry["intent"]), pipeline
+
+    def set(self, query: str, business_scope: Optional[str], intent: Any, pipeline: List[Dict[str, Any]]) -> None:
+        if not self.enabled or intent is None:
+            return
+        # Relative date filters ("this week") are resolved to absolute datetimes at generation
+        # time; keep only the intent for those so the window is recomputed on reuse
+        reusable = None if _has_datetime(pipeline) else copy.deepcopy(pipeline)
+        with self.lock:
+            self.cache[self._key(query, business_scope)] = {"intent": copy.deepcopy(intent), "pipeline": reusable}
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        with self.lock:
+            size = len(self.cache)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "size": size,
+            "maxsize": self.cache.maxsize,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+class ResultCache:
+    """Short-TTL in-process result cache, versioned by Redis collection counters."""
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        redis_url: Optional[str] = None,
+        enabled: Optional[bool] = None,
+    ):
+        if enabled is None:
+            enabled = os.getenv("PLANNER_RESULT_CACHE", "false").lower() in {"1", "true", "yes"}
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds or int(os.getenv("PLANNER_RESULT_CACHE_TTL_SECONDS", "30"))
+        self.cache: TTLCache[str, Any] = TTLCache(
+            maxsize=maxsize or int(os.getenv("PLANNER_RESULT_CACHE_SIZE", "256")),
+            ttl=self.ttl_seconds,
+        )
+        self.lock = Lock()
+        self.redis_url = redis_url or os.getenv("REDIS_URL") or "redis://redis:6379/0"
+        self.redis_client: Optional[aioredis.Redis] = None
+        self._connection_lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    async def _ensure_redis(self) -> Optional[aioredis.Redis]:
+        if not self.enabled:
+            return None
+        if self.redis_client is not None:
+            return self.redis_client
+        async with self._connection_lock:
+            if self.redis_client is not None or not self.enabled:
+                return self.redis_client
+            try:
+                client = aioredis.from_url(
+                    self.redis_url,
+                    encoding="utf-8",
+                    decode_responses=True,
+                    socket_connect_timeout=2,
+                    socket_timeout=1,
+                )
+                await client.ping()
+                self.redis_client = client
+            except Exception as e:
+                # Without version counters nothing would invalidate entries; stay off
+                logger.error(f"Planner result cache disabled, Redis unavailable: {e}")
+                self.enabled = False
+        return self.redis_client
+
+    async def make_key(self, query: str, scope: Iterable[str], collections: Iterable[str]) -> Optional[str]:
+        """Key for the current data version of ``collections``.
+
+        None when the cache is off or a collection has no version counter, which
+        makes get/set no-ops for this query.
+        """
+        names = sorted(set(collections))
+        unversioned = [name for name in names if name not in STREAMED_COLLECTIONS]
+        if unversioned:
+            logger.debug(f"Planner result cache bypassed, unstreamed collections: {unversioned}")
+            return None
+        client = await self._ensure_redis()
+        if client is None:
+            return None
+        try:
+            versions = await client.mget([f"{COLLECTION_VERSION_PREFIX}{name}" for name in names])
+        except RedisError as e:
+            logger.warning(f"Planner result cache version read failed: {e}")
+            return None
+        version_tag = ",".join(f"{name}={version or 0}" for name, version in zip(names, versions))
+        return _digest(normalize_query(query), *[s or "" for s in scope], version_tag)
+
+    def get(self, key: Optional[str]) -> Optional[Any]:
+        if key is None:
+            return None
+        with self.lock:
+            value = self.cache.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return copy.deepcopy(value)
+
+    def set(self, key: Optional[str], value: Any) -> None:
+        if key is None or value is None:
+            return
+        with self.lock:
+            self.cache[key] = copy.deepcopy(value)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        with self.lock:
+            size = len(self.cache)
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "size": size,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+    async def close(self) -> None:
+        if self.redis_client is not None:
+            try:
+                await self.redis_client.close()
+            except Exception:
+                pass
+            self.redis_client = None
+
+
+# Process-wide instances used by agent.planner.Planner
+plan_cache = PlanCache()
+result_cache = ResultCache()
@@ -5,6 +5,7 @@ Handles natural language queries and generates optimal MongoDB aggregation pipel
 based on the relationship registry
 """
 
+import copy
 import json
 import re
 from time import perf_counter
@@ -25,8 +26,16 @@ load_dotenv()
 # Configure logging
 logger = logging.getLogger(__name__)
 
-from mongo.constants import mongodb_tools, DATABASE_NAME
+from mongo.constants import (
+    mongodb_tools,
+    DATABASE_NAME,
+    PIPELINE_OPTIMIZER_ENABLED,
+    PIPELINE_OPTIMIZER_DEBUG,
+    BUSINESS_UUID,
+    MEMBER_UUID,
+)
 from agent.orchestrator import Orchestrator, StepSpec, as_async
+from agent.plan_cache import plan_cache, result_cache, pipeline_collections
 
 
 from dotenv import load_dotenv
@@ -158,6 +167,10 @@ class Planner:
         """Plan and execute a natural language query using the Orchestrator."""
         planner_start_time = perf_counter()
         try:
+            business_scope = BUSINESS_UUID()
+            # Repeated questions reuse the parsed intent (and pipeline) instead of calling the LLM
+            cached_plan = plan_cache.get(query, business_scope)
+
             # Define step coroutines as closures to capture self
             async def _ensure_connection(ctx: Dict[str, Any]) -> bool:
                 await mongodb_tools.connect()
@@ -170,17 +183,34 @@ class Planner:
                 return result is not None
 
             def _generate_pipeline(ctx: Dict[str, Any]) -> List[Dict[str, Any]]:
-                return self.generator.generate_pipeline(ctx["intent"])  # type: ignore[index]
+                # Generate from a copy: the generator adjusts intent fields, the cache keeps the parse
+                return self.generator.generate_pipeline(copy.deepcopy(ctx["intent"]))  # type: ignore[index]
 
             async def _execute(ctx: Dict[str, Any]) -> Any:
                 intent: QueryIntent = ctx["intent"]  # type: ignore[assignment]
+                collections = pipeline_collections(intent.primary_entity, ctx["pipeline"])
+                # Results are RBAC-scoped; membership changes must invalidate them too.
+                # Pipelines touching collections without a version counter are not cached
+                collections.add("members")
+                result_key = await result_cache.make_key(
+                    ctx["query"], (business_scope or "", MEMBER_UUID() or ""), collections
+                )
+                cached_result = result_cache.get(result_key)
+                if cached_result is not None:
+                    return cached_result
+
                 args = {
                     "database": DATABASE_NAME,
                     "collection": intent.primary_entity,
                     "pipeline": ctx["pipeline"],
+                    # Rewrites run after RBAC injection so scoping stages get merged too
+                    "optimize": PIPELINE_OPTIMIZER_ENABLED,
                 }
-                return await mongodb_tools.execute_tool("aggregate", args)
+                result = await mongodb_tools.execute_tool("aggregate", args)
+                result_cache.set(result_key, result)
+                return result
 
+            initial_context: Dict[str, Any] = {"query": query}
             steps: List[StepSpec] = [
                 StepSpec(
                     name="ensure_connection",
@@ -190,44 +220,64 @@ class Planner:
                     retries=2,
                     timeout_s=8.0,
                 ),
-                StepSpec(
-                    name="parse_intent",
-                    coroutine=as_async(_parse_intent),
-                    requires=("query",),
-                    provides="intent",
-                    timeout_s=15.0,
-                    retries=1,
-                    validator=_parse_validator,
-                ),
-                StepSpec(
-                    name="generate_pipeline",
-                    coroutine=as_async(_generate_pipeline),
-                    requires=("intent",),
-                    provides="pipeline",
-                    timeout_s=5.0,
-                ),
+            ]
+            if cached_plan is not None:
+                initial_context["intent"] = cached_plan[0]
+            else:
+                steps.append(
+                    StepSpec(
+                        name="parse_intent",
+                        coroutine=as_async(_parse_intent),
+                        requires=("query",),
+                        provides="intent",
+                        timeout_s=15.0,
+                        retries=1,
+                        validator=_parse_validator,
+                        # Scoped caching is handled by plan_cache
+                        cacheable=False,
+                    )
+                )
+            if cached_plan is not None and cached_plan[1] is not None:
+                initial_context["pipeline"] = cached_plan[1]
+            else:
+                steps.append(
+                    StepSpec(
+                        name="generate_pipeline",
+                        coroutine=as_async(_generate_pipeline),
+                        requires=("intent",),
+                        provides="pipeline",
+                        timeout_s=5.0,
+                        cacheable=False,
+                    )
+                )
+            steps.append(
                 StepSpec(
                     name="execute_query",
                     coroutine=as_async(_execute),
-                    requires=("intent", "pipeline"),
+                    requires=("intent", "pipeline", "connected"),
                     provides="result",
                     timeout_s=20.0,
                     retries=1,
-                ),
-            ]
+                    # Live data: only the versioned result_cache may reuse results
+                    cacheable=False,
+                )
+            )
 
             ctx = await self.orchestrator.run(
                 steps,
-                initial_context={"query": query},
+                initial_context=initial_context,
                 correlation_id=f"planner_{hash(query) & 0xFFFFFFFF:x}",
             )
 
             intent: QueryIntent = ctx["intent"]  # type: ignore[assignment]
             pipeline: List[Dict[str, Any]] = ctx["pipeline"]  # type: ignore[assignment]
             result = ctx.get("result")
+            if cached_plan is None:
+                plan_cache.set(query, business_scope, intent, pipeline)
             elapsed_ms = (perf_counter() - planner_start_time) * 1000
-            print(f"Planner.plan_and_execute for '{query[:50]}...' took {elapsed_ms:.2f} ms")
-            return {
+            cache_note = " (cached plan)" if cached_plan is not None else ""
+            print(f"Planner.plan_and_execute for '{query[:50]}...' took {elapsed_ms:.2f} ms{cache_note}")
+            response = {
                 "success": True,
                 "intent": intent.__dict__,
                 "pipeline": _serialize_pipeline_for_json(pipeline),
@@ -235,6 +285,14 @@ class Planner:
                 "result": result,
                 "planner": "llm",
             }
+            if PIPELINE_OPTIMIZER_DEBUG:
+                try:
+                    report = await mongodb_tools.explain_optimization(DATABASE_NAME, intent.primary_entity, pipeline)
+                    print(f"Pipeline optimizer for '{query[:50]}...': {report}")
+                    response["optimizer"] = report
+                except Exception as e:
+                    logger.warning(f"Pipeline optimizer explain failed: {e}")
+            return response
         except Exception as e:
             elapsed_ms = (perf_counter() - planner_start_time) * 1000
             print(f"Planner.plan_and_execute for '{query[:50]}...' failed in {elapsed_ms:.2f} ms: {e}")
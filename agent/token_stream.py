@@ -0,0 +1,155 @@
+"""
+Token coalescing for the chat WebSocket.
+
+Sending one JSON frame per LLM token costs a serialization, a timestamp and a
+frame write per token. Clients that opt in during the handshake
+(``"token_coalescing": true`` or an options object) instead receive ``token``
+frames carrying several tokens, flushed after ``max_chars`` characters,
+``max_delay_ms`` milliseconds or a sentence boundary, whichever comes first.
+The first token of every LLM call is still sent on its own so
+time-to-first-token does not change. Frames keep the ``token`` shape, so
+clients that append ``content`` need no other change.
+"""
+
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import contextlib
+import logging
+import os
+import re
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+TOKEN_COALESCE_MAX_CHARS = int(os.getenv("TOKEN_COALESCE_MAX_CHARS", "64"))
+TOKEN_COALESCE_MAX_DELAY_MS = int(os.getenv("TOKEN_COALESCE_MAX_DELAY_MS", "40"))
+TOKEN_COALESCE_SENTENCE = os.getenv("TOKEN_COALESCE_SENTENCE", "true").lower() in {"1", "true", "yes"}
+
+# Bounds applied to client-requested values
+_MAX_CHARS_RANGE = (1, 1024)
+_MAX_DELAY_RANGE_MS = (1, 500)
+
+# Sentence end (optionally followed by a closing quote/bracket) or a newline, at the end of the buffer
+_SENTENCE_END_RE = re.compile(r"(?:[.!?]['\")\]]?\s*|\n)$")
+
+
+def _clamp(value: Any, default: int, bounds: tuple) -> int:
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(bounds[0], min(bounds[1], number))
+
+
+def negotiate_token_coalescing(requested: Any) -> Optional[Dict[str, Any]]:
+    """Resolve the handshake's ``token_coalescing`` field into stream options.
+
+    ``True`` selects the server defaults; a dict may override ``max_chars``,
+    ``max_delay_ms`` and ``sentence_boundary`` (numeric values are clamped).
+    Anything else disables coalescing and returns None.
+    """
+    if requested is True:
+        requested = {}
+    if not isinstance(requested, dict):
+        return None
+    sentence = requested.get("sentence_boundary", TOKEN_COALESCE_SENTENCE)
+    return {
+        "max_chars": _clamp(requested.get("max_chars"), TOKEN_COALESCE_MAX_CHARS, _MAX_CHARS_RANGE),
+        "max_delay_ms": _clamp(requested.get("max_delay_ms"), TOKEN_COALESCE_MAX_DELAY_MS, _MAX_DELAY_RANGE_MS),
+        "sentence_boundary": bool(sentence),
+    }
+
+
+def get_token_stream_options(websocket: Any) -> Optional[Dict[str, Any]]:
+    """Options negotiated on this socket's handshake, or None for per-token frames."""
+    state = getattr(websocket, "state", None)
+    return getattr(state, "token_coalescing", None) if state is not None else None
+
+
+def set_token_stream_options(websocket: Any, options: Optional[Dict[str, Any]]) -> None:
+    state = getattr(websocket, "state", None)
+    if state is not None:
+        state.token_coalescing = options
+
+
+class TokenCoalescer:
+    """Buffers streamed tokens and sends them as combined ``token`` frames.
+
+    Without options every token is sent immediately, exactly as before.
+    Callers must ``flush()`` before sending any other frame so ordering is
+    preserved, and ``reset()`` when a new LLM call starts.
+    """
+
+    def __init__(self, send_json: Callable[[Dict[str, Any]], Awaitable[None]], options: Optional[Dict[str, Any]] = None):
+        self._send_json = send_json
+        self.enabled = options is not None
+        options = options or {}
+        self.max_chars = options.get("max_chars", TOKEN_COALESCE_MAX_CHARS)
+        self.max_delay = options.get("max_delay_ms", TOKEN_COALESCE_MAX_DELAY_MS) / 1000.0
+        self.sentence_boundary = options.get("sentence_boundary", TOKEN_COALESCE_SENTENCE)
+        self._parts: List[str] = []
+        self._chars = 0
+        self._first_sent = False
+        self._timer: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.frames = 0
+        self.tokens = 0
+
+    def reset(self) -> None:
+        """Start a new stream: the next token goes out on its own again."""
+        self._first_sent = False
+
+    async def add(self, token: str) -> None:
+        if not token:
+            return
+        self.tokens += 1
+        if not self.enabled or not self._first_sent:
+            self._first_sent = True
+            async with self._lock:
+                await self._send(token)
+            return
+
+        self._parts.append(token)
+        self._chars += len(token)
+        if self._chars >= self.max_chars or (self.sentence_boundary and _SENTENCE_END_RE.search(token)):
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def flush(self) -> None:
+        timer, self._timer = self._timer, None
+        if timer is not None and timer is not asyncio.current_task():
+            timer.cancel()
+        async with self._lock:
+            if not self._parts:
+                return
+            content = "".join(self._parts)
+            self._parts.clear()
+            self._chars = 0
+            await self._send(content)
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.max_delay)
+        try:
+            await self.flush()
+        except Exception as e:
+            # The socket may have closed between the token and the timer
+            logger.debug(f"Delayed token flush failed: {e}")
+
+    async def close(self) -> None:
+        """Send anything still buffered and stop the delay timer."""
+        timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await timer
+        await self.flush()
+
+    async def _send(self, content: str) -> None:
+        self.frames += 1
+        await self._send_json({
+            "type": "token",
+            "content": content,
+            "timestamp": datetime.now().isoformat()
+        })
@@ -1485,7 +1485,8 @@ async def rag_search(
             
             retriever = ChunkAwareRetriever(
                 qdrant_client=rag_tool.qdrant_client,
-                embedding_client=rag_tool.embedding_client
+                embedding_client=rag_tool.embedding_client,
+                splade_client=rag_tool.splade_client,
             )
             
             from mongo.constants import QDRANT_COLLECTION_NAME
@@ -11,6 +11,8 @@ import os
 import sys
 import time
 import logging
+from datetime import datetime, timedelta, timezone
+from itertools import islice
 from typing import Dict, Any, List, Optional
 
 import pymongo
@@ -19,6 +21,7 @@ from confluent_kafka import KafkaError, KafkaException
 
 # Import document normalization and point ID generation from consumer
 from qdrant.indexing_shared import normalize_document_ids, point_id_from_seed, normalize_mongo_id
+from qdrant.checkpoints import CheckpointStore, resume_query
 
 # Import Qdrant client to check for existing data
 try:
@@ -65,6 +68,12 @@ INCREMENTAL_BACKFILL = os.getenv("INCREMENTAL_BACKFILL", "true").lower() == "tru
 # Batch size for checking existing points in Qdrant
 QDRANT_CHECK_BATCH_SIZE = int(os.getenv("QDRANT_CHECK_BATCH_SIZE", "1000"))
 
+# Per-collection progress: the last _id acknowledged by Kafka while a run is in
+# progress, and the start time of the last completed run for updatedAt scans
+BACKFILL_CHECKPOINT_PATH = os.getenv("BACKFILL_CHECKPOINT_PATH", os.path.join(".checkpoints", "backfill.json"))
+# Overlap subtracted from the previous run's start to absorb clock skew between hosts
+BACKFILL_CHECKPOINT_SKEW_SECONDS = int(os.getenv("BACKFILL_CHECKPOINT_SKEW_SECONDS", "300"))
+
 
 class MongoDBBackfill:
     """Handles backfilling MongoDB data to Kafka."""
@@ -74,6 +83,9 @@ class MongoDBBackfill:
         self.kafka_producer = None
         self.database = None
         self.qdrant_client = None
+        self.checkpoints = CheckpointStore(BACKFILL_CHECKPOINT_PATH)
+        # Messages Kafka rejected since the last reset (counted by the delivery callback)
+        self.delivery_failures = 0
 
     def connect_mongodb(self) -> bool:
         """Connect to MongoDB."""
@@ -216,150 +228,162 @@ class MongoDBBackfill:
             "documentKey": {"_id": normalized_document["_id"]}
         }
 
-    def get_collection_count(self, collection_name: str) -> int:
-        """Get the total count of documents in a collection."""
+    def get_collection_count(self, collection_name: str, query: Optional[Dict[str, Any]] = None) -> int:
+        """Get the count of documents in a collection matching ``query``."""
         try:
             collection = self.database[collection_name]
-            return collection.count_documents({})
+            return collection.count_documents(query or {})
         except Exception as e:
             logger.error(f"Error getting count for {collection_name}: {e}")
             return 0
 
+    def on_delivery(self, err: Optional[KafkaError], msg: Any) -> None:
+        """Delivery report callback; runs inside poll()/flush()."""
+        if err is not None:
+            self.delivery_failures += 1
+            logger.error(f"Delivery failed for {msg.topic()} key {msg.key()}: {err}")
+
+    def send_change_event(self, topic_name: str, collection_name: str, document: Dict[str, Any]) -> None:
+        change_event = self.create_change_event(collection_name, document)
+        self.kafka_producer.produce(
+            topic=topic_name,
+            value=json.dumps(change_event),
+            key=str(document["_id"]),
+            on_delivery=self.on_delivery
+        )
+        self.kafka_producer.poll(0)
+
+    @staticmethod
+    def updated_since_query(since: datetime) -> Dict[str, Any]:
+        """Documents created or modified after ``since`` (collections use either timestamp field)."""
+        return {"$or": [{"updatedAt": {"$gt": since}}, {"updatedTimeStamp": {"$gt": since}}]}
+
     def backfill_collection(self, collection_name: str, dry_run: bool = False, incremental: bool = True) -> Dict[str, int]:
         """Backfill a single collection with smart incremental support.
-        
+
+        Documents are scanned in ``_id`` order and the last ``_id`` is checkpointed
+        after every batch Kafka has acknowledged, so an interrupted run resumes
+        where it stopped. Once a collection has completed a run, incremental runs
+        only send documents with ``updatedAt`` after that run started; before
+        that, missing documents are found by checking Qdrant batch by batch.
+
         Args:
             collection_name: Name of the MongoDB collection
             dry_run: If True, don't actually send to Kafka
-            incremental: If True, check Qdrant and only send missing documents
-            
+            incremental: If True, use checkpoints / Qdrant to skip unchanged documents
+
         Returns:
             Dictionary with statistics: processed, skipped, errors
         """
         collection = self.database[collection_name]
         topic_name = f"{KAFKA_TOPIC_PREFIX}{collection_name}"
+        run_started = datetime.now(timezone.utc)
+
+        checkpoint = self.checkpoints.get(collection_name) if incremental else {}
+        since = checkpoint.get("since")
+        if checkpoint.get("completed_at") is not None:
+            # Last run finished; only pick up what changed after it started
+            since = checkpoint["completed_at"]
+            last_id = None
+        else:
+            # Resume an interrupted run with the same bounds it started with
+            last_id = checkpoint.get("last_id")
+
+        query = self.updated_since_query(since) if since is not None else {}
+        check_qdrant = incremental and self.qdrant_client is not None and since is None
 
-        total_count = self.get_collection_count(collection_name)
+        total_count = self.get_collection_count(collection_name, resume_query(query, last_id))
 
         if total_count == 0:
             logger.info(f"No documents to process for collection {collection_name}")
+            if incremental and not dry_run:
+                self.checkpoints.save(collection_name, {"completed_at": run_started - timedelta(seconds=BACKFILL_CHECKPOINT_SKEW_SECONDS)})
             return {"processed": 0, "skipped": 0, "errors": 0}
 
-        logger.info(f"📊 Collection '{collection_name}' has {total_count} documents in MongoDB")
+        if since is not None:
+            logger.info(f"📊 Collection '{collection_name}' has {total_count} documents updated since {since}")
+        elif last_id is not None:
+            logger.info(f"📊 Collection '{collection_name}' has {total_count} documents left after checkpoint {last_id}")
+        else:
+            logger.info(f"📊 Collection '{collection_name}' has {total_count} documents in MongoDB")
 
         processed = 0
         skipped = 0
         errors = 0
+        stopped = False
 
         try:
-            # If incremental mode is enabled and Qdrant is available, check for existing points
-            if incremental and self.qdrant_client:
-                logger.info(f"🔍 Checking Qdrant for existing points from '{collection_name}'...")
-                
-                # Fetch all documents and generate their point IDs
-                cursor = collection.find({}, batch_size=BATCH_SIZE)
-                documents_to_process = []
-                
-                for document in cursor:
-                    point_id = self.generate_point_id_for_document(collection_name, document)
-                    if point_id:
-                        documents_to_process.append({
-                            "document": document,
-                            "point_id": point_id
-                        })
-                
-                logger.info(f"📝 Generated point IDs for {len(documents_to_process)} documents")
-                
-                # Check existing points in batches
-                all_point_ids = [item["point_id"] for item in documents_to_process]
-                existing_points = set()
-                
-                for i in range(0, len(all_point_ids), QDRANT_CHECK_BATCH_SIZE):
-                    batch_ids = all_point_ids[i:i + QDRANT_CHECK_BATCH_SIZE]
-                    batch_existing = self.check_points_exist(batch_ids)
-                    existing_points.update(batch_existing)
-                    
-                    if (i + QDRANT_CHECK_BATCH_SIZE) % (QDRANT_CHECK_BATCH_SIZE * 5) == 0:
-                        logger.info(f"  Checked {min(i + QDRANT_CHECK_BATCH_SIZE, len(all_point_ids))}/{len(all_point_ids)} points...")
-                
-                logger.info(f"✅ Found {len(existing_points)} existing points in Qdrant")
-                logger.info(f"📤 Will backfill {len(documents_to_process) - len(existing_points)} missing documents")
-                
-                # Process only documents that don't exist in Qdrant
-                for i, item in enumerate(documents_to_process):
-                    document = item["document"]
-                    point_id = item["point_id"]
-                    
-                    try:
-                        # Skip if already exists in Qdrant
-                        if point_id in existing_points:
-                            skipped += 1
-                            continue
-                        
-                        # Create change event for missing document
-                        change_event = self.create_change_event(collection_name, document)
-
-                        if not dry_run:
-                            # Send to Kafka
-                            try:
-                                self.kafka_producer.produce(
-                                    topic=topic_name,
-                                    value=json.dumps(change_event),
-                                    key=str(document["_id"])
-                                )
-                                self.kafka_producer.poll(0)
-                            except KafkaException as e:
-                                logger.error(f"Kafka error sending to {topic_name}: {e}")
-                                errors += 1
-                                continue
-                        
-                        processed += 1
-
-                        # Progress reporting
-                        if (i + 1) % BATCH_SIZE == 0:
-                            logger.info(f"  Progress: {processed} sent, {skipped} skipped, {errors} errors")
-                            time.sleep(SLEEP_BETWEEN_BATCHES)
-
-                    except Exception as e:
-                        errors += 1
-                        logger.error(f"Error processing document {document.get('_id', 'unknown')}: {e}")
-                        if errors > 10:
-                            logger.error("Too many errors, stopping collection processing")
-                            break
-            else:
-                # Non-incremental mode: process all documents
+            if check_qdrant:
+                logger.info(f"🔍 Checking Qdrant for existing points from '{collection_name}' batch by batch...")
+            elif not incremental:
                 logger.info(f"⚠️  Incremental mode disabled, processing all documents")
-                cursor = collection.find({}, batch_size=BATCH_SIZE)
 
-                for i, document in enumerate(cursor):
+            cursor = collection.find(resume_query(query, last_id), batch_size=BATCH_SIZE).sort("_id", 1)
+            while not stopped:
+                batch = list(islice(cursor, BATCH_SIZE))
+                if not batch:
+                    break
+
+                batch_errors = errors
+                self.delivery_failures = 0
+                existing_points = set()
+                point_ids: Dict[int, Optional[str]] = {}
+                if check_qdrant:
+                    point_ids = {i: self.generate_point_id_for_document(collection_name, document) for i, document in enumerate(batch)}
+                    all_point_ids = [point_id for point_id in point_ids.values() if point_id]
+                    for i in range(0, len(all_point_ids), QDRANT_CHECK_BATCH_SIZE):
+                        existing_points.update(self.check_points_exist(all_point_ids[i:i + QDRANT_CHECK_BATCH_SIZE]))
+
+                for i, document in enumerate(batch):
                     try:
-                        change_event = self.create_change_event(collection_name, document)
+                        if check_qdrant:
+                            point_id = point_ids.get(i)
+                            if not point_id:
+                                continue
+                            # Skip if already exists in Qdrant
+                            if point_id in existing_points:
+                                skipped += 1
+                                continue
 
                         if not dry_run:
                             try:
-                                self.kafka_producer.produce(
-                                    topic=topic_name,
-                                    value=json.dumps(change_event),
-                                    key=str(document["_id"])
-                                )
-                                self.kafka_producer.poll(0)
+                                self.send_change_event(topic_name, collection_name, document)
                             except KafkaException as e:
                                 logger.error(f"Kafka error sending to {topic_name}: {e}")
                                 errors += 1
                                 continue
                         processed += 1
 
-                        if (i + 1) % BATCH_SIZE == 0:
-                            logger.info(f"  Progress: {processed} processed, {errors} errors")
-                            time.sleep(SLEEP_BETWEEN_BATCHES)
-
                     except Exception as e:
                         errors += 1
                         logger.error(f"Error processing document {document.get('_id', 'unknown')}: {e}")
                         if errors > 10:
                             logger.error("Too many errors, stopping collection processing")
+                            stopped = True
                             break
 
+                if not dry_run and not stopped:
+                    # Only checkpoint a batch Kafka acknowledged in full: flush() returning 0 just
+                    # means nothing is queued, failed deliveries are reported to on_delivery
+                    remaining = self.kafka_producer.flush(30)
+                    failed = self.delivery_failures
+                    if remaining > 0 or failed > 0 or errors > batch_errors:
+                        logger.error(
+                            f"❌ {remaining} messages undelivered, {failed} rejected, "
+                            f"{errors - batch_errors} send errors; not advancing checkpoint"
+                        )
+                        errors += remaining + failed
+                        stopped = True
+                        break
+                    if incremental:
+                        self.checkpoints.save(collection_name, {"since": since, "last_id": batch[-1]["_id"]})
+
+                logger.info(f"  Progress: {processed} sent, {skipped} skipped, {errors} errors")
+                time.sleep(SLEEP_BETWEEN_BATCHES)
+
+            if not stopped and errors == 0 and incremental and not dry_run:
+                self.checkpoints.save(collection_name, {"completed_at": run_started - timedelta(seconds=BACKFILL_CHECKPOINT_SKEW_SECONDS)})
+
         except Exception as e:
             logger.error(f"Error processing collection {collection_name}: {e}")
 
@@ -463,6 +487,7 @@ def main():
     parser.add_argument("--batch-size", type=int, help="Batch size for processing")
     parser.add_argument("--sleep", type=float, help="Sleep between batches")
     parser.add_argument("--no-incremental", action="store_true", help="Disable incremental mode (backfill all documents)")
+    parser.add_argument("--reset-checkpoints", action="store_true", help="Forget saved progress for the selected collections")
 
     args = parser.parse_args()
 
@@ -482,6 +507,9 @@ def main():
     incremental = INCREMENTAL_BACKFILL and not args.no_incremental
 
     backfill = MongoDBBackfill()
+    if args.reset_checkpoints:
+        for collection_name in collections:
+            backfill.checkpoints.clear(collection_name)
 
     try:
         logger.info(f"\n{'='*60}")
@@ -64,7 +64,9 @@ collections = sorted(
         "module",
         "epic",
         "features",
-        "userStory"
+        "userStory",
+        # Membership changes invalidate the backend's member -> projects RBAC cache
+        "members",
       }
 )
 
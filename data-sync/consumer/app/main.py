@@ -1,12 +1,15 @@
 import json
+import logging
 import os
 import re
 import sys
+import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from cachetools import TTLCache
 from dotenv import load_dotenv
 from huggingface_hub import login
 from kafka import KafkaConsumer
@@ -28,12 +31,15 @@ if not any("qdrant" in p for p in sys.path):
 from qdrant.encoder import get_splade_encoder  # noqa: E402
 from qdrant.indexing_shared import (  # noqa: E402
     CHUNKING_CONFIG,
+    build_chunk_payload,
+    chunk_point_id,
     chunk_prepared_document,
     ensure_collection_with_hybrid,
-    generate_points,
+    generate_points_batch,
     normalize_mongo_id,
     prepare_document,
 )
+from app.workers import OffsetTracker, PartitionedWorkerPool, WorkItem  # noqa: E402
 
 
 # Updated to match setup-connectors.sh exactly
@@ -53,6 +59,15 @@ RELEVANT_COLLECTIONS = {
     "userStories",
 }
 
+# Membership changes only invalidate the backend's RBAC cache (mongo/member_projects.py)
+MEMBER_COLLECTIONS = {"members"}
+MEMBER_PROJECTS_KEY_PREFIX = "rbac:member_projects:"
+# Per-collection counters versioning the backend planner result cache (agent/plan_cache.py)
+COLLECTION_VERSION_PREFIX = "mongo:collection_version:"
+
+
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class ChangeEvent:
@@ -99,6 +114,24 @@ def create_embedding_client() -> EmbeddingServiceClient:
         raise RuntimeError("EMBEDDING_SERVICE_URL is required") from exc
 
 
+def create_cache_client() -> Optional[Any]:
+    """Redis client used to invalidate backend caches; None when disabled/unreachable."""
+    if os.getenv("CONSUMER_CACHE_INVALIDATION", "true").lower() not in {"1", "true", "yes"}:
+        return None
+    try:
+        import redis
+
+        client = redis.Redis.from_url(
+            os.getenv("REDIS_URL") or "redis://redis:6379/0",
+            socket_connect_timeout=2,
+            socket_timeout=2,
+        )
+        client.ping()
+        return client
+    except Exception as exc:
+        return None
+
+
 def get_env(name: str, default: Optional[str] = None) -> str:
     value = os.getenv(name, default)
     if value is None:
@@ -192,73 +225,314 @@ def parse_change_events(raw: bytes) -> List[ChangeEvent]:
     return [ChangeEvent(operation=op, collection=collection, full_document=document, document_key=document_key)]
 
 
-def delete_points_for_parent(client: QdrantClient, collection: str, parent_id: str) -> None:
-    if not parent_id:
+def invalidate_member_projects(cache_client: Any, event: ChangeEvent) -> None:
+    if cache_client is None:
         return
+    document = event.full_document or {}
+    staff = document.get("staff") if isinstance(document.get("staff"), dict) else {}
+    member_ids = {normalize_mongo_id(document.get("memberId")), normalize_mongo_id(staff.get("_id"))}
+    member_ids.discard("")
     try:
-        client.delete(
-            collection_name=collection,
-            points_selector=qmodels.FilterSelector(
-                filter=qmodels.Filter(
-                    must=[
-                        qmodels.FieldCondition(
-                            key="parent_id",
-                            match=qmodels.MatchValue(value=parent_id),
-                        )
-                    ]
-                )
-            ),
-            wait=True,
-        )
+        if member_ids:
+            cache_client.delete(*[f"{MEMBER_PROJECTS_KEY_PREFIX}{member_id}" for member_id in member_ids])
+            return
+        # Deletes (and updates without a post-image) don't say whose access changed
+        keys = list(cache_client.scan_iter(match=f"{MEMBER_PROJECTS_KEY_PREFIX}*", count=500))
+        if keys:
+            cache_client.delete(*keys)
+    except Exception as exc:
+        # Entries then expire on MEMBER_PROJECTS_TTL_SECONDS; make the gap visible
+        logger.warning(f"Failed to invalidate member projects cache: {exc}")
+
+
+def bump_collection_versions(cache_client: Any, events: List[ChangeEvent]) -> None:
+    if cache_client is None:
+        return
+    collections = {event.collection for event in events if event.collection}
+    if not collections:
+        return
+    try:
+        pipe = cache_client.pipeline(transaction=False)
+        for name in collections:
+            pipe.incr(f"{COLLECTION_VERSION_PREFIX}{name}")
+        pipe.execute()
     except Exception as exc:
         pass
 
 
-def process_event(
-    event: ChangeEvent,
+def event_key(event: ChangeEvent) -> Optional[str]:
+    """Routing key that keeps all events for one document on the same worker, in order."""
+    if event.collection in MEMBER_COLLECTIONS:
+        return f"{event.collection}:{normalize_mongo_id((event.document_key or {}).get('_id'))}"
+    if event.collection not in RELEVANT_COLLECTIONS:
+        return None
+    raw_id = (event.full_document or {}).get("_id")
+    if raw_id is None:
+        raw_id = (event.document_key or {}).get("_id")
+    mongo_id = normalize_mongo_id(raw_id)
+    return f"{event.collection}:{mongo_id}" if mongo_id else None
+
+
+def stale_points_filter(parent_ids: Iterable[str], tails: Dict[str, int]) -> Optional[qmodels.Filter]:
+    """Filter matching whole deleted documents plus chunks at or past each ``tails`` count."""
+    ids = sorted({parent_id for parent_id in parent_ids if parent_id})
+    conditions: List[Any] = []
+    if ids:
+        conditions.append(qmodels.FieldCondition(key="parent_id", match=qmodels.MatchAny(any=ids)))
+    for parent_id, chunk_count in tails.items():
+        conditions.append(
+            qmodels.Filter(
+                must=[
+                    qmodels.FieldCondition(key="parent_id", match=qmodels.MatchValue(value=parent_id)),
+                    qmodels.FieldCondition(key="chunk_index", range=qmodels.Range(gte=chunk_count)),
+                ]
+            )
+        )
+    return qmodels.Filter(should=conditions) if conditions else None
+
+
+class RecentWrites:
+    """Fingerprints of documents this process wrote recently, keyed by parent id.
+
+    Writes go out with ``wait=False``, so a retrieve right after may still see the
+    previous version. Every document is owned by one worker, so what that worker
+    last wrote is the authoritative state and is used instead of reading Qdrant.
+    """
+
+    def __init__(self, maxsize: int = 20000, ttl_seconds: float = 120.0) -> None:
+        self._lock = threading.Lock()
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+
+    def get(self, parent_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._cache.get(parent_id)
+
+    def remember(self, parent_id: str, chunks: Dict[str, Dict[str, Any]]) -> None:
+        """Record the document's full chunk state after a write (empty dict for a delete)."""
+        with self._lock:
+            self._cache[parent_id] = {"chunk_count": len(chunks), "chunks": chunks}
+
+
+recent_writes = RecentWrites()
+
+
+def fetch_chunk_fingerprints(client: QdrantClient, collection: str, point_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Stored fingerprints (and chunk counts) for the given chunk point ids."""
+    if not point_ids:
+        return {}
+    records = client.retrieve(
+        collection_name=collection,
+        ids=point_ids,
+        with_payload=["content_hash", "payload_hash", "chunk_count"],
+        with_vectors=False,
+    )
+    return {str(record.id): record.payload or {} for record in records}
+
+
+class ApplyStats:
+    """Running totals shared by all workers: coalescing and chunk re-embedding savings."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.received = 0
+        self.applied = 0
+        self.chunks_embedded = 0
+        self.chunks_reused = 0
+
+    def record(self, received: int = 0, applied: int = 0, embedded: int = 0, reused: int = 0) -> None:
+        with self._lock:
+            self.received += received
+            self.applied += applied
+            self.chunks_embedded += embedded
+            self.chunks_reused += reused
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            received, applied = self.received, self.applied
+            embedded, reused = self.chunks_embedded, self.chunks_reused
+        return {
+            "received": received,
+            "applied": applied,
+            "ratio": received / applied if applied else 1.0,
+            "chunks_embedded": embedded,
+            "chunks_reused": reused,
+        }
+
+
+apply_stats = ApplyStats()
+
+
+def _is_actionable(event: ChangeEvent) -> bool:
+    return event.operation == "delete" or bool(event.full_document)
+
+
+def coalesce_events(items: List[WorkItem]) -> List[ChangeEvent]:
+    """Reduce a batch to the last-writer-wins operation per ``(collection, _id)``.
+
+    The latest delete or post-image for a document replaces everything before
+    it, so insert -> update -> delete collapses to a single delete. Updates
+    without a post-image carry nothing to index and never displace an earlier
+    actionable event. Membership events only invalidate caches and are kept
+    as-is, in order.
+    """
+    latest: Dict[str, ChangeEvent] = {}
+    passthrough: List[ChangeEvent] = []
+    for item in items:
+        event = item.event
+        if event.collection in MEMBER_COLLECTIONS:
+            passthrough.append(event)
+            continue
+        if _is_actionable(event) or item.key not in latest:
+            # Re-insert so dict order follows each document's latest event
+            latest.pop(item.key, None)
+            latest[item.key] = event
+    return passthrough + list(latest.values())
+
+
+def apply_events(
+    events: List[ChangeEvent],
     client: QdrantClient,
     collection_name: str,
     embedder: EmbeddingServiceClient,
     splade_encoder: Any,
+    cache_client: Any = None,
+    wait: bool = False,
 ) -> None:
-    if event.collection not in RELEVANT_COLLECTIONS:
-        return
-
-    if event.operation == "delete":
-        raw_id = (event.document_key or {}).get("_id")
-        if raw_id is None:
-            return
-        mongo_id = normalize_mongo_id(raw_id)
-        if not mongo_id:
-            return
-        delete_points_for_parent(client, collection_name, mongo_id)
-        return
-
-    if not event.full_document:
-        return
-
-    prepared, messages = prepare_document(event.collection, event.full_document)
-    if not prepared:
-        return
+    """Apply change events for distinct documents with one embed call and one ordered bulk write.
+
+    New chunk points are upserted under their deterministic ids before stale
+    ones are pruned, all in a single ``batch_update_points`` request, so a
+    document never disappears from search while it is being replaced.
+    """
+    deleted_parents: List[str] = []
+    upserts: List[Tuple[Any, List[str]]] = []
+
+    for event in events:
+        if event.collection in MEMBER_COLLECTIONS:
+            invalidate_member_projects(cache_client, event)
+            continue
+
+        if event.collection not in RELEVANT_COLLECTIONS:
+            continue
+
+        if event.operation == "delete":
+            raw_id = (event.document_key or {}).get("_id")
+            if raw_id is None:
+                continue
+            mongo_id = normalize_mongo_id(raw_id)
+            if mongo_id:
+                deleted_parents.append(mongo_id)
+            continue
+
+        if not event.full_document:
+            continue
+
+        prepared, messages = prepare_document(event.collection, event.full_document)
+        if not prepared or not prepared.mongo_id:
+            continue
+
+        chunks = chunk_prepared_document(prepared)
+        if chunks:
+            upserts.append((prepared, chunks))
+        else:
+            deleted_parents.append(prepared.mongo_id)
+
+    # Compare per-chunk fingerprints: only chunks whose text changed are re-embedded,
+    # unchanged chunks just get their payload rewritten when metadata moved
+    known: Dict[str, Dict[str, Any]] = {}
+    lookup_ids: List[str] = []
+    for prepared, chunks in upserts:
+        recent = recent_writes.get(prepared.mongo_id)
+        if recent is not None:
+            known[prepared.mongo_id] = recent
+        else:
+            lookup_ids.extend(chunk_point_id(prepared, idx) for idx in range(len(chunks)))
+    stored = fetch_chunk_fingerprints(client, collection_name, lookup_ids)
+
+    changed: List[List[int]] = []
+    operations: List[Any] = []
+    tails: Dict[str, int] = {}
+    written: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for prepared, chunks in upserts:
+        recent = known.get(prepared.mongo_id)
+        doc_stored = recent["chunks"] if recent is not None else stored
+        doc_changed: List[int] = []
+        doc_written: Dict[str, Dict[str, Any]] = {}
+        for idx, chunk in enumerate(chunks):
+            point_id = chunk_point_id(prepared, idx)
+            payload = build_chunk_payload(prepared, chunk, idx, len(chunks))
+            doc_written[point_id] = {key: payload[key] for key in ("content_hash", "payload_hash", "chunk_count")}
+            current = doc_stored.get(point_id)
+            if current is None or current.get("content_hash") != payload["content_hash"]:
+                doc_changed.append(idx)
+                continue
+            if current.get("payload_hash") != payload["payload_hash"]:
+                # Overwrite rather than merge so metadata fields that were cleared disappear
+                operations.append(
+                    qmodels.OverwritePayloadOperation(
+                        overwrite_payload=qmodels.SetPayload(payload=payload, points=[point_id])
+                    )
+                )
+        changed.append(doc_changed)
+        written[prepared.mongo_id] = doc_written
 
-    chunks = chunk_prepared_document(prepared)
-    mongo_id = prepared.mongo_id
-    if not mongo_id:
-        return
+        if recent is not None:
+            previous_count = recent["chunk_count"]
+        else:
+            previous_count = (stored.get(chunk_point_id(prepared, 0)) or {}).get("chunk_count")
+        if not isinstance(previous_count, int) or previous_count > len(chunks):
+            tails[prepared.mongo_id] = len(chunks)
+
+    # Encode before touching Qdrant so a failed embedding leaves the old points in place
+    points = [
+        point
+        for doc_points in generate_points_batch(upserts, embedder, splade_encoder, only=changed)
+        for point in doc_points
+    ] if upserts else []
+    embedded = sum(len(doc_changed) for doc_changed in changed)
+    apply_stats.record(embedded=embedded, reused=sum(len(chunks) for _, chunks in upserts) - embedded)
+
+    # Upserts first, prune last: operations in one request are applied in order
+    if points:
+        operations.insert(0, qmodels.UpsertOperation(upsert=qmodels.PointsList(points=points)))
+    prune = stale_points_filter(deleted_parents, tails)
+    if prune is not None:
+        operations.append(qmodels.DeleteOperation(delete=qmodels.FilterSelector(filter=prune)))
+    if operations:
+        client.batch_update_points(
+            collection_name=collection_name,
+            update_operations=operations,
+            wait=wait,
+            ordering=qmodels.WriteOrdering.STRONG,
+        )
 
-    delete_points_for_parent(client, collection_name, mongo_id)
+    for parent_id, doc_written in written.items():
+        recent_writes.remember(parent_id, doc_written)
+    for parent_id in deleted_parents:
+        recent_writes.remember(parent_id, {})
 
-    if not chunks:
-        return
+    # Any write to a collection invalidates cached planner results that read it
+    bump_collection_versions(cache_client, events)
 
-    points = generate_points(prepared, chunks, embedder, splade_encoder)
-    if not points:
-        return
 
+def apply_work_items(
+    items: List[WorkItem],
+    client: QdrantClient,
+    collection_name: str,
+    embedder: EmbeddingServiceClient,
+    splade_encoder: Any,
+    cache_client: Any = None,
+    wait: bool = False,
+) -> List[WorkItem]:
+    """Worker handler: coalesce ``items`` and apply them in bulk; return the items that did not land."""
+    events = coalesce_events(items)
+    apply_stats.record(received=len(items), applied=len(events))
     try:
-        client.upsert(collection_name=collection_name, points=points, wait=True)
-    except Exception as exc:
-        raise
+        apply_events(events, client, collection_name, embedder, splade_encoder, cache_client, wait=wait)
+    except Exception:
+        # Superseded events are retried with their winner so their offsets stay uncommitted
+        return items
+    return []
 
 
 def main() -> None:
@@ -266,11 +540,13 @@ def main() -> None:
 
     embedder = create_embedding_client()
     splade_encoder = get_splade_encoder()
+    cache_client = create_cache_client()
     try:
         embedding_dim = embedder.get_dimension()
     except EmbeddingServiceError as exc:
         raise RuntimeError(f"Failed to determine embedding dimension: {exc}") from exc
     log_level = get_env("LOG_LEVEL", "INFO")
+    logging.basicConfig(level=getattr(logging, log_level.upper(), logging.INFO))
 
     bootstrap = get_env("KAFKA_BOOTSTRAP_SERVERS", "kafka:9092")
     topic_pattern = get_env("KAFKA_TOPIC", "ProjectManagement\..*")
@@ -279,6 +555,12 @@ def main() -> None:
     collection = get_env("QDRANT_COLLECTION", "ProjectManagement")
     batch_max_messages = int(get_env("BATCH_MAX_MESSAGES", "128"))
     batch_max_seconds = float(get_env("BATCH_MAX_SECONDS", "2"))
+    worker_count = int(get_env("CONSUMER_WORKERS", "4"))
+    queue_size = int(get_env("CONSUMER_QUEUE_SIZE", "256"))
+    worker_batch = int(get_env("CONSUMER_WORKER_BATCH", "64"))
+    max_retries = int(get_env("CONSUMER_MAX_RETRIES", "2"))
+    # Writes are ordered, so acknowledging them asynchronously is safe; set true to block until applied
+    write_wait = get_env("QDRANT_WRITE_WAIT", "false").lower() in {"1", "true", "yes"}
 
     client = None
     while client is None:
@@ -292,66 +574,81 @@ def main() -> None:
     # Convert regex pattern to actual regex for subscription
     topic_regex = re.compile(topic_pattern)
     
+    def create_consumer() -> KafkaConsumer:
+        new_consumer = KafkaConsumer(
+            bootstrap_servers=[s.strip() for s in bootstrap.split(",") if s.strip()],
+            group_id=group_id,
+            enable_auto_commit=False,
+            auto_offset_reset="earliest",
+            value_deserializer=lambda m: m,
+            key_deserializer=lambda m: m,
+        )
+        # Subscribe using pattern
+        new_consumer.subscribe(pattern=topic_regex)
+        return new_consumer
+
     consumer: Optional[KafkaConsumer] = None
     while consumer is None:
         try:
-            consumer = KafkaConsumer(
-                bootstrap_servers=[s.strip() for s in bootstrap.split(",") if s.strip()],
-                group_id=group_id,
-                enable_auto_commit=False,
-                auto_offset_reset="earliest",
-                value_deserializer=lambda m: m,
-                key_deserializer=lambda m: m,
-            )
-            # Subscribe using pattern
-            consumer.subscribe(pattern=topic_regex)
+            consumer = create_consumer()
         except Exception as exc:
             time.sleep(2)
 
-    batch_events: List[ChangeEvent] = []
-    last_flush_ts = time.monotonic()
-    processed_count = 0
-    error_count = 0
+    # Offsets are committed per partition, only up to the last message whose
+    # events have all been applied by the workers
+    tracker = OffsetTracker()
+    pool = PartitionedWorkerPool(
+        lambda items: apply_work_items(items, client, collection, embedder, splade_encoder, cache_client, wait=write_wait),
+        tracker,
+        workers=worker_count,
+        queue_size=queue_size,
+        batch_size=worker_batch,
+        max_retries=max_retries,
+    )
+
+    last_commit_ts = time.monotonic()
+    paused = False
 
     while True:
         try:
-            now = time.monotonic()
-            remaining_capacity = max(0, batch_max_messages - len(batch_events))
-            poll_timeout_ms = 500
-            max_records = remaining_capacity if remaining_capacity > 0 else None
-
-            records_map = consumer.poll(timeout_ms=poll_timeout_ms, max_records=max_records)
+            # Backpressure: stop fetching while any worker queue is full
+            if pool.saturated():
+                if not paused:
+                    consumer.pause(*consumer.assignment())
+                    paused = True
+            elif paused:
+                consumer.resume(*consumer.paused())
+                paused = False
+
+            records_map = consumer.poll(timeout_ms=500, max_records=batch_max_messages)
             total_polled = sum(len(records) for records in (records_map or {}).values())
 
             for topic_partition, records in (records_map or {}).items():
                 for msg in records:
-                    events = parse_change_events(msg.value)
-                    if events:
-                        batch_events.extend(events)
-
-            should_flush = False
-            if len(batch_events) >= batch_max_messages:
-                should_flush = True
-            elif (now - last_flush_ts) >= batch_max_seconds and batch_events:
-                should_flush = True
-
-            if should_flush:
-                batch_errors = 0
-                for idx, event in enumerate(batch_events):
-                    try:
-                        process_event(event, client, collection, embedder, splade_encoder)
-                        processed_count += 1
-                    except Exception as exc:
-                        batch_errors += 1
-                        error_count += 1
-
-                if batch_errors == 0:
-                    consumer.commit()
-                
-                batch_events.clear()
-                last_flush_ts = time.monotonic()
-
-            if total_polled == 0 and not should_flush:
+                    work = [
+                        WorkItem(key=key, event=event, source=(topic_partition, msg.offset))
+                        for event in parse_change_events(msg.value)
+                        for key in [event_key(event)]
+                        if key is not None
+                    ]
+                    tracker.register(topic_partition, msg.offset, len(work))
+                    for item in work:
+                        pool.submit(item)
+
+            now = time.monotonic()
+            if (now - last_commit_ts) >= batch_max_seconds:
+                offsets = tracker.committable()
+                if offsets:
+                    consumer.commit(offsets=offsets)
+                    stats = apply_stats.snapshot()
+                    logger.info(
+                        f"Committed {len(offsets)} partition(s); coalesced {stats['received']} events "
+                        f"into {stats['applied']} operations (ratio {stats['ratio']:.2f}); "
+                        f"embedded {stats['chunks_embedded']} chunks, reused {stats['chunks_reused']}"
+                    )
+                last_commit_ts = now
+
+            if total_polled == 0:
                 time.sleep(0.1)
 
         except Exception as exc:
@@ -360,18 +657,13 @@ def main() -> None:
                 consumer.close()
             except Exception:
                 pass
+            # Uncommitted messages are redelivered to the new consumer; re-applying is idempotent
+            tracker.reset()
+            paused = False
             consumer = None
             while consumer is None:
                 try:
-                    consumer = KafkaConsumer(
-                        bootstrap_servers=[s.strip() for s in bootstrap.split(",") if s.strip()],
-                        group_id=group_id,
-                        enable_auto_commit=False,
-                        auto_offset_reset="earliest",
-                        value_deserializer=lambda m: m,
-                        key_deserializer=lambda m: m,
-                    )
-                    consumer.subscribe(pattern=topic_regex)
+                    consumer = create_consumer()
                 except NoBrokersAvailable as broker_exc:
                     time.sleep(2)
 
@@ -0,0 +1,194 @@
+import queue
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from kafka.structs import OffsetAndMetadata
+
+
+def _offset_and_metadata(offset: int) -> OffsetAndMetadata:
+    # kafka-python >= 2.1 added leader_epoch to the namedtuple
+    try:
+        return OffsetAndMetadata(offset, None, -1)
+    except TypeError:
+        return OffsetAndMetadata(offset, None)
+
+
+class OffsetTracker:
+    """Track in-flight Kafka messages and expose offsets that are safe to commit.
+
+    A partition's committable offset only advances past a message once every
+    event parsed from it (and every earlier message) has been applied, so a
+    crash never commits work that has not landed in Qdrant.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # partition -> {offset: remaining events}
+        self._pending: Dict[Any, Dict[int, int]] = {}
+        # partition -> highest offset registered
+        self._registered: Dict[Any, int] = {}
+        self._committed: Dict[Any, int] = {}
+
+    def register(self, partition: Any, offset: int, event_count: int) -> None:
+        with self._lock:
+            if event_count > 0:
+                self._pending.setdefault(partition, {})[offset] = event_count
+            else:
+                self._pending.setdefault(partition, {})
+            self._registered[partition] = max(offset, self._registered.get(partition, -1))
+
+    def complete(self, partition: Any, offset: int) -> None:
+        with self._lock:
+            pending = self._pending.get(partition)
+            if not pending or offset not in pending:
+                return
+            pending[offset] -= 1
+            if pending[offset] <= 0:
+                del pending[offset]
+
+    def committable(self) -> Dict[Any, OffsetAndMetadata]:
+        """Offsets (next offset to read) that advanced since the last call."""
+        offsets: Dict[Any, OffsetAndMetadata] = {}
+        with self._lock:
+            for partition, highest in self._registered.items():
+                pending = self._pending.get(partition) or {}
+                done_through = (min(pending) - 1) if pending else highest
+                if done_through < 0 or done_through + 1 <= self._committed.get(partition, -1):
+                    continue
+                offsets[partition] = _offset_and_metadata(done_through + 1)
+                self._committed[partition] = done_through + 1
+        return offsets
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return sum(sum(pending.values()) for pending in self._pending.values())
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pending.clear()
+            self._registered.clear()
+            self._committed.clear()
+
+
+@dataclass
+class WorkItem:
+    key: Hashable
+    event: Any
+    source: Optional[Tuple[Any, int]] = None
+
+
+class PartitionedWorkerPool:
+    """Fixed set of worker threads, each owning a bounded queue.
+
+    Items are routed by a stable hash of their key, so all events for one
+    document are handled by the same worker in arrival order while different
+    documents proceed in parallel. Each worker drains up to ``batch_size``
+    items at a time and hands them to ``handler`` as one batch (one embedding
+    request, one bulk upsert). ``handler`` returns the items that failed.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[WorkItem]], List[WorkItem]],
+        tracker: OffsetTracker,
+        *,
+        workers: int = 4,
+        queue_size: int = 256,
+        batch_size: int = 64,
+        batch_wait_s: float = 0.05,
+        max_retries: int = 2,
+        retry_backoff_s: float = 1.0,
+        on_dropped: Optional[Callable[[WorkItem], None]] = None,
+    ) -> None:
+        self.handler = handler
+        self.tracker = tracker
+        self.batch_size = max(batch_size, 1)
+        self.batch_wait_s = batch_wait_s
+        self.max_retries = max_retries
+        self.retry_backoff_s = retry_backoff_s
+        self.on_dropped = on_dropped
+        self.queues: List["queue.Queue[WorkItem]"] = [queue.Queue(maxsize=max(queue_size, 1)) for _ in range(max(workers, 1))]
+        self.processed = 0
+        self.failed = 0
+        self.batches = 0
+
+        self._stop = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._run, args=(q,), name=f"consumer-worker-{i}", daemon=True)
+            for i, q in enumerate(self.queues)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _route(self, key: Hashable) -> "queue.Queue[WorkItem]":
+        # crc32 rather than hash(): stable across processes, so partitioning is reproducible
+        return self.queues[zlib.crc32(str(key).encode("utf-8")) % len(self.queues)]
+
+    def submit(self, item: WorkItem) -> None:
+        """Enqueue ``item``; blocks while its worker's queue is full (backpressure)."""
+        self._route(item.key).put(item)
+
+    def saturated(self) -> bool:
+        return any(q.full() for q in self.queues)
+
+    def queued(self) -> int:
+        return sum(q.qsize() for q in self.queues)
+
+    def _drain(self, work: "queue.Queue[WorkItem]") -> List[WorkItem]:
+        try:
+            first = work.get(timeout=0.5)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.batch_wait_s
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(work.get(timeout=remaining) if remaining > 0 else work.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self, work: "queue.Queue[WorkItem]") -> None:
+        while not self._stop.is_set():
+            batch = self._drain(work)
+            if not batch:
+                continue
+            attempt = 0
+            pending = batch
+            while pending:
+                try:
+                    failed = self.handler(pending)
+                except Exception:
+                    failed = pending
+                failed_ids = {id(item) for item in failed}
+                self._complete([item for item in pending if id(item) not in failed_ids])
+                if not failed:
+                    break
+                attempt += 1
+                if attempt > self.max_retries:
+                    # Give up so the partition can keep committing; the event is reported and dropped
+                    self.failed += len(failed)
+                    for item in failed:
+                        if self.on_dropped is not None:
+                            self.on_dropped(item)
+                        if item.source is not None:
+                            self.tracker.complete(*item.source)
+                    break
+                time.sleep(self.retry_backoff_s * (2 ** (attempt - 1)))
+                pending = failed
+            self.batches += 1
+
+    def _complete(self, items: List[WorkItem]) -> None:
+        for item in items:
+            if item.source is not None:
+                self.tracker.complete(*item.source)
+        self.processed += len(items)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
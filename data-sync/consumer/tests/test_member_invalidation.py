@@ -0,0 +1,109 @@
+"""A members change event must evict the backend's member -> projects cache entry."""
+
+import base64
+import fnmatch
+import json
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+for module in ("kafka", "qdrant_client", "bson", "httpx", "cachetools", "dotenv", "huggingface_hub", "redis"):
+    pytest.importorskip(module)
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+DATA_SYNC = REPO_ROOT / "data-sync"
+
+MEMBER_UUID = "6f1b2c3d-4e5f-4a6b-8c7d-9e0f1a2b3c4d"
+
+
+@pytest.fixture(scope="module")
+def consumer():
+    # The consumer image ships data-sync/qdrant as the top-level ``qdrant`` package
+    # (no __init__.py there, so register it explicitly; the repo-root ``qdrant`` would win otherwise)
+    saved = {name: sys.modules.pop(name) for name in list(sys.modules) if name == "qdrant" or name.startswith("qdrant.")}
+    package = types.ModuleType("qdrant")
+    package.__path__ = [str(DATA_SYNC / "qdrant")]
+    sys.modules["qdrant"] = package
+    sys.path[:0] = [str(DATA_SYNC / "consumer"), str(REPO_ROOT)]
+    try:
+        from app import main as consumer_main
+        yield consumer_main
+    finally:
+        del sys.path[:2]
+        for name in [n for n in sys.modules if n == "qdrant" or n.startswith("qdrant.")]:
+            sys.modules.pop(name)
+        sys.modules.update(saved)
+
+
+class FakeRedis:
+    """Just the commands the consumer issues."""
+
+    def __init__(self, values):
+        self.values = dict(values)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def scan_iter(self, match="*", count=None):
+        return [key for key in list(self.values) if fnmatch.fnmatch(key, match)]
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+
+    def execute(self):
+        return []
+
+
+def _members_message(operation, member_binary=None):
+    """Raw Kafka value as the Mongo source connector publishes it (double-encoded JSON)."""
+    envelope = {
+        "operationType": operation,
+        "ns": {"db": "ProjectManagement", "coll": "members"},
+        "documentKey": {"_id": {"$oid": "65f0c0ffee0000000000beef"}},
+    }
+    if member_binary is not None:
+        envelope["fullDocument"] = {
+            "_id": {"$oid": "65f0c0ffee0000000000beef"},
+            "memberId": {"$binary": {"base64": base64.b64encode(member_binary).decode("ascii"), "subType": "03"}},
+            "project": {"_id": {"$binary": {"base64": base64.b64encode(b"p" * 16).decode("ascii"), "subType": "03"}}},
+        }
+    return json.dumps(json.dumps(envelope)).encode("utf-8")
+
+
+def _backend_key():
+    from mongo.member_projects import REDIS_KEY_PREFIX, member_cache_id
+
+    return f"{REDIS_KEY_PREFIX}{member_cache_id(MEMBER_UUID)}"
+
+
+def test_members_update_deletes_member_projects_key(consumer):
+    from mongo.constants import uuid_str_to_mongo_binary
+
+    key = _backend_key()
+    other = "rbac:member_projects:someone-else"
+    cache = FakeRedis({key: "[]", other: "[]"})
+
+    events = consumer.parse_change_events(_members_message("update", bytes(uuid_str_to_mongo_binary(MEMBER_UUID))))
+    assert [event.collection for event in events] == ["members"]
+    consumer.apply_events(events, None, "unused", None, None, cache_client=cache)
+
+    assert key not in cache.values
+    assert other in cache.values
+    assert cache.values["mongo:collection_version:members"] == 1
+
+
+def test_members_delete_without_post_image_clears_every_member(consumer):
+    key = _backend_key()
+    cache = FakeRedis({key: "[]", "rbac:member_projects:someone-else": "[]", "unrelated": "x"})
+
+    events = consumer.parse_change_events(_members_message("delete"))
+    consumer.apply_events(events, None, "unused", None, None, cache_client=cache)
+
+    assert not [k for k in cache.values if k.startswith("rbac:member_projects:")]
+    assert "unrelated" in cache.values
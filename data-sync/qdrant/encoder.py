@@ -2,7 +2,7 @@ from __future__ import annotations
 
 """SPLADE encoder client wrapper."""
 
-from typing import Dict, List
+from typing import Dict, List, Sequence
 import threading
 
 from splade import SpladeServiceClient
@@ -29,6 +29,22 @@ class SpladeEncoder:
             return {"indices": [], "values": []}
         return vectors[0]
 
+    def encode_texts(self, texts: Sequence[str], max_terms: int | None = None) -> List[Dict[str, List[float]]]:
+        """Encode many texts with as few service round-trips as possible.
+
+        Blank texts are not sent to the service; the result keeps input order.
+        """
+        results: List[Dict[str, List[float]]] = [{"indices": [], "values": []} for _ in texts]
+        positions = [i for i, text in enumerate(texts) if text and text.strip()]
+        if not positions:
+            return results
+
+        effective_max_terms = max_terms or self.max_terms
+        vectors = self.client.encode([texts[i] for i in positions], max_terms=effective_max_terms)
+        for position, vector in zip(positions, vectors):
+            results[position] = vector
+        return results
+
 
 def get_splade_encoder() -> SpladeEncoder:
     global _encoder_singleton
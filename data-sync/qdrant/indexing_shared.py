@@ -3,8 +3,9 @@ from __future__ import annotations
 """Reusable helpers for Project Management ? Qdrant indexing."""
 
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 import base64
+import hashlib
 import html as html_lib
 import json
 import re
@@ -591,64 +592,115 @@ def chunk_prepared_document(prepared: PreparedDocument) -> List[str]:
     return chunks or [prepared.combined_text]
 
 
+def chunk_point_id(prepared: PreparedDocument, idx: int) -> str:
+    return point_id_from_seed(f"{prepared.mongo_id}/{prepared.content_type}/{idx}")
+
+
+def chunk_fingerprint(title: str, chunk: str) -> str:
+    """Hash of everything that feeds the dense and sparse encoders for one chunk."""
+    return hashlib.sha256(f"{title}\x00{chunk}".encode("utf-8")).hexdigest()
+
+
+def build_chunk_payload(prepared: PreparedDocument, chunk: str, idx: int, chunk_count: int) -> Dict[str, Any]:
+    """Payload stored with a chunk point, including its content and payload fingerprints.
+
+    ``content_hash`` changes only when the embedded text does, so an update that
+    touches nothing but metadata can skip re-embedding; ``payload_hash`` tells
+    whether the stored payload needs rewriting at all.
+    """
+    payload: Dict[str, Any] = {
+        "mongo_id": prepared.mongo_id,
+        "parent_id": prepared.mongo_id,
+        "chunk_index": idx,
+        "chunk_count": chunk_count,
+        "title": prepared.title,
+        "content": chunk,
+        "full_text": f"{prepared.title} {chunk}".strip(),
+        "content_type": prepared.content_type,
+    }
+    payload.update({k: v for k, v in prepared.metadata.items() if v is not None})
+    payload["content_hash"] = chunk_fingerprint(prepared.title, chunk)
+    payload["payload_hash"] = hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    return payload
+
+
 def generate_points(
     prepared: PreparedDocument,
     chunks: Iterable[str],
     embedder: Any,
     splade_encoder: Any,
 ) -> List[qmodels.PointStruct]:
-    chunk_list = list(chunks)
-    if not chunk_list:
-        return []
+    return generate_points_batch([(prepared, chunks)], embedder, splade_encoder)[0]
 
-    vectors = embedder.encode(chunk_list)
-    if hasattr(vectors, "tolist"):
-        vectors = vectors.tolist()
 
-    if len(vectors) != len(chunk_list):
+def generate_points_batch(
+    documents: Sequence[Tuple[PreparedDocument, Iterable[str]]],
+    embedder: Any,
+    splade_encoder: Any,
+    only: Optional[Sequence[Optional[Iterable[int]]]] = None,
+) -> List[List[qmodels.PointStruct]]:
+    """Build points for several documents with one dense and one sparse encode call.
+
+    ``only`` optionally restricts each document to a subset of chunk indices
+    (None keeps every chunk); payloads still record the full chunk count.
+    Returns one list of points per input document, in input order.
+    """
+    items = [(prepared, list(chunks)) for prepared, chunks in documents]
+    entries: List[Tuple[int, PreparedDocument, int, str, int]] = []
+    for doc_pos, (prepared, chunk_list) in enumerate(items):
+        selected = None if only is None or only[doc_pos] is None else set(only[doc_pos])
+        for idx, chunk in enumerate(chunk_list):
+            if selected is None or idx in selected:
+                entries.append((doc_pos, prepared, idx, chunk, len(chunk_list)))
+
+    results: List[List[qmodels.PointStruct]] = [[] for _ in items]
+    if not entries:
+        return results
+
+    all_chunks = [chunk for _, _, _, chunk, _ in entries]
+    # Keep the (n, dim) float32 matrix decoded from the service; rows become lists only per point
+    encode_array = getattr(embedder, "encode_array", None)
+    vectors = encode_array(all_chunks) if encode_array is not None else embedder.encode(all_chunks)
+
+    if len(vectors) != len(all_chunks):
         raise ValueError("embedding dimension mismatch with chunk count")
 
-    points: List[qmodels.PointStruct] = []
-    for idx, chunk in enumerate(chunk_list):
-        vector = vectors[idx]
+    full_texts = [f"{prepared.title} {chunk}".strip() for _, prepared, _, chunk, _ in entries]
+    sparse_vectors: List[Optional[Dict[str, List[float]]]] = [None] * len(all_chunks)
+    if splade_encoder is not None:
+        if hasattr(splade_encoder, "encode_texts"):
+            sparse_vectors = list(splade_encoder.encode_texts(full_texts))
+        else:
+            sparse_vectors = [splade_encoder.encode_text(text) for text in full_texts]
+
+    for position, (doc_pos, prepared, idx, chunk, chunk_count) in enumerate(entries):
+        vector = vectors[position]
         if hasattr(vector, "tolist"):
             vector = vector.tolist()
         if not isinstance(vector, list):
             vector = [float(x) for x in vector]
 
-        full_text = f"{prepared.title} {chunk}".strip()
-
-        payload: Dict[str, Any] = {
-            "mongo_id": prepared.mongo_id,
-            "parent_id": prepared.mongo_id,
-            "chunk_index": idx,
-            "chunk_count": len(chunk_list),
-            "title": prepared.title,
-            "content": chunk,
-            "full_text": full_text,
-            "content_type": prepared.content_type,
-        }
-        payload.update({k: v for k, v in prepared.metadata.items() if v is not None})
-
-        vector_map: Dict[str, Any] = {"dense": [float(x) for x in vector]}
-
-        if splade_encoder is not None:
-            splade_vec = splade_encoder.encode_text(full_text)
-            if splade_vec.get("indices"):
-                vector_map["sparse"] = qmodels.SparseVector(
-                    indices=splade_vec["indices"], values=splade_vec["values"]
-                )
+        payload = build_chunk_payload(prepared, chunk, idx, chunk_count)
+
+        vector_map: Dict[str, Any] = {"dense": vector}
+
+        splade_vec = sparse_vectors[position]
+        if splade_vec and splade_vec.get("indices"):
+            vector_map["sparse"] = qmodels.SparseVector(
+                indices=splade_vec["indices"], values=splade_vec["values"]
+            )
 
-        point_id = point_id_from_seed(f"{prepared.mongo_id}/{prepared.content_type}/{idx}")
-        points.append(
+        results[doc_pos].append(
             qmodels.PointStruct(
-                id=point_id,
+                id=chunk_point_id(prepared, idx),
                 vector=vector_map,
                 payload=payload,
             )
         )
 
-    return points
+    return results
 
 
 # ---------------------------------------------------------------------------
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
 from typing import List, Sequence
+import importlib.util
 import json
 import os
 
 import httpx
+import numpy as np
+
+# Compact response format negotiated via Accept: row-major little-endian float32
+# with the shape in X-Vector-Count / X-Vector-Dim. Servers without it reply JSON.
+FLOAT32_MEDIA_TYPE = "application/x-float32-matrix"
 
 
 class EmbeddingServiceError(RuntimeError):
@@ -19,6 +25,9 @@ class EmbeddingServiceClient:
 
     and responds with:
         {"embeddings": [[...], [...], ...]}
+
+    or, when ``binary`` is enabled and the service supports it, with a raw
+    float32 matrix that is decoded straight into numpy.
     """
 
     def __init__(
@@ -27,6 +36,7 @@ class EmbeddingServiceClient:
         *,
         timeout: float = 30.0,
         headers: dict[str, str] | None = None,
+        binary: bool | None = None,
     ) -> None:
         url = base_url or os.getenv("EMBEDDING_SERVICE_URL")
         if not url:
@@ -34,14 +44,21 @@ class EmbeddingServiceClient:
 
         self.base_url = url.rstrip("/")
         self.client = httpx.Client(timeout=timeout, headers=headers)
+        self.request_headers = _accept_headers(binary)
 
     def encode(self, texts: Sequence[str]) -> List[List[float]]:
         if not texts:
             return []
+        return self.encode_array(texts).tolist()
+
+    def encode_array(self, texts: Sequence[str]) -> np.ndarray:
+        """Encode texts into a ``(len(texts), dim)`` float32 array."""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
 
         payload = {"inputs": list(texts)}
         try:
-            response = self.client.post(f"{self.base_url}/embed", json=payload)
+            response = self.client.post(f"{self.base_url}/embed", json=payload, headers=self.request_headers)
         except Exception as exc:  # pragma: no cover - network failure guard
             raise EmbeddingServiceError(f"Failed to reach embedding service: {exc}") from exc
 
@@ -51,15 +68,7 @@ class EmbeddingServiceClient:
                 f"Embedding service returned {response.status_code}: {detail}"
             )
 
-        data = response.json()
-        embeddings = data.get("embeddings") or data.get("data")
-        if embeddings is None:
-            raise EmbeddingServiceError("Embedding service response missing 'embeddings'")
-
-        return [
-            [float(value) for value in vector]
-            for vector in embeddings
-        ]
+        return _decode_embeddings(response)
 
     def get_dimension(self) -> int:
         """Infer embedding dimensionality by encoding a dummy string."""
@@ -72,6 +81,110 @@ class EmbeddingServiceClient:
         self.client.close()
 
 
+class AsyncEmbeddingServiceClient:
+    """Asynchronous client for the embedding microservice.
+
+    Intended for the request path: connections are kept alive and pooled
+    across calls, HTTP/2 is used when the ``h2`` package is installed, and
+    every call accepts its own timeout.
+    """
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        *,
+        timeout: float = 30.0,
+        headers: dict[str, str] | None = None,
+        max_connections: int | None = None,
+        max_keepalive_connections: int | None = None,
+        http2: bool | None = None,
+        binary: bool | None = None,
+    ) -> None:
+        url = base_url or os.getenv("EMBEDDING_SERVICE_URL")
+        if not url:
+            raise ValueError("Embedding service URL is not configured")
+
+        self.base_url = url.rstrip("/")
+        limits = httpx.Limits(
+            max_connections=max_connections or int(os.getenv("EMBEDDING_MAX_CONNECTIONS", "32")),
+            max_keepalive_connections=max_keepalive_connections
+            or int(os.getenv("EMBEDDING_MAX_KEEPALIVE", "16")),
+        )
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            headers=headers,
+            limits=limits,
+            http2=_http2_available() if http2 is None else http2,
+        )
+        self.request_headers = _accept_headers(binary)
+
+    async def encode(self, texts: Sequence[str], *, timeout: float | None = None) -> List[List[float]]:
+        if not texts:
+            return []
+        return (await self.encode_array(texts, timeout=timeout)).tolist()
+
+    async def encode_array(self, texts: Sequence[str], *, timeout: float | None = None) -> np.ndarray:
+        """Encode texts into a ``(len(texts), dim)`` float32 array."""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        payload = {"inputs": list(texts)}
+        request_kwargs = {"timeout": timeout} if timeout is not None else {}
+        try:
+            response = await self.client.post(
+                f"{self.base_url}/embed", json=payload, headers=self.request_headers, **request_kwargs
+            )
+        except Exception as exc:  # pragma: no cover - network failure guard
+            raise EmbeddingServiceError(f"Failed to reach embedding service: {exc}") from exc
+
+        if response.status_code >= 400:
+            detail = _safe_extract_error(response)
+            raise EmbeddingServiceError(
+                f"Embedding service returned {response.status_code}: {detail}"
+            )
+
+        return _decode_embeddings(response)
+
+    async def get_dimension(self) -> int:
+        """Infer embedding dimensionality by encoding a dummy string."""
+        vectors = await self.encode(["dimension probe"])
+        if not vectors or not vectors[0]:
+            raise EmbeddingServiceError("Embedding service returned empty vector")
+        return len(vectors[0])
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+def _accept_headers(binary: bool | None) -> dict[str, str]:
+    if binary is None:
+        binary = os.getenv("EMBEDDING_BINARY_WIRE", "true").lower() not in {"0", "false", "no"}
+    if not binary:
+        return {}
+    return {"Accept": f"{FLOAT32_MEDIA_TYPE}, application/json;q=0.5"}
+
+
+def _decode_embeddings(response: httpx.Response) -> np.ndarray:
+    if response.headers.get("content-type", "").startswith(FLOAT32_MEDIA_TYPE):
+        try:
+            rows = int(response.headers["x-vector-count"])
+            dim = int(response.headers["x-vector-dim"])
+        except (KeyError, ValueError) as exc:
+            raise EmbeddingServiceError("Embedding service binary response missing shape headers") from exc
+        # Zero-copy view over the response body
+        return np.frombuffer(response.content, dtype="<f4").reshape(rows, dim)
+
+    data = response.json()
+    embeddings = data.get("embeddings") or data.get("data")
+    if embeddings is None:
+        raise EmbeddingServiceError("Embedding service response missing 'embeddings'")
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
 def _safe_extract_error(response: httpx.Response) -> str:
     try:
         data = response.json()
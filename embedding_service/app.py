@@ -1,13 +1,25 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, List, Optional
+import os
 
-from fastapi import FastAPI, HTTPException
+import numpy as np
+from fastapi import FastAPI, HTTPException, Request, Response
 from pydantic import BaseModel, Field
 
+from batcher import MicroBatcher
 from encoder import get_encoder
 
 
+MICRO_BATCHING_ENABLED = os.getenv("EMBEDDING_MICRO_BATCHING", "true").lower() not in {"0", "false", "no"}
+
+# Compact response format: row-major little-endian float32, shape in headers.
+# Served only when the client lists it in Accept; JSON stays the default.
+FLOAT32_MEDIA_TYPE = "application/x-float32-matrix"
+
+
 class EmbedRequest(BaseModel):
     inputs: List[str] = Field(default_factory=list)
     normalize: Optional[bool] = None
@@ -17,7 +29,21 @@ class EmbedResponse(BaseModel):
     embeddings: List[List[float]]
 
 
-app = FastAPI(title="Embedding Service", version="1.0.0")
+@lru_cache(maxsize=1)
+def get_batcher() -> MicroBatcher:
+    return MicroBatcher(get_encoder())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if MICRO_BATCHING_ENABLED:
+        get_batcher().start()
+    yield
+    if MICRO_BATCHING_ENABLED:
+        await get_batcher().stop()
+
+
+app = FastAPI(title="Embedding Service", version="1.0.0", lifespan=lifespan)
 
 
 @app.get("/health")
@@ -39,19 +65,43 @@ async def dimension() -> dict[str, int]:
 
 
 @app.post("/embed", response_model=EmbedResponse)
-async def embed(request: EmbedRequest) -> EmbedResponse:
+async def embed(request: EmbedRequest, http_request: Request):
     encoder = get_encoder()
+    binary = FLOAT32_MEDIA_TYPE in http_request.headers.get("accept", "")
     if not request.inputs:
+        if binary:
+            return _float32_response(np.zeros((0, 0), dtype="<f4"))
         return EmbedResponse(embeddings=[])
 
     try:
-        vectors = encoder.encode(request.inputs, normalize=request.normalize)
+        if MICRO_BATCHING_ENABLED:
+            vectors = await get_batcher().submit(request.inputs, normalize=request.normalize)
+        else:
+            vectors = encoder.encode(request.inputs, normalize=request.normalize)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Failed to compute embeddings: {exc}") from exc
     if any(not isinstance(vec, list) for vec in vectors):
         raise HTTPException(status_code=500, detail="Invalid embedding output format")
+    if binary:
+        return _float32_response(np.asarray(vectors, dtype="<f4"))
     return EmbedResponse(embeddings=vectors)
 
 
+def _float32_response(matrix: np.ndarray) -> Response:
+    rows, dim = matrix.shape
+    return Response(
+        content=np.ascontiguousarray(matrix).tobytes(),
+        media_type=FLOAT32_MEDIA_TYPE,
+        headers={"X-Vector-Count": str(rows), "X-Vector-Dim": str(dim)},
+    )
+
+
+@app.get("/stats")
+async def stats() -> dict[str, Any]:
+    if not MICRO_BATCHING_ENABLED:
+        return {"micro_batching": False}
+    return {"micro_batching": True, **get_batcher().stats()}
+
+
 def create_app() -> FastAPI:
     return app
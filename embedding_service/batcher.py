@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+@dataclass
+class _Pending:
+    texts: List[str]
+    normalize: Optional[bool]
+    tokens: int
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class MicroBatcher:
+    """Coalesce concurrent /embed requests into shared forward passes.
+
+    Requests are queued; a single scheduler task waits up to ``max_wait_ms``
+    after the first arrival (or until ``max_batch_size`` texts / ``max_batch_tokens``
+    estimated tokens are queued), runs one ``encoder.encode`` call in a worker
+    thread, and scatters the rows back to each caller.
+    """
+
+    def __init__(
+        self,
+        encoder: Any,
+        *,
+        max_wait_ms: float | None = None,
+        max_batch_size: int | None = None,
+        max_batch_tokens: int | None = None,
+    ) -> None:
+        self.encoder = encoder
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else _env_float("EMBEDDING_BATCH_MAX_WAIT_MS", 5.0)) / 1000.0
+        self.max_batch_size = max(max_batch_size or _env_int("EMBEDDING_BATCH_MAX_SIZE", 64), 1)
+        self.max_batch_tokens = max(max_batch_tokens or _env_int("EMBEDDING_BATCH_MAX_TOKENS", 16384), 1)
+        self.max_length = _env_int("EMBEDDING_MAX_LENGTH", 512)
+
+        self._queue: asyncio.Queue[_Pending] = asyncio.Queue()
+        self._carry: Optional[_Pending] = None
+        self._task: Optional[asyncio.Task] = None
+        # One inference at a time: torch already parallelises inside a forward pass
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed-batch")
+
+        self._batches = 0
+        self._texts = 0
+        self._requests = 0
+        self._max_batch_seen = 0
+        self._wait_ms_total = 0.0
+        self._wait_ms_max = 0.0
+        self._inference_ms_total = 0.0
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._executor.shutdown(wait=False)
+
+    def _estimate_tokens(self, texts: List[str]) -> int:
+        # Rough sub-word estimate (~4 chars/token), capped at the model's truncation length
+        return sum(min(self.max_length, max(1, len(text) // 4)) for text in texts)
+
+    async def submit(self, texts: List[str], normalize: Optional[bool] = None) -> List[List[float]]:
+        if not texts:
+            return []
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(
+            _Pending(texts=list(texts), normalize=normalize, tokens=self._estimate_tokens(texts), future=future)
+        )
+        return await future
+
+    async def _next_item(self, timeout: Optional[float]) -> Optional[_Pending]:
+        if self._carry is not None:
+            item, self._carry = self._carry, None
+            return item
+        if timeout is None:
+            return await self._queue.get()
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout=max(timeout, 0.0))
+        except asyncio.TimeoutError:
+            return None
+
+    async def _collect(self) -> List[_Pending]:
+        first = await self._next_item(None)
+        batch = [first]
+        size, tokens = len(first.texts), first.tokens
+        deadline = time.perf_counter() + self.max_wait
+
+        while size < self.max_batch_size and tokens < self.max_batch_tokens:
+            item = await self._next_item(deadline - time.perf_counter())
+            if item is None:
+                break
+            if (
+                item.normalize != first.normalize
+                or size + len(item.texts) > self.max_batch_size
+                or tokens + item.tokens > self.max_batch_tokens
+            ):
+                # Does not fit this pass; it opens the next batch
+                self._carry = item
+                break
+            batch.append(item)
+            size += len(item.texts)
+            tokens += item.tokens
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            batch = [item for item in batch if not item.future.cancelled()]
+            if not batch:
+                continue
+
+            texts = [text for item in batch for text in item.texts]
+            started = time.perf_counter()
+            try:
+                vectors = await loop.run_in_executor(
+                    self._executor,
+                    lambda: self.encoder.encode(texts, normalize=batch[0].normalize),
+                )
+            except Exception as exc:
+                for item in batch:
+                    if not item.future.done():
+                        item.future.set_exception(exc)
+                continue
+
+            self._inference_ms_total += (time.perf_counter() - started) * 1000
+            for item in batch:
+                wait_ms = (started - item.enqueued_at) * 1000
+                self._wait_ms_total += wait_ms
+                self._wait_ms_max = max(self._wait_ms_max, wait_ms)
+            self._batches += 1
+            self._requests += len(batch)
+            self._texts += len(texts)
+            self._max_batch_seen = max(self._max_batch_seen, len(texts))
+
+            offset = 0
+            for item in batch:
+                rows = vectors[offset : offset + len(item.texts)]
+                offset += len(item.texts)
+                if not item.future.done():
+                    item.future.set_result(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        batches = self._batches or 1
+        requests = self._requests or 1
+        return {
+            "queue_depth": self._queue.qsize() + (1 if self._carry is not None else 0),
+            "batches": self._batches,
+            "requests": self._requests,
+            "texts": self._texts,
+            "avg_batch_size": self._texts / batches,
+            "avg_requests_per_batch": self._requests / batches,
+            "max_batch_size_seen": self._max_batch_seen,
+            "avg_wait_ms": self._wait_ms_total / requests,
+            "max_wait_ms": self._wait_ms_max,
+            "avg_inference_ms": self._inference_ms_total / batches,
+            "config": {
+                "max_wait_ms": self.max_wait * 1000,
+                "max_batch_size": self.max_batch_size,
+                "max_batch_tokens": self.max_batch_tokens,
+            },
+        }
@@ -5,6 +5,7 @@ import os
 from functools import lru_cache
 from typing import Any, List, Sequence
 
+import numpy as np
 import torch
 import transformers
 from huggingface_hub import login
@@ -14,6 +15,14 @@ from sentence_transformers import SentenceTransformer
 DEFAULT_MODEL_NAME = "google/embeddinggemma-300m"
 logger = logging.getLogger(__name__)
 
+_PARITY_SAMPLES = (
+    "Fix login redirect loop on the mobile app",
+    "Sprint planning notes for the payments module",
+    "As a project admin I want to archive completed cycles",
+    "Database migration fails when the workspace has no members",
+    "short",
+)
+
 
 def _resolve_token() -> str | None:
     """Return the first available Hugging Face token from known env vars."""
@@ -84,14 +93,15 @@ class EmbeddingEncoder:
         if tokenizer_revision:
             tokenizer_kwargs["revision"] = tokenizer_revision
 
+        sentence_transformer_kwargs: dict[str, Any] = {
+            "trust_remote_code": trust_remote,
+            "device": str(self.device),
+        }
+        if tokenizer_revision:
+            sentence_transformer_kwargs["revision"] = tokenizer_revision
+
         if backend_preference in {"sentence-transformers", "auto"}:
             try:
-                sentence_transformer_kwargs: dict[str, Any] = {
-                    "trust_remote_code": trust_remote,
-                    "device": str(self.device),
-                }
-                if tokenizer_revision:
-                    sentence_transformer_kwargs["revision"] = tokenizer_revision
                 self.sentence_transformer = SentenceTransformer(name, **sentence_transformer_kwargs)
                 self.backend = "sentence-transformers"
                 self.dimension = int(self.sentence_transformer.get_sentence_embedding_dimension())
@@ -129,6 +139,20 @@ class EmbeddingEncoder:
         if attn_impl:
             model_kwargs["attn_implementation"] = attn_impl
 
+        if backend_preference == "onnx":
+            self._init_onnx(name, model_kwargs, sentence_transformer_kwargs, requested_threads)
+        else:
+            self._load_torch_model(name, model_kwargs)
+
+        try:
+            probe = self.encode(["dimension probe"], normalize=False, batch_size=1)
+        except Exception as exc:
+            raise RuntimeError(f"Failed to warm up embedding model '{name}': {exc}") from exc
+        if not probe or not probe[0]:
+            raise RuntimeError("Failed to determine embedding dimension from model output")
+        self.dimension = len(probe[0])
+
+    def _load_torch_model(self, name: str, model_kwargs: dict[str, Any]) -> None:
         try:
             self.model = AutoModel.from_pretrained(name, **model_kwargs)
         except ValueError as model_exc:
@@ -144,13 +168,143 @@ class EmbeddingEncoder:
         self.model.eval()
         self.model.to(self.device)
 
+    def _init_onnx(
+        self,
+        name: str,
+        model_kwargs: dict[str, Any],
+        sentence_transformer_kwargs: dict[str, Any],
+        requested_threads: int,
+    ) -> None:
+        """Load (exporting on first use) an ONNX graph of the model, optionally int8-quantized."""
+        from onnx_backend import (
+            OnnxRuntimeSession,
+            clear_parity_record,
+            default_onnx_dir,
+            export_onnx,
+            quantize_onnx,
+            read_parity_record,
+            write_parity_record,
+        )
+
+        quantize = os.getenv("EMBEDDING_ONNX_QUANTIZE", "true").lower() in {"1", "true", "yes"}
+        parity_mode = os.getenv("EMBEDDING_ONNX_PARITY_CHECK", "export").lower()
+        onnx_dir = default_onnx_dir(name)
+        fp32_path = onnx_dir / "model.onnx"
+        path = onnx_dir / ("model.int8.onnx" if quantize else "model.onnx")
+
+        needs_export = not path.exists()
+        if needs_export:
+            # A record describes the graph it was computed for; never carry it over to a fresh export
+            clear_parity_record(path)
+        record = read_parity_record(path)
+        # "export" re-checks on every boot until a passing result is recorded for the cached graph,
+        # so a graph that failed once is never served unchecked later
+        run_parity = parity_mode in {"1", "true", "yes", "always"} or (
+            parity_mode == "export" and not (record or {}).get("passed")
+        )
+        if needs_export or run_parity:
+            self._load_torch_model(name, model_kwargs)
+        if run_parity:
+            self._load_parity_reference(name, sentence_transformer_kwargs)
+        if not fp32_path.exists():
+            export_onnx(self.model, self._pool_embeddings, self.tokenizer, fp32_path)
+        if quantize and not path.exists():
+            quantize_onnx(fp32_path, path)
+
         try:
-            probe = self.encode(["dimension probe"], normalize=False, batch_size=1)
+            onnx_threads = int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))
+        except ValueError:
+            onnx_threads = 0
+        self.onnx_session = OnnxRuntimeSession(path, intra_op_threads=onnx_threads or requested_threads or None)
+        self.backend = "onnx"
+
+        if run_parity:
+            min_cosine = float(os.getenv("EMBEDDING_ONNX_PARITY_MIN_COSINE", "0.98"))
+            max_norm_error = float(os.getenv("EMBEDDING_ONNX_PARITY_MAX_NORM_ERROR", "0.05"))
+            try:
+                report = self.parity_check()
+                failure = None
+                if report["min_cosine"] < min_cosine:
+                    failure = f"min cosine {report['min_cosine']:.4f} < {min_cosine:.4f}"
+                elif report["max_norm_error"] > max_norm_error:
+                    failure = f"norm error {report['max_norm_error']:.4f} > {max_norm_error:.4f}"
+            except ValueError as exc:
+                # e.g. a Dense module changes the output dimension
+                report, failure = {}, str(exc)
+            self.onnx_parity = report
+            write_parity_record(path, {
+                "passed": failure is None,
+                "reference": self.parity_reference,
+                "failure": failure,
+                "min_cosine_threshold": min_cosine,
+                "max_norm_error_threshold": max_norm_error,
+                "report": report,
+            })
+            if failure:
+                # Serve from the backend ONNX was compared against so vectors match the existing index
+                logger.warning(
+                    "ONNX backend failed parity against %s (%s) for %s; using %s backend",
+                    self.parity_reference,
+                    failure,
+                    name,
+                    self.parity_reference,
+                )
+                self.backend = self.parity_reference
+                self.onnx_session = None
+                if self.backend == "sentence-transformers" and hasattr(self, "model"):
+                    del self.model
+                return
+            logger.info("ONNX backend parity against %s for %s: %s", self.parity_reference, name, report)
+
+        if parity_mode == "always":
+            # Keep the reference loaded so parity_check() can be re-run (validate_onnx.py)
+            return
+        # The torch weights were only needed for export/parity; release them
+        if hasattr(self, "model"):
+            del self.model
+        self.sentence_transformer = None
+
+    def _load_parity_reference(self, name: str, sentence_transformer_kwargs: dict[str, Any]) -> None:
+        """Load the backend "auto" would serve, which is what ONNX vectors must agree with.
+
+        SentenceTransformer pipelines can add Dense/Normalize modules on top of
+        the transformer output; comparing only against the raw torch model
+        would miss that drift.
+        """
+        self.parity_reference = "transformers"
+        try:
+            self.sentence_transformer = SentenceTransformer(name, **sentence_transformer_kwargs)
+            self.parity_reference = "sentence-transformers"
         except Exception as exc:
-            raise RuntimeError(f"Failed to warm up embedding model '{name}': {exc}") from exc
-        if not probe or not probe[0]:
-            raise RuntimeError("Failed to determine embedding dimension from model output")
-        self.dimension = len(probe[0])
+            logger.warning("SentenceTransformer unavailable for ONNX parity of %s, comparing with torch: %s", name, exc)
+            self.sentence_transformer = None
+
+    def parity_check(self, texts: Sequence[str] | None = None) -> dict[str, float]:
+        """Compare ONNX embeddings against the backend they replace on sample texts."""
+        from onnx_backend import cosine_parity
+
+        reference_loaded = (
+            self.sentence_transformer is not None
+            if getattr(self, "parity_reference", None) == "sentence-transformers"
+            else hasattr(self, "model")
+        )
+        if getattr(self, "onnx_session", None) is None or not reference_loaded:
+            raise RuntimeError(
+                "Parity check needs both the ONNX session and the reference model loaded "
+                "(set EMBEDDING_ONNX_PARITY_CHECK=always)"
+            )
+        samples = list(texts or _PARITY_SAMPLES)
+        if self.parity_reference == "sentence-transformers":
+            reference = self.sentence_transformer.encode(
+                samples,
+                batch_size=8,
+                normalize_embeddings=False,
+                convert_to_numpy=True,
+            ).tolist()
+        else:
+            reference = self._encode_transformers(samples, normalize_flag=False, batch_size=8)
+        candidate = self._encode_onnx(samples, normalize_flag=False, batch_size=8)
+        return cosine_parity(reference, candidate)
 
     def encode(
         self,
@@ -163,7 +317,6 @@ class EmbeddingEncoder:
             return []
 
         normalize_flag = self.normalize if normalize is None else normalize
-        max_length = int(os.getenv("EMBEDDING_MAX_LENGTH", "512"))
         eff_batch_size = batch_size or int(os.getenv("EMBEDDING_BATCH_SIZE", "16"))
 
         if self.backend == "sentence-transformers" and self.sentence_transformer is not None:
@@ -175,10 +328,22 @@ class EmbeddingEncoder:
             )
             return [embedding.tolist() if hasattr(embedding, "tolist") else list(embedding) for embedding in embeddings]
 
+        if self.backend == "onnx":
+            return self._encode_onnx(texts, normalize_flag=normalize_flag, batch_size=eff_batch_size)
+        return self._encode_transformers(texts, normalize_flag=normalize_flag, batch_size=eff_batch_size)
+
+    def _encode_transformers(
+        self,
+        texts: Sequence[str],
+        *,
+        normalize_flag: bool,
+        batch_size: int,
+    ) -> List[List[float]]:
+        max_length = int(os.getenv("EMBEDDING_MAX_LENGTH", "512"))
         outputs: List[List[float]] = []
         with torch.inference_mode():
-            for start in range(0, len(texts), eff_batch_size):
-                batch = texts[start : start + eff_batch_size]
+            for start in range(0, len(texts), batch_size):
+                batch = list(texts[start : start + batch_size])
                 encoded = self.tokenizer(
                     batch,
                     padding=True,
@@ -199,6 +364,31 @@ class EmbeddingEncoder:
 
         return outputs
 
+    def _encode_onnx(
+        self,
+        texts: Sequence[str],
+        *,
+        normalize_flag: bool,
+        batch_size: int,
+    ) -> List[List[float]]:
+        max_length = int(os.getenv("EMBEDDING_MAX_LENGTH", "512"))
+        outputs: List[List[float]] = []
+        for start in range(0, len(texts), batch_size):
+            batch = list(texts[start : start + batch_size])
+            encoded = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=max_length,
+                return_tensors="np",
+            )
+            embeddings = self.onnx_session.run(encoded["input_ids"], encoded["attention_mask"]).astype(np.float32)
+            if normalize_flag:
+                norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+                embeddings = embeddings / np.clip(norms, 1e-12, None)
+            outputs.extend(embeddings.tolist())
+        return outputs
+
     def _pool_embeddings(self, outputs: Any, attention_mask: torch.Tensor) -> torch.Tensor:
         """Pool the raw model outputs into fixed-size sentence embeddings."""
         if hasattr(outputs, "sentence_embeddings"):
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def default_onnx_dir(model_name: str) -> Path:
+    """Directory for exported graphs; lives under HF_HOME so it shares the model cache volume."""
+    root = os.getenv("EMBEDDING_ONNX_DIR") or os.path.join(
+        os.getenv("HF_HOME", os.path.expanduser("~/.cache/huggingface")), "onnx"
+    )
+    return Path(root) / model_name.replace("/", "--")
+
+
+def export_onnx(
+    model: Any,
+    pool: Callable[[Any, Any], Any],
+    tokenizer: Any,
+    path: Path,
+    *,
+    opset: int = 17,
+) -> Path:
+    """Export ``model`` plus its pooling step as a single graph returning sentence embeddings."""
+    import torch
+
+    class _PooledModel(torch.nn.Module):
+        def __init__(self) -> None:
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask):
+            outputs = self.model(input_ids=input_ids, attention_mask=attention_mask)
+            return pool(outputs, attention_mask)
+
+    sample = tokenizer(["onnx export probe", "a second, longer probe sentence"], padding=True, return_tensors="pt")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with torch.inference_mode():
+        torch.onnx.export(
+            _PooledModel().eval(),
+            (sample["input_ids"], sample["attention_mask"]),
+            str(path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["embeddings"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "embeddings": {0: "batch"},
+            },
+            opset_version=opset,
+            do_constant_folding=True,
+        )
+    logger.info("Exported ONNX embedding graph to %s", path)
+    return path
+
+
+def quantize_onnx(source: Path, target: Path) -> Path:
+    """Dynamic (weight-only) int8 quantization; activations stay float at runtime."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    quantize_dynamic(str(source), str(target), weight_type=QuantType.QInt8)
+    logger.info("Wrote int8-quantized ONNX graph to %s", target)
+    return target
+
+
+def parity_record_path(graph: Path) -> Path:
+    """Parity outcome for ``graph`` is stored next to it, e.g. ``model.int8.onnx.parity.json``."""
+    return graph.with_name(graph.name + ".parity.json")
+
+
+def read_parity_record(graph: Path) -> Dict[str, Any] | None:
+    try:
+        with parity_record_path(graph).open("r", encoding="utf-8") as handle:
+            record = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def write_parity_record(graph: Path, record: Dict[str, Any]) -> None:
+    """Persist the parity outcome so later boots know whether the cached graph was ever validated."""
+    path = parity_record_path(graph)
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with tmp.open("w", encoding="utf-8") as handle:
+            json.dump(record, handle, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+    except OSError as exc:
+        logger.warning("Could not write ONNX parity record %s: %s", path, exc)
+
+
+def clear_parity_record(graph: Path) -> None:
+    try:
+        parity_record_path(graph).unlink()
+    except FileNotFoundError:
+        pass
+
+
+class OnnxRuntimeSession:
+    """Thin wrapper around an ``onnxruntime.InferenceSession`` tuned for small CPU containers."""
+
+    def __init__(self, path: Path, *, intra_op_threads: int | None = None) -> None:
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = max(intra_op_threads or os.cpu_count() or 1, 1)
+        options.inter_op_num_threads = 1
+        self.path = path
+        self.session = ort.InferenceSession(str(path), sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_names = {inp.name for inp in self.session.get_inputs()}
+
+    def run(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        feeds = {"input_ids": input_ids.astype(np.int64), "attention_mask": attention_mask.astype(np.int64)}
+        feeds = {name: value for name, value in feeds.items() if name in self.input_names}
+        return self.session.run(None, feeds)[0]
+
+
+def cosine_parity(reference: Sequence[Sequence[float]], candidate: Sequence[Sequence[float]]) -> Dict[str, float]:
+    """Row-wise cosine similarity and max absolute error between two embedding matrices."""
+    ref = np.asarray(reference, dtype=np.float32)
+    cand = np.asarray(candidate, dtype=np.float32)
+    if ref.shape != cand.shape:
+        raise ValueError(f"Shape mismatch: reference {ref.shape} vs candidate {cand.shape}")
+    ref_norms = np.linalg.norm(ref, axis=1)
+    cand_norms = np.linalg.norm(cand, axis=1)
+    cosine = np.sum(ref * cand, axis=1) / np.clip(ref_norms * cand_norms, 1e-12, None)
+    return {
+        "rows": int(ref.shape[0]),
+        "min_cosine": float(cosine.min()),
+        "mean_cosine": float(cosine.mean()),
+        "max_abs_error": float(np.abs(ref - cand).max()),
+        # Relative vector-length drift; catches a Normalize step the cosine cannot see
+        "max_norm_error": float(np.abs(cand_norms / np.clip(ref_norms, 1e-12, None) - 1.0).max()),
+    }
@@ -0,0 +1,38 @@
+"""Compare the ONNX embedding backend against the backend it replaces.
+
+The reference is the SentenceTransformer pipeline when it loads (what
+EMBEDDING_BACKEND=auto serves), otherwise the raw torch model.
+
+Usage (inside the embedding container):
+    EMBEDDING_BACKEND=onnx python validate_onnx.py ["text one" "text two" ...]
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+
+os.environ["EMBEDDING_BACKEND"] = "onnx"
+os.environ["EMBEDDING_ONNX_PARITY_CHECK"] = "always"
+
+from encoder import EmbeddingEncoder  # noqa: E402
+
+
+def main() -> int:
+    encoder = EmbeddingEncoder()
+    if encoder.backend != "onnx":
+        print("ONNX backend failed the startup parity threshold; see logs for details")
+        print(json.dumps({"reference": getattr(encoder, "parity_reference", None), "startup": getattr(encoder, "onnx_parity", {})}, indent=2))
+        return 1
+    report = encoder.parity_check(sys.argv[1:] or None)
+    report["reference"] = encoder.parity_reference
+    report["startup"] = encoder.onnx_parity
+    report["model"] = encoder.model_name
+    report["onnx_path"] = str(encoder.onnx_session.path)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -22,15 +22,25 @@ export async function getConversationMessages(conversationId: string): Promise<A
   workItem?: { title: string; description?: string; projectIdentifier?: string; sequenceId?: string | number; link?: string };
   page?: { title: string; blocks: { blocks: any[] } };
 }>> {
+  // The endpoint returns the newest page first; follow nextCursor back to the start
+  // so reopening a long conversation shows its full history.
+  const pages: any[][] = [];
+  let before: number | null = null;
   try {
-    const res = await fetch(`${API_HTTP_URL}/conversations/${encodeURIComponent(conversationId)}`);
-    if (!res.ok) throw new Error("failed");
-    const data = await res.json();
-    if (data && Array.isArray(data.messages)) return data.messages;
-    return [];
+    do {
+      const params = new URLSearchParams({ limit: "200" });
+      if (before !== null) params.set("before", String(before));
+      const res = await fetch(`${API_HTTP_URL}/conversations/${encodeURIComponent(conversationId)}?${params.toString()}`);
+      if (!res.ok) throw new Error("failed");
+      const data = await res.json();
+      if (!data || !Array.isArray(data.messages)) break;
+      pages.unshift(data.messages);
+      before = typeof data.nextCursor === "number" ? data.nextCursor : null;
+    } while (before !== null);
   } catch {
-    return [];
+    if (!pages.length) return [];
   }
+  return pages.flat();
 }
 
 export async function reactToMessage(args: { conversationId: string; messageId: string; liked?: boolean; feedback?: string }): Promise<boolean> {
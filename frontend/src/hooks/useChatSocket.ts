@@ -3,7 +3,7 @@ import { API_WS_URL } from "@/config";
 
 export type ChatEvent =
   | { type: "connected"; user_id: string; business_id?: string; timestamp: string }
-  | { type: "handshake_ack"; user_id: string; business_id: string; timestamp: string }
+  | { type: "handshake_ack"; user_id: string; business_id: string; token_coalescing?: { max_chars: number; max_delay_ms: number; sentence_boundary: boolean } | null; timestamp: string }
   | { type: "user_message"; content: string; conversation_id: string; timestamp: string }
   | { type: "llm_start"; timestamp: string }
   | { type: "token"; content: string; timestamp: string }
@@ -71,6 +71,8 @@ export function useChatSocket(options: UseChatSocketOptions = {}) {
               type: "handshake",
               member_id,
               business_id,
+              // Tokens are appended as they arrive, so batched token frames render the same
+              token_coalescing: true,
               timestamp: new Date().toISOString()
             }));
           } catch (e) {
@@ -18,10 +18,11 @@ logger = logging.getLogger(__name__)
 
 from agent.agent import AgentExecutor
 import os
-from websocket_handler import handle_chat_websocket, ws_manager,user_id_global,business_id_global
+from websocket_handler import handle_chat_websocket, ws_manager
 from qdrant.initializer import RAGTool
-from mongo.conversations import ensure_conversation_client_connected
+from mongo.conversations import ensure_conversation_client_connected, conversation_write_buffer
 from mongo.conversations import conversation_mongo_client, CONVERSATIONS_DB_NAME, CONVERSATIONS_COLLECTION_NAME ,TEMPLATES_COLLECTION_NAME
+from mongo.conversations import get_messages_page, normalize_message, list_conversations_page, conversation_summary, CONVERSATION_SUMMARY_PROJECTION
 from mongo.conversations import update_message_reaction
 from mongo.constants import mongodb_tools, DATABASE_NAME
 # Pydantic models for API requests/responses
@@ -170,7 +171,15 @@ async def lifespan(app: FastAPI):
         await ensure_conversation_client_connected()
     except Exception as e:
         logger.error(f"Conversations DB not connected: {e}")
-    yield
+    try:
+        yield
+    finally:
+        # Write out buffered conversation messages before anything else is torn down,
+        # even when the app is exiting because of an error
+        try:
+            await conversation_write_buffer.close()
+        except Exception as e:
+            logger.error(f"Failed to flush buffered conversation messages: {e}")
 
     # Shutdown
     await mongodb_agent.disconnect()
@@ -179,6 +188,18 @@ async def lifespan(app: FastAPI):
     from agent.memory import conversation_memory
     await conversation_memory.close()
 
+    # Release pooled embedding/SPLADE connections
+    try:
+        await RAGTool.get_instance().close()
+    except RuntimeError:
+        pass
+    from qdrant.query_cache import query_vector_cache
+    await query_vector_cache.close()
+    from mongo.member_projects import member_projects_cache
+    await member_projects_cache.close()
+    from agent.plan_cache import result_cache
+    await result_cache.close()
+
 # Create FastAPI app
 app = FastAPI(
     title="PMS Assistant API",
@@ -221,129 +242,81 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics/query-cache")
+async def query_cache_metrics():
+    """Hit-ratio and sizing stats for the RAG query vector cache."""
+    from qdrant.query_cache import query_vector_cache
+    return query_vector_cache.stats()
+
+
+@app.get("/metrics/member-projects-cache")
+async def member_projects_cache_metrics():
+    """Hit-ratio stats for the member -> projects RBAC cache."""
+    from mongo.member_projects import member_projects_cache
+    return member_projects_cache.stats()
+
+
+@app.get("/metrics/planner-cache")
+async def planner_cache_metrics():
+    """Hit-ratio stats for the query planner's intent/pipeline and result caches."""
+    from agent.plan_cache import plan_cache, result_cache
+    return {"plans": plan_cache.stats(), "results": result_cache.stats()}
+
+
 @app.get("/conversations")
 async def list_conversations():
     """List conversation ids and titles from Mongo."""
     try:
         coll = await conversation_mongo_client.get_collection(CONVERSATIONS_DB_NAME, CONVERSATIONS_COLLECTION_NAME)
-        cursor = coll.find({}, {"conversationId": 1, "messages": {"$slice": -1}, "updatedAt": 1}).sort("updatedAt", -1).limit(100)
+        cursor = coll.find({}, CONVERSATION_SUMMARY_PROJECTION).sort("updatedAt", -1).limit(100)
         results = []
         async for doc in cursor:
-            conv_id = doc.get("conversationId")
-            last = (doc.get("messages") or [{}])[-1] if doc.get("messages") else None
-            title = None
-            if last and isinstance(last, dict):
-                content = str(last.get("content") or "").strip()
-                if content:
-                    title = content[:60]
-            results.append({
-                "id": conv_id,
-                "title": title or f"Conversation {conv_id}",
-                "updatedAt": doc.get("updatedAt"),
-            })
+            summary = conversation_summary(doc)
+            results.append({"id": summary["id"], "title": summary["title"], "updatedAt": summary["updatedAt"]})
         return results
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/conversations/{conversation_id}")
-async def get_conversation(conversation_id: str):
-    """Get a conversation's messages and cache it in Redis for fast access."""
+async def get_conversation(conversation_id: str, before: Optional[int] = None, limit: int = 50):
+    """Get a page of a conversation's messages, newest page first.
+
+    Pass the returned ``nextCursor`` as ``before`` to fetch older messages.
+    """
     try:
         # Note: Cache is populated automatically when conversation is used
         # No need to pre-load - it happens on-demand during get_recent_context()
-        
-        coll = await conversation_mongo_client.get_collection(CONVERSATIONS_DB_NAME, CONVERSATIONS_COLLECTION_NAME)
-        doc = await coll.find_one({"conversationId": conversation_id})
-        if not doc:
-            return {"id": conversation_id, "messages": []}
-        messages = doc.get("messages") or []
-        # Normalize
-        norm = []
-        for m in messages:
-            if not isinstance(m, dict):
-                continue
-            entry = {
-                "id": m.get("id") or "",
-                "type": m.get("type") or "assistant",
-                "content": m.get("content") or "",
-                "timestamp": m.get("timestamp") or "",
-                "liked": m.get("liked"),
-                "feedback": m.get("feedback"),
-            }
-            # Pass through structured generated artifacts when present
-            if m.get("type") == "work_item" and isinstance(m.get("workItem"), dict):
-                entry["workItem"] = m.get("workItem")
-            if m.get("type") == "page" and isinstance(m.get("page"), dict):
-                entry["page"] = m.get("page")
-            if m.get("type") == "cycle" and isinstance(m.get("cycle"), dict):
-                entry["cycle"] = m.get("cycle")
-            if m.get("type") == "module" and isinstance(m.get("module"), dict):
-                entry["module"] = m.get("module")
-            if m.get("type") == "epic" and isinstance(m.get("epic"), dict):
-                entry["epic"] = m.get("epic")
-            norm.append(entry)
-        return {"id": conversation_id, "messages": norm}
+        page = await get_messages_page(conversation_id, before=before, limit=min(max(limit, 1), 200))
+        if not page:
+            return {"id": conversation_id, "messages": [], "nextCursor": None}
+        return {
+            "id": conversation_id,
+            "messages": [normalize_message(m) for m in page["messages"]],
+            "nextCursor": page["nextCursor"],
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 @app.get("/conversations/{user_id}/{business_id}")
-async def get_conversation(user_id: str, business_id: str):
-    """Get all conversations' messages for a given member_id and business_id."""
-    try:
-        coll = await conversation_mongo_client.get_collection(
-            CONVERSATIONS_DB_NAME, CONVERSATIONS_COLLECTION_NAME
-        )
-
-        # Find all matching conversations
-        cursor = coll.find({"memberId": user_id, "businessId": business_id})
-        docs = await cursor.to_list(length=None)
-
-        if not docs:
-            return {"id": user_id, "businessId": business_id, "conversations": []}
-
-        all_conversations = []
-
-        for doc in docs:
-            messages = doc.get("messages") or []
-            norm = []
-            for m in messages:
-                if not isinstance(m, dict):
-                    continue
-                entry = {
-                    "id": m.get("id") or "",
-                    "type": m.get("type") or "assistant",
-                    "content": m.get("content") or "",
-                    "timestamp": m.get("timestamp") or "",
-                    "liked": m.get("liked"),
-                    "feedback": m.get("feedback"),
-                }
-                # Pass through structured generated artifacts when present
-                if m.get("type") == "work_item" and isinstance(m.get("workItem"), dict):
-                    entry["workItem"] = m.get("workItem")
-                if m.get("type") == "page" and isinstance(m.get("page"), dict):
-                    entry["page"] = m.get("page")
-                if m.get("type") == "cycle" and isinstance(m.get("cycle"), dict):
-                    entry["cycle"] = m.get("cycle")
-                if m.get("type") == "module" and isinstance(m.get("module"), dict):
-                    entry["module"] = m.get("module")
-                if m.get("type") == "epic" and isinstance(m.get("epic"), dict):
-                    entry["epic"] = m.get("epic")
-                norm.append(entry)
-
-            all_conversations.append({
-                "conversationId": doc.get("conversationId"),
-                "messages": norm,
-            })
-
-        return {
-            "id": user_id,
-            "businessId": business_id,
-            "conversations": all_conversations,
-        }
+async def list_member_conversations(user_id: str, business_id: str, cursor: Optional[str] = None, limit: int = 20):
+    """Page through a member's conversations in a business, newest first.
 
+    Returns summaries only (id, title, last message preview, updatedAt); fetch
+    messages with ``GET /conversations/{conversation_id}``.
+    """
+    try:
+        page = await list_conversations_page(user_id, business_id, cursor=cursor, limit=min(max(limit, 1), 100))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "id": user_id,
+        "businessId": business_id,
+        "conversations": page["conversations"],
+        "nextCursor": page["nextCursor"],
+    }
 
 
 
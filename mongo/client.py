@@ -19,7 +19,31 @@ from mongo.constants import (
     COLLECTIONS_WITH_DIRECT_BUSINESS,
     BUSINESS_UUID,
     MEMBER_UUID,
+    MEMBER_RBAC_MODE,
 )
+from mongo.pipeline_optimizer import optimize_pipeline, summarize_explain
+
+# Field holding the owning project id, per collection scoped by member RBAC
+MEMBER_SCOPED_PROJECT_FIELDS = {
+    "project": "_id",
+    "workItem": "project._id",
+    "cycle": "project._id",
+    "module": "project._id",
+    "page": "project._id",
+    "projectState": "projectId",
+}
+
+
+def _merge_into_first_match(pipeline: List[Dict[str, Any]], condition: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Fold ``condition`` into the pipeline's leading $match (or prepend one) without mutating it."""
+    if pipeline and list(pipeline[0].keys()) == ["$match"] and isinstance(pipeline[0]["$match"], dict):
+        existing = pipeline[0]["$match"]
+        if any(key in existing for key in condition):
+            merged = {"$and": [existing, condition]}
+        else:
+            merged = {**condition, **existing}
+        return [{"$match": merged}] + pipeline[1:]
+    return [{"$match": condition}] + pipeline
 
 
 class DirectMongoClient:
@@ -68,7 +92,120 @@ class DirectMongoClient:
         self.connected = False
         self.client = None
 
-    async def aggregate(self, database: str, collection: str, pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    async def _scoped_pipeline(self, collection: str, pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return ``pipeline`` with business and member RBAC scoping applied for ``collection``."""
+        # --- Resolve RBAC context at query time ---
+        def _flag(name: str) -> bool:
+            return os.getenv(name, "").lower() in ("1", "true", "yes")
+
+        # Per-request member/business scope (mongo.request_context), resolved at query time
+        biz_uuid: str | None = BUSINESS_UUID()
+        member_uuid: str | None = MEMBER_UUID()
+        enforce_business: bool = _flag("ENFORCE_BUSINESS_FILTER") or bool(biz_uuid)
+        enforce_member: bool = _flag("ENFORCE_MEMBER_FILTER") or bool(member_uuid)
+
+        # Prepare business and member scoping injections (prepend stages)
+        injected_stages: List[Dict[str, Any]] = []
+        # Member scoping resolved to a plain filter, merged into the caller's first $match
+        member_match: Dict[str, Any] | None = None
+
+        # 1) Business scoping
+        if enforce_business and biz_uuid:
+            try:
+                biz_bin = uuid_str_to_mongo_binary(biz_uuid)
+                if collection in COLLECTIONS_WITH_DIRECT_BUSINESS:
+                    injected_stages.append({"$match": {"business._id": biz_bin}})
+                elif collection == "members":
+                    # Join project to filter by its business
+                    injected_stages.extend([
+                        {"$lookup": {
+                            "from": "project",
+                            "localField": "project._id",
+                            "foreignField": "_id",
+                            "as": "__biz_proj__"
+                        }},
+                        {"$match": {"__biz_proj__.business._id": biz_bin}},
+                        {"$unset": "__biz_proj__"},
+                    ])
+                elif collection == "projectState":
+                    injected_stages.extend([
+                        {"$lookup": {
+                            "from": "project",
+                            "localField": "projectId",
+                            "foreignField": "_id",
+                            "as": "__biz_proj__"
+                        }},
+                        {"$match": {"__biz_proj__.business._id": biz_bin}},
+                        {"$unset": "__biz_proj__"},
+                    ])
+            except ValueError as e:
+                # Invalid UUID format - log and skip business filter
+                logger.error(f"Invalid BUSINESS_UUID format '{biz_uuid}': {e}")
+            except Exception as e:
+                # Other errors - log and skip business filter
+                logger.error(f"Error applying business filter for {collection}: {e}")
+
+        # 2) Member-level project RBAC scoping
+        if enforce_member and member_uuid:
+            try:
+                mem_bin = uuid_str_to_mongo_binary(member_uuid)
+
+                def _membership_join(local_field: str) -> List[Dict[str, Any]]:
+                    """Build a $lookup + $match + $unset pipeline ensuring the document's project belongs to member."""
+                    return [
+                        {"$lookup": {
+                            "from": "members",
+                            "localField": local_field,
+                            "foreignField": "project._id",
+                            "as": "__mem__",
+                        }},
+                        # Ensure at least one membership document for this member
+                        # memberId is the staff ID (staff identifier)
+                        {"$match": {"__mem__": {"$elemMatch": {"$or": [
+                            {"memberId": mem_bin},
+                            {"staff._id": mem_bin}
+                        ]}}}},
+                        {"$unset": "__mem__"},
+                    ]
+
+                if collection == "members":
+                    # Only allow viewing own memberships
+                    # memberId is the staff ID (staff identifier)
+                    injected_stages.append({"$match": {"$or": [
+                        {"memberId": mem_bin},
+                        {"staff._id": mem_bin}
+                    ]}})
+                elif collection in MEMBER_SCOPED_PROJECT_FIELDS:
+                    project_field = MEMBER_SCOPED_PROJECT_FIELDS[collection]
+                    project_ids: List[str] = []
+                    if MEMBER_RBAC_MODE == "precomputed":
+                        from mongo.member_projects import member_projects_cache, project_ids_to_mongo
+                        project_ids = await member_projects_cache.get(member_uuid, biz_uuid)
+                    if project_ids:
+                        member_match = {project_field: {"$in": project_ids_to_mongo(project_ids)}}
+                    else:
+                        # No cached memberships (or lookup failed): keep the correlated join
+                        injected_stages.extend(_membership_join(project_field))
+                # Other collections: no-op
+            except ValueError as e:
+                # Invalid UUID format - log and skip member filter
+                logger.error(f"Invalid MEMBER_UUID format '{member_uuid}': {e}")
+            except Exception as e:
+                # Other errors - log and skip member filter
+                logger.error(f"Error applying member filter for {collection}: {e}")
+
+        effective_pipeline = _merge_into_first_match(pipeline, member_match) if member_match else pipeline
+        if injected_stages:
+            effective_pipeline = injected_stages + effective_pipeline
+        return effective_pipeline
+
+    async def aggregate(
+        self,
+        database: str,
+        collection: str,
+        pipeline: List[Dict[str, Any]],
+        optimize: bool = False,
+    ) -> List[Dict[str, Any]]:
         """Execute MongoDB aggregation pipeline directly
         
         This replaces mongodb_tools.execute_tool("aggregate", {...})
@@ -77,6 +214,7 @@ class DirectMongoClient:
             database: Database name
             collection: Collection name
             pipeline: MongoDB aggregation pipeline
+            optimize: Run the rule-based pipeline optimizer on the RBAC-scoped pipeline
             
         Returns:
             List of result documents
@@ -91,103 +229,15 @@ class DirectMongoClient:
                 raise RuntimeError("MongoDB client not initialized. Call connect() first.")
             
             try:
-                # --- Resolve RBAC context at query time ---
-                def _flag(name: str) -> bool:
-                    return os.getenv(name, "").lower() in ("1", "true", "yes")
-
-                # Prefer runtime websocket context; fall back to env vars (via helpers)
-                biz_uuid: str | None = BUSINESS_UUID()
-                member_uuid: str | None = MEMBER_UUID()
-                enforce_business: bool = _flag("ENFORCE_BUSINESS_FILTER") or bool(biz_uuid)
-                enforce_member: bool = _flag("ENFORCE_MEMBER_FILTER") or bool(member_uuid)
-
-                # Prepare business and member scoping injections (prepend stages)
-                injected_stages: List[Dict[str, Any]] = []
-
-                # 1) Business scoping
-                if enforce_business and biz_uuid:
-                    try:
-                        biz_bin = uuid_str_to_mongo_binary(biz_uuid)
-                        if collection in COLLECTIONS_WITH_DIRECT_BUSINESS:
-                            injected_stages.append({"$match": {"business._id": biz_bin}})
-                        elif collection == "members":
-                            # Join project to filter by its business
-                            injected_stages.extend([
-                                {"$lookup": {
-                                    "from": "project",
-                                    "localField": "project._id",
-                                    "foreignField": "_id",
-                                    "as": "__biz_proj__"
-                                }},
-                                {"$match": {"__biz_proj__.business._id": biz_bin}},
-                                {"$unset": "__biz_proj__"},
-                            ])
-                        elif collection == "projectState":
-                            injected_stages.extend([
-                                {"$lookup": {
-                                    "from": "project",
-                                    "localField": "projectId",
-                                    "foreignField": "_id",
-                                    "as": "__biz_proj__"
-                                }},
-                                {"$match": {"__biz_proj__.business._id": biz_bin}},
-                                {"$unset": "__biz_proj__"},
-                            ])
-                    except ValueError as e:
-                        # Invalid UUID format - log and skip business filter
-                        logger.error(f"Invalid BUSINESS_UUID format '{biz_uuid}': {e}")
-                    except Exception as e:
-                        # Other errors - log and skip business filter
-                        logger.error(f"Error applying business filter for {collection}: {e}")
-
-                # 2) Member-level project RBAC scoping
-                if enforce_member and member_uuid:
-                    try:
-                        mem_bin = uuid_str_to_mongo_binary(member_uuid)
-
-                        def _membership_join(local_field: str) -> List[Dict[str, Any]]:
-                            """Build a $lookup + $match + $unset pipeline ensuring the document's project belongs to member."""
-                            return [
-                                {"$lookup": {
-                                    "from": "members",
-                                    "localField": local_field,
-                                    "foreignField": "project._id",
-                                    "as": "__mem__",
-                                }},
-                                # Ensure at least one membership document for this member
-                                # memberId is the staff ID (staff identifier)
-                                {"$match": {"__mem__": {"$elemMatch": {"$or": [
-                                    {"memberId": mem_bin},
-                                    {"staff._id": mem_bin}
-                                ]}}}},
-                                {"$unset": "__mem__"},
-                            ]
-
-                        if collection == "members":
-                            # Only allow viewing own memberships
-                            # memberId is the staff ID (staff identifier)
-                            injected_stages.append({"$match": {"$or": [
-                                {"memberId": mem_bin},
-                                {"staff._id": mem_bin}
-                            ]}})
-                        elif collection == "project":
-                            injected_stages.extend(_membership_join("_id"))
-                        elif collection in ("workItem", "cycle", "module", "page"):
-                            injected_stages.extend(_membership_join("project._id"))
-                        elif collection == "projectState":
-                            injected_stages.extend(_membership_join("projectId"))
-                        # Other collections: no-op
-                    except ValueError as e:
-                        # Invalid UUID format - log and skip member filter
-                        logger.error(f"Invalid MEMBER_UUID format '{member_uuid}': {e}")
-                    except Exception as e:
-                        # Other errors - log and skip member filter
-                        logger.error(f"Error applying member filter for {collection}: {e}")
+                effective_pipeline = await self._scoped_pipeline(collection, pipeline)
+                if optimize:
+                    effective_pipeline, applied = optimize_pipeline(effective_pipeline)
+                    if applied:
+                        logger.debug(f"Pipeline optimizer on {collection}: {applied}")
 
                 # Execute aggregation - Motor uses persistent connection pool
                 db = self.client[database]
                 coll = db[collection]
-                effective_pipeline = (injected_stages + pipeline) if injected_stages else pipeline
                 cursor = coll.aggregate(effective_pipeline)
                 results = await cursor.to_list(length=None)
                 
@@ -199,6 +249,34 @@ class DirectMongoClient:
                 pass
                 raise
 
+    async def explain_optimization(self, database: str, collection: str, pipeline: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Compare explain(executionStats) cost of the scoped pipeline before and after optimization.
+
+        Debug aid only: executionStats runs both pipelines.
+        """
+        if not self.client:
+            raise RuntimeError("MongoDB client not initialized. Call connect() first.")
+
+        scoped = await self._scoped_pipeline(collection, pipeline)
+        optimized, applied = optimize_pipeline(scoped)
+        db = self.client[database]
+        report: Dict[str, Any] = {
+            "applied": applied,
+            "stages_before": len(scoped),
+            "stages_after": len(optimized),
+        }
+        for label, candidate in (("before", scoped), ("after", optimized)):
+            try:
+                explain = await db.command(
+                    "explain",
+                    {"aggregate": collection, "pipeline": candidate, "cursor": {}},
+                    verbosity="executionStats",
+                )
+                report[label] = summarize_explain(explain)
+            except Exception as e:
+                report[label] = {"error": str(e)}
+        return report
+
     async def aggregate_smart(self, database: str, collection: str, pipeline: List[Dict[str, Any]], project_id: str) -> List[Dict[str, Any]]:
         """Execute MongoDB aggregation pipeline directly
         
@@ -259,7 +337,7 @@ class DirectMongoClient:
             database = arguments.get("database", DATABASE_NAME)
             collection = arguments["collection"]
             pipeline = arguments["pipeline"]
-            return await self.aggregate(database, collection, pipeline)
+            return await self.aggregate(database, collection, pipeline, optimize=bool(arguments.get("optimize", False)))
         elif tool_name == "aggregate_smart":
             database = arguments.get("database", DATABASE_NAME)
             collection = arguments["collection"]
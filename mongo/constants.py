@@ -17,6 +17,11 @@ MONGODB_CONNECTION_STRING = os.getenv(
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY", "")
 QDRANT_URL = os.getenv("QDRANT_URL", "http://qdrant:6333")  # Default Qdrant URL
 QDRANT_COLLECTION_NAME = os.getenv("QDRANT_COLLECTION", "ProjectManagement")  # Collection for page and work item content
+# Transport for the request-path AsyncQdrantClient: gRPC is opt-in, REST connections are pooled
+QDRANT_PREFER_GRPC: bool = os.getenv("QDRANT_PREFER_GRPC", "false").lower() in {"1", "true", "yes"}
+QDRANT_GRPC_PORT: int = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+QDRANT_MAX_CONNECTIONS: int = int(os.getenv("QDRANT_MAX_CONNECTIONS", "64"))
+QDRANT_TIMEOUT: int = int(os.getenv("QDRANT_TIMEOUT", "30"))
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL")  # Sentence transformer model for embeddings
  
 # Retrieval packing configuration
@@ -38,48 +43,45 @@ class _LazyMongoDBTools:
 mongodb_tools = _LazyMongoDBTools()
 
 # --- Global business scoping ---
-# Business UUID to scope all queries/searches. Set via env or websocket context
+# Business UUID to scope all queries/searches. Set per request via mongo.request_context
 COLLECTIONS_WITH_DIRECT_BUSINESS = {"project", "workItem", "cycle", "module", "page", "epic", "features", "userStory"}
 
-def _get_business_uuid():
-    """Get business UUID from websocket context or environment variables."""
-    # Try websocket context first (dynamic)
-    try:
-        import websocket_handler as _ws_ctx
-        ws_business = getattr(_ws_ctx, "business_id_global", None)
-        if isinstance(ws_business, str) and ws_business:
-            return ws_business
-    except Exception:
-        pass
+# Member-level RBAC strategy used by DirectMongoClient.aggregate:
+#   "lookup" (default): per-document $lookup into members, always current
+#   "precomputed" (opt-in): resolve the member's project ids once (cached) and inject one indexed $in match.
+#     Relies on the data-sync consumer evicting rbac:member_projects:* on members changes; anything it
+#     misses stays visible until MEMBER_PROJECTS_TTL_SECONDS expires.
+MEMBER_RBAC_MODE = os.getenv("MEMBER_RBAC_MODE", "lookup").lower()
 
-    # Fall back to environment variables
-    return ""
+# Rule-based aggregation pipeline optimizer (mongo/pipeline_optimizer.py)
+PIPELINE_OPTIMIZER_ENABLED: bool = os.getenv("PIPELINE_OPTIMIZER", "true").lower() in {"1", "true", "yes"}
+# Debug mode: explain the pipeline before/after optimization (runs it twice more - do not enable in production)
+PIPELINE_OPTIMIZER_DEBUG: bool = os.getenv("PIPELINE_OPTIMIZER_DEBUG", "false").lower() in {"1", "true", "yes"}
+# localField/foreignField lookups with an inner pipeline require MongoDB 5.0+
+PIPELINE_OPTIMIZER_CONCISE_LOOKUPS: bool = os.getenv("PIPELINE_OPTIMIZER_CONCISE_LOOKUPS", "true").lower() in {"1", "true", "yes"}
+
+def _get_business_uuid():
+    """Get business UUID from the current request context."""
+    # Set per connection by websocket_handler (see mongo/request_context.py)
+    from mongo.request_context import current_business_id
+    return current_business_id()
 
 def _get_member_uuid():
-    """Get member UUID from websocket context or environment variables."""
-    # Try websocket context first (dynamic)
-    try:
-        import websocket_handler as _ws_ctx
-        ws_member = getattr(_ws_ctx, "user_id_global", None)
-        if isinstance(ws_member, str) and ws_member:
-            return ws_member
-    except Exception:
-        pass
-
-    # Fall back to environment variables
-    return ""
-# BUSINESS_UUID function that returns current value from websocket context or environment
+    """Get member UUID from the current request context."""
+    from mongo.request_context import current_member_id
+    return current_member_id()
+# BUSINESS_UUID function that returns current value from the request context
 def BUSINESS_UUID():
-    """Get current business UUID from websocket context or environment variables.
+    """Get current business UUID from the request context.
 
     Returns:
         str: Current business UUID or empty string if not available
     """
     return _get_business_uuid()
 
-# MEMBER_UUID function that returns current value from websocket context or environment
+# MEMBER_UUID function that returns current value from the request context
 def MEMBER_UUID():
-    """Get current member UUID from websocket context or environment variables.
+    """Get current member UUID from the request context.
 
     Returns:
         str: Current member UUID or empty string if not available
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
-from typing import Optional, Dict, Any
+from collections import defaultdict
+import base64
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 import uuid
 import asyncio
 import contextlib
+import weakref
 from motor.motor_asyncio import AsyncIOMotorClient
+from bson import json_util
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
 import os
 import logging
 from dotenv import load_dotenv
@@ -93,13 +98,41 @@ conversation_mongo_client = ConversationMongoClient(CONVERSATIONS_CONNECTION_STR
 
 CONVERSATIONS_DB_NAME = os.getenv("CONVERSATIONS_DB_NAME", "ProjectManagement")
 CONVERSATIONS_COLLECTION_NAME = os.getenv("CONVERSATIONS_COLLECTION_NAME", "conversations")
+# Messages live in fixed-size bucket documents next to the conversation header
+CONVERSATION_MESSAGES_COLLECTION_NAME = os.getenv("CONVERSATION_MESSAGES_COLLECTION_NAME", "conversationMessages")
+CONVERSATION_BUCKET_SIZE = int(os.getenv("CONVERSATION_BUCKET_SIZE", "50"))
+CONVERSATION_TITLE_LENGTH = 60
 TEMPLATES_COLLECTION_NAME = os.getenv("TEMPLATES_COLLECTION_NAME", "Templates")
+# Write-behind buffering of conversation appends (see ConversationWriteBuffer)
+CONVERSATION_FLUSH_INTERVAL_MS = int(os.getenv("CONVERSATION_FLUSH_INTERVAL_MS", "500"))
+CONVERSATION_BUFFER_MAX_MESSAGES = int(os.getenv("CONVERSATION_BUFFER_MAX_MESSAGES", "100"))
 
 
 async def ensure_conversation_client_connected():
     """Ensure the conversation MongoDB client is connected"""
     if not conversation_mongo_client.connected:
         await conversation_mongo_client.connect()
+        await ensure_conversation_indexes()
+
+
+async def ensure_conversation_indexes() -> None:
+    """Create the indexes the header/bucket layout relies on (idempotent)."""
+    try:
+        headers = await _get_collection()
+        buckets = await _get_bucket_collection()
+        await headers.create_index([("conversationId", ASCENDING)], name="conversationId", unique=True)
+        # Sidebar listing: equality on member/business, newest first, _id as tie-breaker
+        await headers.create_index(
+            [("memberId", ASCENDING), ("businessId", ASCENDING), ("updatedAt", DESCENDING), ("_id", DESCENDING)],
+            name="memberId_businessId_updatedAt",
+        )
+        await buckets.create_index(
+            [("conversationId", ASCENDING), ("bucket", ASCENDING)],
+            name="conversationId_bucket",
+            unique=True,
+        )
+    except Exception as e:
+        logger.error(f"Failed to ensure conversation indexes: {e}")
 
 
 async def cleanup_conversation_client():
@@ -121,23 +154,22 @@ def _ensure_message_shape(message: Dict[str, Any]) -> Dict[str, Any]:
 
 
 def _resolve_business_and_member_ids() -> Dict[str, str]:
-    """Resolve business and member identifiers from runtime websocket context or environment.
+    """Resolve business and member identifiers from the request context or environment.
 
     Returns keys: 'businessId' and 'memberId' with string values (possibly empty when unavailable).
     """
     business_id: str = ""
     member_id: str = ""
 
-    # Prefer runtime websocket context if available (set by websocket_handler)
+    # Prefer the per-connection request context (set by websocket_handler)
     try:
-        import websocket_handler as _ws_ctx  # dynamic import to avoid circular dependency at module import time
-        from constants import uuid_str_to_mongo_binary
-        ws_business = getattr(_ws_ctx, "business_id_global", None)
-        ws_member = getattr(_ws_ctx, "user_id_global", None)
-        if isinstance(ws_business, str) and ws_business:
-            business_id = uuid_str_to_mongo_binary(ws_business)
-        if isinstance(ws_member, str) and ws_member:
-            member_id = uuid_str_to_mongo_binary(ws_member)
+        from mongo.request_context import get_request_context
+        from mongo.constants import uuid_str_to_mongo_binary
+        ctx = get_request_context()
+        if ctx.business_id:
+            business_id = uuid_str_to_mongo_binary(ctx.business_id)
+        if ctx.member_id:
+            member_id = uuid_str_to_mongo_binary(ctx.member_id)
     except Exception:
         # Best-effort: fall back to environment below
         pass
@@ -155,37 +187,411 @@ async def _get_collection():
     return await conversation_mongo_client.get_collection(CONVERSATIONS_DB_NAME, CONVERSATIONS_COLLECTION_NAME)
 
 
-async def append_message(conversation_id: str, message: Dict[str, Any]) -> None:
-    coll = await _get_collection()
-    safe_message = _ensure_message_shape(message)
+async def _get_bucket_collection():
+    return await conversation_mongo_client.get_collection(CONVERSATIONS_DB_NAME, CONVERSATION_MESSAGES_COLLECTION_NAME)
+
+
+def _message_preview(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Short summary of a message kept on the header for conversation lists."""
+    content = str(message.get("content") or "").strip()
+    if not content:
+        artifact = message.get(ARTIFACT_FIELDS.get(message.get("type"), ""))
+        if isinstance(artifact, dict):
+            content = str(artifact.get("title") or "")
+    return {
+        "type": message.get("type"),
+        "content": content[:200],
+        "timestamp": message.get("timestamp"),
+    }
+
+
+async def append_messages(
+    conversation_id: str,
+    messages: List[Dict[str, Any]],
+    ctx_ids: Optional[Dict[str, str]] = None,
+) -> None:
+    """Append messages to a conversation's bucketed history.
+
+    The header document keeps ``messageCount``; reserving a range of sequence
+    numbers with ``$inc`` assigns each message a ``seq`` and therefore a bucket
+    (``seq // CONVERSATION_BUCKET_SIZE``). Each touched bucket receives one
+    ``$push``/``$each``, so appends never rewrite the whole history and no
+    document grows past a bucket's worth of messages.
+    """
+    if not messages:
+        return
+    headers = await _get_collection()
+    buckets = await _get_bucket_collection()
+    safe_messages = [_ensure_message_shape(message) for message in messages]
     # Resolve business/member identifiers and persist them at the document level
-    ctx_ids = _resolve_business_and_member_ids()
+    if ctx_ids is None:
+        ctx_ids = _resolve_business_and_member_ids()
 
+    now = _now_iso()
     set_on_insert: Dict[str, Any] = {
         "conversationId": conversation_id,
-        "createdAt": _now_iso(),
+        "createdAt": now,
     }
+    # Conversations are titled after the message that opened them
+    opening = _message_preview(safe_messages[0])["content"]
+    if opening:
+        set_on_insert["title"] = opening[:CONVERSATION_TITLE_LENGTH]
 
-    set_fields: Dict[str, Any] = {"updatedAt": _now_iso()}
+    set_fields: Dict[str, Any] = {"updatedAt": now, "lastMessage": _message_preview(safe_messages[-1])}
     # Also set/refresh IDs in case they were missing on existing docs
     if ctx_ids.get("businessId"):
         set_fields["businessId"] = ctx_ids["businessId"]
     if ctx_ids.get("memberId"):
         set_fields["memberId"] = ctx_ids["memberId"]
 
-    await coll.update_one(
+    header = await headers.find_one_and_update(
         {"conversationId": conversation_id},
         {
             "$setOnInsert": set_on_insert,
-            "$push": {"messages": safe_message},
             "$set": set_fields,
+            "$inc": {"messageCount": len(safe_messages)},
         },
         upsert=True,
+        projection={"messageCount": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    first_seq = int(header.get("messageCount") or 0) - len(safe_messages)
+
+    by_bucket: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    for offset, message in enumerate(safe_messages):
+        message["seq"] = first_seq + offset
+        by_bucket[message["seq"] // CONVERSATION_BUCKET_SIZE].append(message)
+
+    await buckets.bulk_write(
+        [
+            UpdateOne(
+                {"conversationId": conversation_id, "bucket": bucket},
+                {
+                    "$setOnInsert": {"createdAt": now},
+                    "$set": {"updatedAt": now},
+                    "$push": {"messages": {"$each": bucket_messages}},
+                    "$inc": {"count": len(bucket_messages)},
+                },
+                upsert=True,
+            )
+            for bucket, bucket_messages in by_bucket.items()
+        ],
+        ordered=False,
+    )
+
+
+async def append_message(conversation_id: str, message: Dict[str, Any]) -> None:
+    await append_messages(conversation_id, [message])
+
+
+class ConversationWriteBuffer:
+    """Per-conversation write-behind buffer for message appends.
+
+    ``enqueue`` only records the message, so callers on the streaming path
+    never wait on Mongo. A background task flushes every
+    ``CONVERSATION_FLUSH_INTERVAL_MS``; ``end_turn`` flushes a conversation as
+    soon as its response is complete, and ``close`` drains everything on
+    shutdown. Each flush is one ``append_messages`` call (one ``$push``/``$each``
+    per bucket). Flushes of the same conversation are serialized, so messages
+    keep their enqueue order.
+    """
+
+    def __init__(
+        self,
+        flush_interval_ms: int = CONVERSATION_FLUSH_INTERVAL_MS,
+        max_pending: int = CONVERSATION_BUFFER_MAX_MESSAGES,
+    ):
+        self.flush_interval = max(flush_interval_ms, 10) / 1000.0
+        self.max_pending = max(max_pending, 1)
+        # conversation_id -> [(message, ctx_ids)]
+        self._pending: Dict[str, List[tuple]] = {}
+        # Held by every flush of a conversation; dropped once no flush references it
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self._flusher: Optional[asyncio.Task] = None
+        self._background: set = set()
+        self.flushes = 0
+        self.flushed_messages = 0
+
+    def enqueue(self, conversation_id: str, message: Dict[str, Any]) -> None:
+        # Shape and resolve member/business now: flushes run in another task, outside this request's context
+        entry = (_ensure_message_shape(message), _resolve_business_and_member_ids())
+        pending = self._pending.setdefault(conversation_id, [])
+        pending.append(entry)
+        self._ensure_flusher()
+        if len(pending) == self.max_pending:
+            self._spawn(self.flush(conversation_id))
+
+    def end_turn(self, conversation_id: str) -> None:
+        """Schedule an immediate flush of ``conversation_id`` without waiting for it."""
+        if self._pending.get(conversation_id):
+            self._spawn(self.flush(conversation_id))
+
+    def pending_count(self) -> int:
+        return sum(len(entries) for entries in self._pending.values())
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush_all()
+
+    async def flush(self, conversation_id: str) -> None:
+        lock = self._locks.get(conversation_id)
+        if lock is None:
+            lock = self._locks[conversation_id] = asyncio.Lock()
+        async with lock:
+            entries = self._pending.pop(conversation_id, None)
+            if not entries:
+                return
+            written = 0
+            try:
+                # Consecutive messages sharing member/business ids go out as one append
+                while written < len(entries):
+                    ctx_ids = entries[written][1]
+                    run_end = written
+                    while run_end < len(entries) and entries[run_end][1] == ctx_ids:
+                        run_end += 1
+                    await append_messages(conversation_id, [m for m, _ in entries[written:run_end]], ctx_ids)
+                    written = run_end
+            except Exception as e:
+                logger.error(f"Failed to flush {len(entries) - written} message(s) for conversation {conversation_id}: {e}")
+                # Put the unwritten tail back ahead of anything enqueued meanwhile; retried next interval
+                self._pending[conversation_id] = entries[written:] + self._pending.get(conversation_id, [])
+            finally:
+                self.flushes += 1
+                self.flushed_messages += written
+
+    async def flush_all(self) -> None:
+        conversation_ids = [cid for cid, entries in self._pending.items() if entries]
+        if conversation_ids:
+            await asyncio.gather(*(self.flush(cid) for cid in conversation_ids))
+
+    async def close(self) -> None:
+        """Stop the background flusher and write out everything still buffered."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flusher
+            self._flusher = None
+        if self._background:
+            await asyncio.gather(*list(self._background), return_exceptions=True)
+        await self.flush_all()
+        if self._pending:
+            logger.error(f"Dropping {self.pending_count()} unflushed conversation message(s) on shutdown")
+            self._pending.clear()
+
+
+conversation_write_buffer = ConversationWriteBuffer()
+
+
+async def get_messages_page(
+    conversation_id: str,
+    before: Optional[int] = None,
+    limit: int = 50,
+) -> Optional[Dict[str, Any]]:
+    """Return up to ``limit`` messages with ``seq < before`` (newest page when ``before`` is None).
+
+    Messages come back in chronological order with ``nextCursor`` set to the
+    ``before`` value for the previous page (None once the start is reached).
+    Only the buckets covering the page are read. Conversations written before
+    bucketing keep their ``messages`` array on the header; those messages are
+    addressed with negative sequence numbers and served after the buckets.
+    Returns None when the conversation does not exist.
+    """
+    await conversation_write_buffer.flush(conversation_id)
+    headers = await _get_collection()
+    header = await headers.find_one(
+        {"conversationId": conversation_id},
+        {"messageCount": 1, "legacyCount": {"$size": {"$ifNull": ["$messages", []]}}},
     )
+    if not header:
+        return None
+
+    limit = max(1, limit)
+    message_count = int(header.get("messageCount") or 0)
+    legacy_count = int(header.get("legacyCount") or 0)
+    upper = message_count if before is None else min(before, message_count)
+
+    # Newest first while collecting
+    collected: List[Dict[str, Any]] = []
+    if upper > 0:
+        buckets = await _get_bucket_collection()
+        cursor = buckets.find(
+            {"conversationId": conversation_id, "bucket": {"$lte": (upper - 1) // CONVERSATION_BUCKET_SIZE}},
+            {"messages": 1},
+        ).sort("bucket", -1).batch_size(limit // CONVERSATION_BUCKET_SIZE + 2)
+        async for doc in cursor:
+            bucket_messages = [
+                m for m in (doc.get("messages") or [])
+                if isinstance(m, dict) and isinstance(m.get("seq"), int) and m["seq"] < upper
+            ]
+            collected.extend(sorted(bucket_messages, key=lambda m: m["seq"], reverse=True))
+            if len(collected) >= limit:
+                break
+
+    if len(collected) < limit and legacy_count:
+        # Legacy message i has seq i - legacy_count
+        legacy_upper = min(legacy_count, upper + legacy_count)
+        take = min(limit - len(collected), legacy_upper)
+        if take > 0:
+            legacy_doc = await headers.find_one(
+                {"conversationId": conversation_id},
+                {"messages": {"$slice": [legacy_upper - take, take]}},
+            )
+            legacy = (legacy_doc or {}).get("messages") or []
+            start_seq = legacy_upper - take - legacy_count
+            for offset in range(len(legacy) - 1, -1, -1):
+                if isinstance(legacy[offset], dict):
+                    collected.append({**legacy[offset], "seq": start_seq + offset})
+
+    page = collected[:limit]
+    page.reverse()
+    oldest = page[0]["seq"] if page else None
+    next_cursor = oldest if oldest is not None and oldest > -legacy_count else None
+    return {"messages": page, "nextCursor": next_cursor}
+
+
+async def get_all_messages(conversation_id: str) -> List[Dict[str, Any]]:
+    """Full chronological history (legacy array first, then every bucket)."""
+    await conversation_write_buffer.flush(conversation_id)
+    headers = await _get_collection()
+    header = await headers.find_one({"conversationId": conversation_id}, {"messages": 1})
+    if not header:
+        return []
+    messages = [m for m in (header.get("messages") or []) if isinstance(m, dict)]
+    buckets = await _get_bucket_collection()
+    async for doc in buckets.find({"conversationId": conversation_id}, {"messages": 1}).sort("bucket", 1):
+        bucket_messages = [m for m in (doc.get("messages") or []) if isinstance(m, dict)]
+        messages.extend(sorted(bucket_messages, key=lambda m: m.get("seq", 0)))
+    return messages
+
+
+def _encode_list_cursor(doc: Dict[str, Any]) -> str:
+    raw = json_util.dumps({"updatedAt": doc.get("updatedAt"), "_id": doc["_id"]})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_list_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        decoded = json_util.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+        return {"updatedAt": decoded["updatedAt"], "_id": decoded["_id"]}
+    except Exception as e:
+        raise ValueError(f"Invalid conversation cursor: {e}")
+
+
+def conversation_summary(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Sidebar entry for a conversation header (see ``CONVERSATION_SUMMARY_PROJECTION``)."""
+    conv_id = doc.get("conversationId")
+    # Bucketed conversations keep a preview on the header; older ones still have the array
+    last = doc.get("lastMessage") or ((doc.get("messages") or [None])[-1])
+    preview = _message_preview(last) if isinstance(last, dict) else None
+    title = doc.get("title") or (preview["content"][:CONVERSATION_TITLE_LENGTH] if preview else "")
+    return {
+        "id": conv_id,
+        "title": title or f"Conversation {conv_id}",
+        "lastMessage": preview,
+        "updatedAt": doc.get("updatedAt"),
+    }
+
+
+CONVERSATION_SUMMARY_PROJECTION = {
+    "conversationId": 1,
+    "title": 1,
+    "lastMessage": 1,
+    "updatedAt": 1,
+    # Only consulted for conversations written before lastMessage existed
+    "messages": {"$slice": -1},
+}
+
+
+def _id_variants(value: str) -> List[Any]:
+    """Match ids stored either as plain strings or as legacy Binary UUIDs."""
+    variants: List[Any] = [value]
+    try:
+        from mongo.constants import uuid_str_to_mongo_binary
+        variants.append(uuid_str_to_mongo_binary(value))
+    except Exception:
+        pass
+    return variants
+
+
+async def list_conversations_page(
+    member_id: str,
+    business_id: str,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+) -> Dict[str, Any]:
+    """Newest-first page of a member's conversations in a business.
+
+    Keyset pagination over ``(updatedAt, _id)`` served by the
+    ``memberId_businessId_updatedAt`` index, so each page costs O(limit)
+    regardless of how many conversations or messages exist. Pass the returned
+    ``nextCursor`` back as ``cursor`` for the next page.
+    """
+    headers = await _get_collection()
+    query: Dict[str, Any] = {
+        "memberId": {"$in": _id_variants(member_id)},
+        "businessId": {"$in": _id_variants(business_id)},
+    }
+    if cursor:
+        after = _decode_list_cursor(cursor)
+        query["$or"] = [
+            {"updatedAt": {"$lt": after["updatedAt"]}},
+            {"updatedAt": after["updatedAt"], "_id": {"$lt": after["_id"]}},
+        ]
+
+    limit = max(1, limit)
+    docs = await (
+        headers.find(query, CONVERSATION_SUMMARY_PROJECTION)
+        .sort([("updatedAt", DESCENDING), ("_id", DESCENDING)])
+        .limit(limit + 1)
+        .to_list(length=limit + 1)
+    )
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    return {
+        "conversations": [conversation_summary(doc) for doc in docs],
+        "nextCursor": _encode_list_cursor(docs[-1]) if has_more else None,
+    }
+
+
+# Structured payload field carried by each generated-artifact message type
+ARTIFACT_FIELDS = {
+    "work_item": "workItem",
+    "page": "page",
+    "cycle": "cycle",
+    "module": "module",
+    "epic": "epic",
+}
+
+
+def normalize_message(m: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a stored message for API responses."""
+    entry = {
+        "id": m.get("id") or "",
+        "type": m.get("type") or "assistant",
+        "content": m.get("content") or "",
+        "timestamp": m.get("timestamp") or "",
+        "liked": m.get("liked"),
+        "feedback": m.get("feedback"),
+    }
+    # Pass through structured generated artifacts when present
+    field = ARTIFACT_FIELDS.get(m.get("type"))
+    if field and isinstance(m.get(field), dict):
+        entry[field] = m.get(field)
+    return entry
 
 
 async def save_user_message(conversation_id: str, content: str) -> None:
-    await append_message(
+    conversation_write_buffer.enqueue(
         conversation_id,
         {
             "type": "user",
@@ -195,7 +601,7 @@ async def save_user_message(conversation_id: str, content: str) -> None:
 
 
 async def save_assistant_message(conversation_id: str, content: str) -> None:
-    await append_message(
+    conversation_write_buffer.enqueue(
         conversation_id,
         {
             "type": "assistant",
@@ -214,7 +620,7 @@ async def save_action_event(
 ) -> None:
     if kind != "action":
         return
-    await append_message(
+    conversation_write_buffer.enqueue(
         conversation_id,
         {
             "type": "action",
@@ -230,7 +636,7 @@ async def save_generated_work_item(conversation_id: str, work_item: Dict[str, An
 
     Expects a minimal payload: {title, description?, projectIdentifier?, sequenceId?, link?}
     """
-    await append_message(
+    conversation_write_buffer.enqueue(
         conversation_id,
         _ensure_message_shape({
             "type": "work_item",
@@ -255,7 +661,7 @@ async def save_generated_page(conversation_id: str, page: Dict[str, Any]) -> Non
     if not isinstance(blocks, dict) or not isinstance(blocks.get("blocks"), list):
         blocks = {"blocks": []}
 
-    await append_message(
+    conversation_write_buffer.enqueue(
         conversation_id,
         _ensure_message_shape({
             "type": "page",
@@ -273,7 +679,7 @@ async def save_generated_cycle(conversation_id: str, cycle: Dict[str, Any]) -> N
 
     Expects a minimal payload: {title, description?}
     """
-    await append_message(
+    conversation_write_buffer.enqueue(
         conversation_id,
         _ensure_message_shape({
             "type": "cycle",
@@ -291,7 +697,7 @@ async def save_generated_module(conversation_id: str, module: Dict[str, Any]) ->
 
     Expects a minimal payload: {title, description?}
     """
-    await append_message(
+    conversation_write_buffer.enqueue(
         conversation_id,
         _ensure_message_shape({
             "type": "module",
@@ -342,7 +748,7 @@ async def save_generated_epic(conversation_id: str, epic: Dict[str, Any]) -> Non
     if isinstance(epic.get("link"), str) and epic["link"].strip():
         epic_payload["link"] = epic["link"].strip()
 
-    await append_message(
+    conversation_write_buffer.enqueue(
         conversation_id,
         _ensure_message_shape({
             "type": "epic",
@@ -365,8 +771,6 @@ async def update_message_reaction(
     Optionally updates `messages.$.feedback` when provided.
     Returns True if a document was modified, False otherwise.
     """
-    coll = await _get_collection()
-
     update_doc: Dict[str, Any] = {}
 
     if liked is None:
@@ -379,9 +783,18 @@ async def update_message_reaction(
         # Ensure $set exists if we also need to update feedback
         update_doc.setdefault("$set", {})["messages.$.feedback"] = feedback
 
-    result = await coll.update_one(
+    # The message may still be waiting in the write-behind buffer
+    await conversation_write_buffer.flush(conversation_id)
+    buckets = await _get_bucket_collection()
+    result = await buckets.update_one(
         {"conversationId": conversation_id, "messages.id": message_id},
         update_doc,
     )
+    if getattr(result, "matched_count", 0) == 0:
+        # Message predates bucketing and still lives on the header document
+        coll = await _get_collection()
+        result = await coll.update_one(
+            {"conversationId": conversation_id, "messages.id": message_id},
+            update_doc,
+        )
     return getattr(result, "modified_count", 0) > 0
-
@@ -63,6 +63,9 @@ async def create_indexes():
     # Index for label filtering
     create_index_if_not_exists(db.workItem, [("label", 1)], "workItem_label")
 
+    # Index for project._id (member RBAC "$in" scoping and relationship lookups)
+    create_index_if_not_exists(db.workItem, [("project._id", 1)], "workItem_project_id")
+
     # 2. PROJECT COLLECTION INDEXES
 
     # Index for project status filtering (very common)
@@ -119,6 +122,9 @@ async def create_indexes():
     # Index for staff._id lookups (member identity)
     create_index_if_not_exists(db.members, [("staff._id", 1)], "members_staff_id")
 
+    # Index for memberId lookups (resolving a member's accessible projects)
+    create_index_if_not_exists(db.members, [("memberId", 1)], "members_member_id")
+
     # Compound index for (project._id, staff._id) to speed RBAC joins
     create_index_if_not_exists(db.members, [("project._id", 1), ("staff._id", 1)], "members_project_staff_compound")
 
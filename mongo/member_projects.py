@@ -0,0 +1,306 @@
+"""
+Member -> accessible projects cache used for RBAC scoping.
+
+Every RAG search scopes results to the projects a member belongs to, which
+used to cost a ``members`` aggregation (with a ``$lookup`` into ``project``)
+per tool call. Results are cached per (member, business):
+
+1. L1: process-wide TTLCache with a short TTL (bounds staleness per replica)
+2. L2: Redis hash ``rbac:member_projects:{member}`` with one field per business
+
+The data-sync consumer deletes the Redis hash when a ``members`` document for
+that member changes, so replicas pick up membership changes within the L1 TTL.
+Only used when ``MEMBER_RBAC_MODE=precomputed``; the Redis TTL is kept short
+so a missed invalidation is bounded to about a minute.
+"""
+
+from cachetools import TTLCache
+from threading import Lock
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import logging
+import os
+import uuid
+
+import redis.asyncio as aioredis
+from bson import Binary, ObjectId
+from redis.exceptions import RedisError
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Shared with data-sync/consumer/app/main.py, which invalidates these keys
+REDIS_KEY_PREFIX = "rbac:member_projects:"
+_NO_BUSINESS_FIELD = "_"
+
+
+def _normalize_mongo_id(mongo_id: Any) -> str:
+    """Convert Mongo _id (ObjectId or Binary UUID) into the string stored in Qdrant payloads."""
+    if isinstance(mongo_id, ObjectId):
+        return str(mongo_id)
+    if isinstance(mongo_id, Binary) and mongo_id.subtype == 3:
+        return str(uuid.UUID(bytes=mongo_id))
+    return str(mongo_id)
+
+
+def project_ids_to_mongo(project_ids: List[str]) -> List[Any]:
+    """Invert ``_normalize_mongo_id`` so cached ids can be used in Mongo ``$in`` filters."""
+    values: List[Any] = []
+    for project_id in project_ids:
+        if ObjectId.is_valid(project_id):
+            values.append(ObjectId(project_id))
+            continue
+        try:
+            values.append(Binary(uuid.UUID(project_id).bytes, 3))
+        except ValueError:
+            values.append(project_id)
+    return values
+
+
+def member_cache_id(member_uuid: str) -> str:
+    """Member id as the change stream sees it (Binary subtype 3 bytes read as a UUID).
+
+    The websocket hands us the canonical UUID string while ``memberId`` is stored
+    in JAVA_LEGACY byte order; keying on the stored form lets the consumer
+    invalidate without knowing about the legacy representation.
+    """
+    from mongo.constants import uuid_str_to_mongo_binary
+
+    try:
+        return str(uuid.UUID(bytes=uuid_str_to_mongo_binary(member_uuid)))
+    except Exception:
+        return member_uuid
+
+
+async def query_member_projects(member_uuid: str, business_uuid: Optional[str]) -> List[str]:
+    """Run the ``members`` aggregation and return normalized project ids."""
+    # Import here to avoid circular imports
+    from mongo.client import direct_mongo_client
+    from mongo.constants import uuid_str_to_mongo_binary
+
+    # memberId is the staff ID (staff identifier)
+    member_bin = uuid_str_to_mongo_binary(member_uuid)
+    pipeline: List[Dict[str, Any]] = [
+        {
+            "$match": {
+                "$or": [
+                    {"memberId": member_bin},
+                    {"staff._id": member_bin}
+                ]
+            }
+        }
+    ]
+
+    # Add business scoping if available - need to join with project collection first
+    if business_uuid:
+        biz_bin = uuid_str_to_mongo_binary(business_uuid)
+        pipeline.extend([
+            {
+                "$lookup": {
+                    "from": "project",
+                    "localField": "project._id",
+                    "foreignField": "_id",
+                    "as": "__biz_proj__"
+                }
+            },
+            {
+                "$match": {
+                    "__biz_proj__.business._id": biz_bin
+                }
+            },
+            {
+                "$unset": "__biz_proj__"
+            }
+        ])
+
+    pipeline.append({
+        "$project": {
+            "project_id": "$project._id"
+        }
+    })
+
+    results = await direct_mongo_client.aggregate("ProjectManagement", "members", pipeline)
+    project_ids: List[str] = []
+    for result in results:
+        if result.get("project_id"):
+            project_ids.append(_normalize_mongo_id(result["project_id"]))
+    return project_ids
+
+
+class MemberProjectsCache:
+    """TTL cache of member -> project ids with an optional Redis tier."""
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        l1_ttl_seconds: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        redis_url: Optional[str] = None,
+        use_redis: Optional[bool] = None,
+    ):
+        self.ttl_seconds = ttl_seconds or int(os.getenv("MEMBER_PROJECTS_TTL_SECONDS", "60"))
+        self.l1_ttl_seconds = l1_ttl_seconds or int(os.getenv("MEMBER_PROJECTS_L1_TTL_SECONDS", "30"))
+        self.l1_cache: TTLCache[str, List[str]] = TTLCache(
+            maxsize=maxsize or int(os.getenv("MEMBER_PROJECTS_CACHE_SIZE", "4096")),
+            ttl=self.l1_ttl_seconds,
+        )
+        self.l1_lock = Lock()
+
+        if use_redis is None:
+            use_redis = os.getenv("MEMBER_PROJECTS_CACHE_REDIS", "true").lower() in {"1", "true", "yes"}
+        self.use_redis = use_redis
+        self.redis_url = redis_url or os.getenv("REDIS_URL") or "redis://redis:6379/0"
+        self.redis_client: Optional[aioredis.Redis] = None
+        self._connection_lock = asyncio.Lock()
+        # Collapse concurrent misses for the same member into one aggregation
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _l1_key(member_id: str, business_uuid: Optional[str]) -> str:
+        return f"{member_id}:{business_uuid or _NO_BUSINESS_FIELD}"
+
+    async def _ensure_redis(self) -> Optional[aioredis.Redis]:
+        if not self.use_redis:
+            return None
+        if self.redis_client is not None:
+            return self.redis_client
+        async with self._connection_lock:
+            if self.redis_client is not None or not self.use_redis:
+                return self.redis_client
+            try:
+                client = aioredis.from_url(
+                    self.redis_url,
+                    encoding="utf-8",
+                    decode_responses=True,
+                    max_connections=20,
+                    socket_connect_timeout=2,
+                    socket_timeout=1,
+                )
+                await client.ping()
+                self.redis_client = client
+            except Exception as e:
+                logger.error(f"Member projects Redis tier unavailable, using in-process cache only: {e}")
+                self.use_redis = False
+        return self.redis_client
+
+    async def get(self, member_uuid: str, business_uuid: Optional[str]) -> List[str]:
+        """Return project ids the member can access, loading from Mongo on a miss.
+
+        Lookup failures are logged and return an empty list without being cached.
+        """
+        if not member_uuid:
+            return []
+        member_id = member_cache_id(member_uuid)
+        key = self._l1_key(member_id, business_uuid)
+        with self.l1_lock:
+            value = self.l1_cache.get(key)
+        if value is not None:
+            self.l1_hits += 1
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._load(member_uuid, member_id, business_uuid, key)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            logger.error(f"Error querying member projects: {e}")
+            future.set_result([])
+            return []
+        finally:
+            if not future.done():
+                future.cancel()
+            self._inflight.pop(key, None)
+
+    async def _load(self, member_uuid: str, member_id: str, business_uuid: Optional[str], key: str) -> List[str]:
+        redis_key = f"{REDIS_KEY_PREFIX}{member_id}"
+        field = business_uuid or _NO_BUSINESS_FIELD
+
+        client = await self._ensure_redis()
+        if client is not None:
+            try:
+                raw = await client.hget(redis_key, field)
+                if raw is not None:
+                    value = json.loads(raw)
+                    with self.l1_lock:
+                        self.l1_cache[key] = value
+                    self.l2_hits += 1
+                    return value
+            except (RedisError, ValueError) as e:
+                logger.warning(f"Member projects Redis read failed: {e}")
+
+        self.misses += 1
+        value = await query_member_projects(member_uuid, business_uuid)
+        with self.l1_lock:
+            self.l1_cache[key] = value
+
+        if client is not None:
+            try:
+                async with client.pipeline(transaction=False) as pipe:
+                    pipe.hset(redis_key, field, json.dumps(value))
+                    pipe.expire(redis_key, self.ttl_seconds)
+                    await pipe.execute()
+            except RedisError as e:
+                logger.warning(f"Member projects Redis write failed: {e}")
+        return value
+
+    async def invalidate(self, member_uuid: Optional[str] = None) -> None:
+        """Drop cached projects for one member (canonical UUID) or for everyone."""
+        with self.l1_lock:
+            if member_uuid is None:
+                self.l1_cache.clear()
+            else:
+                prefix = f"{member_cache_id(member_uuid)}:"
+                for key in [k for k in self.l1_cache.keys() if k.startswith(prefix)]:
+                    self.l1_cache.pop(key, None)
+
+        client = await self._ensure_redis()
+        if client is None:
+            return
+        try:
+            if member_uuid is not None:
+                await client.delete(f"{REDIS_KEY_PREFIX}{member_cache_id(member_uuid)}")
+                return
+            keys = [key async for key in client.scan_iter(match=f"{REDIS_KEY_PREFIX}*", count=500)]
+            if keys:
+                await client.delete(*keys)
+        except RedisError as e:
+            logger.warning(f"Member projects Redis invalidation failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        with self.l1_lock:
+            size = len(self.l1_cache)
+        return {
+            "lookups": lookups,
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.l1_hits + self.l2_hits) / lookups if lookups else 0.0,
+            "l1_size": size,
+            "l1_ttl_seconds": self.l1_ttl_seconds,
+            "ttl_seconds": self.ttl_seconds,
+            "redis_enabled": self.use_redis,
+        }
+
+    async def close(self) -> None:
+        if self.redis_client is not None:
+            try:
+                await self.redis_client.close()
+            except Exception:
+                pass
+            self.redis_client = None
+
+
+# Process-wide instance shared by ChunkAwareRetriever and RAGTool
+member_projects_cache = MemberProjectsCache()
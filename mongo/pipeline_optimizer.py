@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""Rule-based rewrites for aggregation pipelines before they hit MongoDB.
+
+PipelineGenerator (and the RBAC injection in DirectMongoClient) build
+pipelines stage by stage, so selective $match stages can land behind
+$lookups, projections come last and adjacent matches are never merged.
+The rewrites here are purely structural and only fire when field-reference
+analysis shows they cannot change the result:
+
+1. coalesce adjacent $match stages
+2. push $match stages ahead of $lookup / $unwind / $addFields that they do not depend on
+3. drop $lookups whose output is never referenced (and not unwound)
+4. trim joined documents with an inner $project (localField/foreignField
+   lookups use the MongoDB 5.0+ concise form so the foreign index is kept)
+5. insert an early $project so only referenced fields flow through joins and sorts
+"""
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+import copy
+import logging
+
+from mongo.constants import PIPELINE_OPTIMIZER_CONCISE_LOOKUPS
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Stages that decide the output shape; fields not referenced up to here never reach the client
+_CLOSING_STAGES = {"$group", "$count", "$bucket", "$bucketAuto", "$sortByCount"}
+# Stages whose field usage we do not model; analysis gives up when it meets one
+_OPAQUE_STAGES = {
+    "$facet", "$replaceRoot", "$replaceWith", "$merge", "$out", "$setWindowFields",
+    "$redact", "$densify", "$fill", "$documents", "$geoNear", "$search",
+}
+# Stages that only drop, reorder or duplicate documents without reading fields
+_NEUTRAL_STAGES = {"$limit", "$skip", "$sample", "$unionWith", "$unset"}
+# Stages that make document width matter enough to justify an early $project
+_WIDTH_SENSITIVE_STAGES = {"$lookup", "$graphLookup", "$unwind", "$sort", "$group", "$bucketAuto"}
+_WHOLE_DOCUMENT_VARS = ("$$ROOT", "$$CURRENT")
+
+_MAX_PASSES = 8
+
+
+def _stage_name(stage: Dict[str, Any]) -> str:
+    return next(iter(stage)) if isinstance(stage, dict) and len(stage) == 1 else ""
+
+
+def _touches(path: str, field: str) -> bool:
+    """True when ``path`` and ``field`` overlap (equal, or one is a dotted prefix of the other)."""
+    return path == field or path.startswith(field + ".") or field.startswith(path + ".")
+
+
+class _Unknown(Exception):
+    """Raised while collecting references when a stage cannot be analysed."""
+
+
+def _collect_value_refs(value: Any, refs: Set[str]) -> None:
+    """Collect ``$field.path`` strings from an expression tree."""
+    if isinstance(value, str):
+        if value.startswith(_WHOLE_DOCUMENT_VARS):
+            raise _Unknown(value)
+        if value.startswith("$") and not value.startswith("$$"):
+            refs.add(value[1:])
+    elif isinstance(value, dict):
+        for item in value.values():
+            _collect_value_refs(item, refs)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _collect_value_refs(item, refs)
+
+
+def _collect_match_refs(spec: Any, refs: Set[str]) -> None:
+    """Collect field paths used by a $match filter (keys are paths, $expr holds expressions)."""
+    if not isinstance(spec, dict):
+        return
+    for key, value in spec.items():
+        if key in ("$and", "$or", "$nor"):
+            for clause in value or []:
+                _collect_match_refs(clause, refs)
+        elif key == "$expr":
+            _collect_value_refs(value, refs)
+        elif key in ("$text", "$where", "$jsonSchema"):
+            raise _Unknown(key)
+        elif key.startswith("$"):
+            _collect_value_refs(value, refs)
+        else:
+            refs.add(key)
+
+
+def match_refs(spec: Dict[str, Any]) -> Optional[Set[str]]:
+    """Field paths a $match reads, or None when it cannot be moved safely."""
+    refs: Set[str] = set()
+    try:
+        _collect_match_refs(spec, refs)
+    except _Unknown:
+        return None
+    return refs
+
+
+def _is_expression(value: Dict[str, Any]) -> bool:
+    return any(isinstance(key, str) and key.startswith("$") for key in value)
+
+
+def _collect_projection_refs(spec: Dict[str, Any], refs: Set[str], prefix: str = "") -> bool:
+    """Collect the fields a $project keeps or reads; return True for an inclusion projection.
+
+    Nested specs (``{"project": {"name": 1}}``) keep ``project.name``; a field
+    set from an expression reads that expression's references and is recorded
+    too, since a same-named source field may be what it replaces. Shapes we do
+    not model raise _Unknown so callers leave the pipeline alone.
+    """
+    inclusion = False
+    for key, value in spec.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, bool) or value in (0, 1):
+            if value:
+                refs.add(path)
+                inclusion = inclusion or path != "_id"
+        elif isinstance(value, dict) and value and not _is_expression(value):
+            if _collect_projection_refs(value, refs, f"{path}."):
+                inclusion = True
+        elif isinstance(value, (dict, list)) or (isinstance(value, str) and value.startswith("$")):
+            _collect_value_refs(value, refs)
+            refs.add(path)
+            inclusion = True
+        else:
+            raise _Unknown(path)
+    return inclusion
+
+
+def _stage_refs(stage: Dict[str, Any], refs: Set[str]) -> bool:
+    """Add the fields ``stage`` reads to ``refs``; return True if it closes the document shape."""
+    name = _stage_name(stage)
+    body = stage.get(name)
+    if name == "$match":
+        _collect_match_refs(body, refs)
+    elif name == "$project":
+        if not isinstance(body, dict):
+            raise _Unknown(name)
+        return _collect_projection_refs(body, refs)
+    elif name in ("$addFields", "$set"):
+        if not isinstance(body, dict):
+            raise _Unknown(name)
+        _collect_value_refs(body, refs)
+        # Embedded-document values merge into the existing field, so the field itself is read
+        refs.update(body.keys())
+    elif name == "$sort":
+        refs.update(key for key, value in body.items() if not isinstance(value, dict))
+    elif name == "$unwind":
+        _collect_value_refs(body if isinstance(body, str) else body.get("path"), refs)
+    elif name == "$lookup":
+        if "localField" in body:
+            refs.add(body["localField"])
+        _collect_value_refs(body.get("let", {}), refs)
+    elif name == "$graphLookup":
+        _collect_value_refs(body.get("startWith"), refs)
+    elif name in _CLOSING_STAGES:
+        _collect_value_refs(body, refs)
+        return True
+    elif name in _NEUTRAL_STAGES:
+        pass
+    else:
+        # _OPAQUE_STAGES and anything we do not recognise
+        raise _Unknown(name)
+    return False
+
+
+def downstream_refs(pipeline: List[Dict[str, Any]], start: int, skip: Optional[int] = None) -> Optional[Set[str]]:
+    """Fields read by ``pipeline[start:]`` up to the first shape-closing stage.
+
+    Returns None when any field may reach the output (no closing stage) or a
+    stage cannot be analysed. ``skip`` excludes one stage index (the $unwind
+    paired with a $lookup being analysed).
+    """
+    refs: Set[str] = set()
+    try:
+        for index in range(start, len(pipeline)):
+            if index == skip:
+                continue
+            if _stage_refs(pipeline[index], refs):
+                return refs
+    except _Unknown:
+        return None
+    return None
+
+
+def merge_match(first: Dict[str, Any], second: Dict[str, Any]) -> Dict[str, Any]:
+    """Combine two $match filters; overlapping keys are kept apart under $and."""
+    if not first:
+        return dict(second)
+    if not second:
+        return dict(first)
+    if not set(first) & set(second):
+        return {**first, **second}
+    clauses: List[Dict[str, Any]] = []
+    for spec in (first, second):
+        if list(spec.keys()) == ["$and"]:
+            clauses.extend(spec["$and"])
+        else:
+            clauses.append(spec)
+    return {"$and": clauses}
+
+
+def _conjuncts(spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Split a filter into independently-movable AND clauses."""
+    clauses: List[Dict[str, Any]] = []
+    for key, value in spec.items():
+        if key == "$and" and isinstance(value, list):
+            for clause in value:
+                clauses.extend(_conjuncts(clause) if isinstance(clause, dict) else [{"$and": [clause]}])
+        else:
+            clauses.append({key: value})
+    return clauses
+
+
+def _join_conjuncts(clauses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    merged: Dict[str, Any] = {}
+    for clause in clauses:
+        merged = merge_match(merged, clause)
+    return merged
+
+
+def _unwound_path(stage: Dict[str, Any]) -> Optional[str]:
+    if _stage_name(stage) != "$unwind":
+        return None
+    body = stage["$unwind"]
+    path = body if isinstance(body, str) else body.get("path")
+    return path[1:] if isinstance(path, str) and path.startswith("$") else None
+
+
+def _unwind_preserves_docs(stage: Dict[str, Any]) -> bool:
+    body = stage["$unwind"]
+    return isinstance(body, dict) and bool(body.get("preserveNullAndEmptyArrays"))
+
+
+def _fields_written(stage: Dict[str, Any]) -> Optional[Set[str]]:
+    """Fields a stage writes, for stages a $match may be pushed across; None otherwise."""
+    name = _stage_name(stage)
+    if name == "$lookup":
+        return {stage["$lookup"].get("as", "")}
+    if name == "$unwind":
+        path = _unwound_path(stage)
+        if path is None:
+            return None
+        written = {path}
+        index_field = stage["$unwind"].get("includeArrayIndex") if isinstance(stage["$unwind"], dict) else None
+        if index_field:
+            written.add(index_field)
+        return written
+    if name in ("$addFields", "$set"):
+        return set(stage[name].keys())
+    return None
+
+
+def _prune_prefixed(paths: Set[str]) -> List[str]:
+    """Drop paths already covered by a shorter prefix (``a`` covers ``a.b``) to avoid projection collisions."""
+    kept: List[str] = []
+    for path in sorted(paths, key=lambda p: (p.count("."), p)):
+        if not any(path == k or path.startswith(k + ".") for k in kept):
+            kept.append(path)
+    return sorted(kept)
+
+
+class PipelineOptimizer:
+    """Applies the structural rewrites listed in the module docstring until a fixed point."""
+
+    def __init__(self, concise_lookups: bool = True):
+        # localField/foreignField + pipeline in one $lookup needs MongoDB 5.0+
+        self.concise_lookups = concise_lookups
+
+    def optimize(self, pipeline: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """Return an optimized copy of ``pipeline`` and how often each rule fired."""
+        stages = copy.deepcopy(pipeline or [])
+        applied: Dict[str, int] = {}
+
+        def _bump(rule: str, count: int) -> None:
+            if count:
+                applied[rule] = applied.get(rule, 0) + count
+
+        for _ in range(_MAX_PASSES):
+            changes = 0
+            for rule, fn in (
+                ("coalesce_match", self._coalesce_matches),
+                ("push_match", self._push_matches),
+                ("drop_lookup", self._drop_unused_lookups),
+            ):
+                count = fn(stages)
+                _bump(rule, count)
+                changes += count
+            if not changes:
+                break
+
+        _bump("lookup_projection", self._project_lookups(stages))
+        _bump("early_project", self._insert_early_project(stages))
+        return stages, applied
+
+    # --- rules -------------------------------------------------------------
+
+    def _coalesce_matches(self, stages: List[Dict[str, Any]]) -> int:
+        merged = 0
+        index = 0
+        while index < len(stages) - 1:
+            if _stage_name(stages[index]) == "$match" and _stage_name(stages[index + 1]) == "$match":
+                stages[index] = {"$match": merge_match(stages[index]["$match"], stages[index + 1]["$match"])}
+                del stages[index + 1]
+                merged += 1
+                continue
+            index += 1
+        return merged
+
+    def _push_matches(self, stages: List[Dict[str, Any]]) -> int:
+        moved = 0
+        index = 1
+        while index < len(stages):
+            if _stage_name(stages[index]) != "$match":
+                index += 1
+                continue
+            # Move each independent conjunct as far up as its own field references allow
+            staying: List[Dict[str, Any]] = []
+            hoisted: Dict[int, List[Dict[str, Any]]] = {}
+            for clause in _conjuncts(stages[index]["$match"]):
+                target = self._push_target(stages, index, clause)
+                if target == index:
+                    staying.append(clause)
+                else:
+                    hoisted.setdefault(target, []).append(clause)
+            if not hoisted:
+                index += 1
+                continue
+
+            if staying:
+                stages[index] = {"$match": _join_conjuncts(staying)}
+            else:
+                del stages[index]
+            # Insert from the bottom up so earlier targets keep their positions
+            for target in sorted(hoisted, reverse=True):
+                stages.insert(target, {"$match": _join_conjuncts(hoisted[target])})
+                moved += 1
+            index += len(hoisted) + (1 if staying else 0)
+        return moved
+
+    @staticmethod
+    def _push_target(stages: List[Dict[str, Any]], index: int, clause: Dict[str, Any]) -> int:
+        refs = match_refs(clause)
+        if refs is None:
+            return index
+        target = index
+        while target > 0:
+            written = _fields_written(stages[target - 1])
+            if written is None or any(_touches(ref, field) for ref in refs for field in written):
+                break
+            target -= 1
+        return target
+
+    def _drop_unused_lookups(self, stages: List[Dict[str, Any]]) -> int:
+        dropped = 0
+        index = 0
+        while index < len(stages):
+            if _stage_name(stages[index]) == "$lookup":
+                alias = stages[index]["$lookup"].get("as")
+                refs = downstream_refs(stages, index + 1)
+                # An unwound alias filters/multiplies documents, so it is used even if never read
+                if alias and refs is not None and not any(_touches(ref, alias) for ref in refs):
+                    del stages[index]
+                    dropped += 1
+                    continue
+            index += 1
+        return dropped
+
+    def _project_lookups(self, stages: List[Dict[str, Any]]) -> int:
+        rewritten = 0
+        for index, stage in enumerate(stages):
+            if _stage_name(stage) != "$lookup":
+                continue
+            body = stage["$lookup"]
+            alias = body.get("as")
+            inner = body.get("pipeline")
+            if not alias or (inner and _stage_name(inner[-1]) == "$project"):
+                continue
+            if "localField" in body and not self.concise_lookups:
+                continue
+
+            paired_unwind = None
+            if index + 1 < len(stages) and _unwound_path(stages[index + 1]) == alias:
+                paired_unwind = index + 1
+            refs = downstream_refs(stages, index + 1, skip=paired_unwind)
+            if refs is None:
+                continue
+            alias_refs = {ref for ref in refs if _touches(ref, alias)}
+            if alias in alias_refs or any(alias.startswith(ref + ".") for ref in alias_refs):
+                # Whole joined document is used
+                continue
+            # Positional segments ("pd.0.name") index the joined array; the projection
+            # applies to each joined document, so keep only the field names
+            subpaths_raw = {
+                ".".join(part for part in ref[len(alias) + 1:].split(".") if not part.isdigit())
+                for ref in alias_refs
+            }
+            if "" in subpaths_raw:
+                # A whole joined element is used ("pd.0")
+                continue
+            subpaths = _prune_prefixed(subpaths_raw)
+            projection: Dict[str, Any] = {"_id": 1}
+            projection.update({path: 1 for path in subpaths if path != "_id"})
+
+            body.setdefault("pipeline", []).append({"$project": projection})
+            rewritten += 1
+        return rewritten
+
+    def _insert_early_project(self, stages: List[Dict[str, Any]]) -> int:
+        lead = 0
+        while lead < len(stages) and _stage_name(stages[lead]) == "$match":
+            lead += 1
+        if lead >= len(stages) or _stage_name(stages[lead]) in ("$project", "$count", "$group"):
+            return 0
+        if not any(_stage_name(stage) in _WIDTH_SENSITIVE_STAGES for stage in stages[lead:]):
+            return 0
+
+        refs = downstream_refs(stages, lead)
+        if refs is None:
+            return 0
+        # Fields computed later (lookup aliases, $addFields) may be listed too: projecting a
+        # missing field is a no-op, and an alias can shadow a source field its join reads
+        top_level = {ref.split(".")[0] for ref in refs if ref}
+        projection: Dict[str, Any] = {"_id": 1}
+        projection.update({field: 1 for field in sorted(top_level) if field != "_id"})
+        stages.insert(lead, {"$project": projection})
+        return 1
+
+
+_default_optimizer = PipelineOptimizer(concise_lookups=PIPELINE_OPTIMIZER_CONCISE_LOOKUPS)
+
+
+def optimize_pipeline(pipeline: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """Optimize ``pipeline`` with the default rule set; never raises (falls back to the input)."""
+    try:
+        return _default_optimizer.optimize(pipeline)
+    except Exception as e:
+        logger.warning(f"Pipeline optimizer skipped: {e}")
+        return pipeline, {}
+
+
+def summarize_explain(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce an ``executionStats`` explain document to comparable cost numbers."""
+    summary = {"docs_examined": 0, "keys_examined": 0, "execution_ms": 0, "collscans": 0, "index_scans": 0}
+
+    def _walk(node: Any) -> None:
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key == "totalDocsExamined" and isinstance(value, (int, float)):
+                    summary["docs_examined"] += int(value)
+                elif key == "totalKeysExamined" and isinstance(value, (int, float)):
+                    summary["keys_examined"] += int(value)
+                elif key in ("executionTimeMillis", "executionTimeMillisEstimate") and isinstance(value, (int, float)):
+                    summary["execution_ms"] = max(summary["execution_ms"], int(value))
+                elif key == "stage" and value == "COLLSCAN":
+                    summary["collscans"] += 1
+                elif key == "stage" and value == "IXSCAN":
+                    summary["index_scans"] += 1
+                _walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                _walk(item)
+
+    _walk(explain)
+    return summary
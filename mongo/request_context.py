@@ -0,0 +1,60 @@
+"""
+Per-request member/business context.
+
+The chat WebSocket used to publish the current member and business through
+module globals in ``websocket_handler``, so two sockets served by the same
+worker could read each other's scope. The values now live in a ``ContextVar``:
+each connection's task sees only what it set, asyncio tasks spawned from it
+(``create_task``, ``gather``) and ``asyncio.to_thread`` calls inherit a copy,
+and ``BUSINESS_UUID()`` / ``MEMBER_UUID()`` in ``mongo.constants`` read from it.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+
+@dataclass(frozen=True)
+class RequestContext:
+    member_id: str = ""
+    business_id: str = ""
+
+
+_EMPTY = RequestContext()
+_request_context: ContextVar[RequestContext] = ContextVar("request_context", default=_EMPTY)
+
+
+def get_request_context() -> RequestContext:
+    return _request_context.get()
+
+
+def set_request_context(member_id: Optional[str] = None, business_id: Optional[str] = None) -> Token:
+    """Set the member/business for the current task; keeps values not passed."""
+    current = _request_context.get()
+    return _request_context.set(RequestContext(
+        member_id=member_id if isinstance(member_id, str) and member_id else current.member_id,
+        business_id=business_id if isinstance(business_id, str) and business_id else current.business_id,
+    ))
+
+
+def reset_request_context(token: Token) -> None:
+    _request_context.reset(token)
+
+
+@contextmanager
+def request_context(member_id: Optional[str] = None, business_id: Optional[str] = None) -> Iterator[RequestContext]:
+    """Scope a block (and anything it spawns) to the given member/business."""
+    token = set_request_context(member_id, business_id)
+    try:
+        yield _request_context.get()
+    finally:
+        reset_request_context(token)
+
+
+def current_member_id() -> str:
+    return _request_context.get().member_id
+
+
+def current_business_id() -> str:
+    return _request_context.get().business_id
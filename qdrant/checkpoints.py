@@ -0,0 +1,65 @@
+"""Resumable scan checkpoints for the bulk indexer (mirrors data-sync/qdrant/checkpoints.py).
+
+The last ``_id`` whose points reached Qdrant is recorded per content type in
+a JSON file (Extended JSON, so ObjectId and Binary ids keep their types).
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+import logging
+import os
+import threading
+
+from bson import json_util
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class CheckpointStore:
+    """Per-key progress in a JSON file, rewritten atomically on every save."""
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, Any]] = self._read()
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            return json_util.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except Exception as exc:
+            logger.warning(f"Ignoring unreadable checkpoint file {self.path}: {exc}")
+            return {}
+
+    def _write(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        tmp_path.write_text(json_util.dumps(self._data, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def get(self, key: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._data.get(key) or {})
+
+    def save(self, key: str, state: Dict[str, Any]) -> None:
+        with self._lock:
+            self._data[key] = state
+            self._write()
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self._write()
+
+
+def resume_query(query: Optional[Dict[str, Any]], last_id: Any) -> Dict[str, Any]:
+    """Restrict ``query`` to documents after ``last_id`` (scans are ordered by ``_id``)."""
+    base = dict(query or {})
+    if last_id is None:
+        return base
+    after = {"_id": {"$gt": last_id}}
+    if not base:
+        return after
+    return {"$and": [base, after]}
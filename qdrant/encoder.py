@@ -52,7 +52,7 @@ Dependencies: transformers, torch
 Model: naver/splade-cocondenser-ensembledistil (masked LM head)
 """
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Sequence, Tuple
 import threading
 
 
@@ -113,6 +113,36 @@ class SpladeEncoder:
 
         return {"indices": indices_list, "values": values_list}
 
+    def encode_texts(self, texts: Sequence[str], max_terms: int = 200, batch_size: int = 32) -> List[Dict[str, List[float]]]:
+        """Encode several texts with one padded forward pass per ``batch_size`` texts.
+
+        Padding positions are masked out before pooling, so each row matches
+        ``encode_text`` on the same input. Blank texts yield empty vectors.
+        """
+        results: List[Dict[str, List[float]]] = [{"indices": [], "values": []} for _ in texts]
+        positions = [i for i, text in enumerate(texts) if text and text.strip()]
+        torch = self.torch
+        for start in range(0, len(positions), batch_size):
+            batch_positions = positions[start:start + batch_size]
+            inputs = self.tokenizer(
+                [texts[i] for i in batch_positions],
+                return_tensors="pt",
+                truncation=True,
+                max_length=512,
+                padding=True,
+            )
+            with torch.no_grad():
+                logits = self.model(**inputs).logits  # [batch, seq_len, vocab]
+                mask = inputs["attention_mask"].unsqueeze(-1).to(logits.dtype)
+                aggregated = torch.log1p(torch.sum(torch.relu(logits) * mask, dim=1))  # [batch, vocab]
+
+            k = min(max_terms, aggregated.shape[-1])
+            values, indices = torch.topk(aggregated, k, dim=-1)
+            for position, row_values, row_indices in zip(batch_positions, values.tolist(), indices.tolist()):
+                kept = [(int(i), float(v)) for i, v in zip(row_indices, row_values) if v > 0]
+                results[position] = {"indices": [i for i, _ in kept], "values": [v for _, v in kept]}
+        return results
+
 
 def get_splade_encoder() -> SpladeEncoder:
     global _encoder_singleton
@@ -8,7 +8,8 @@ import uuid
 import logging
 from bson import ObjectId, Binary
 # Qdrant and RAG dependencies
-from qdrant_client import QdrantClient
+import httpx
+from qdrant_client import AsyncQdrantClient
 from qdrant_client.models import (
     Filter,
     FieldCondition,
@@ -20,12 +21,16 @@ from qdrant_client.models import (
     Fusion,
     SparseVector,
 )
-from embedding.service_client import EmbeddingServiceClient, EmbeddingServiceError
+from embedding.service_client import AsyncEmbeddingServiceClient, EmbeddingServiceClient, EmbeddingServiceError
+from splade import AsyncSpladeServiceClient
 from sentence_transformers import SentenceTransformer
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Per-call timeout (seconds) for query-time embedding/SPLADE requests
+RAG_ENCODE_TIMEOUT = float(os.getenv("RAG_ENCODE_TIMEOUT", "10"))
+
 class RAGTool:
     """
     RAG tool as a Singleton, designed for eager initialization at server startup.
@@ -43,6 +48,7 @@ class RAGTool:
             instance = cls.__new__(cls)
             instance.qdrant_client = None
             instance.embedding_client = None
+            instance.splade_client = None
             instance.connected = False
 
             await instance.connect()
@@ -91,16 +97,35 @@ class RAGTool:
         if self.connected:
             return
         try:
-            self.qdrant_client = QdrantClient(url=mongo.constants.QDRANT_URL, api_key=mongo.constants.QDRANT_API_KEY)
-            try:
-                self.embedding_client = SentenceTransformer(mongo.constants.EMBEDDING_MODEL)
-            except Exception as e:
-                print(f"⚠ Failed to load embedding model '{mongo.constants.EMBEDDING_MODEL}': {e}\nFalling back to 'sentence-transformers/all-MiniLM-L6-v2'")
+            # One AsyncQdrantClient is shared by every retriever, so concurrent rag_search calls
+            # overlap on a single connection pool (or gRPC channel) instead of blocking the loop.
+            self.qdrant_client = AsyncQdrantClient(
+                url=mongo.constants.QDRANT_URL,
+                api_key=mongo.constants.QDRANT_API_KEY or None,
+                prefer_grpc=mongo.constants.QDRANT_PREFER_GRPC,
+                grpc_port=mongo.constants.QDRANT_GRPC_PORT,
+                timeout=mongo.constants.QDRANT_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=mongo.constants.QDRANT_MAX_CONNECTIONS,
+                    max_keepalive_connections=mongo.constants.QDRANT_MAX_CONNECTIONS,
+                ),
+            )
+            # Prefer the pooled async service clients so query encoding never blocks the event loop;
+            # fall back to an in-process model when the embedding service is not configured.
+            if os.getenv("EMBEDDING_SERVICE_URL"):
+                self.embedding_client = AsyncEmbeddingServiceClient(timeout=RAG_ENCODE_TIMEOUT)
+            else:
+                try:
+                    self.embedding_client = SentenceTransformer(mongo.constants.EMBEDDING_MODEL)
+                except Exception as e:
+                    print(f"⚠ Failed to load embedding model '{mongo.constants.EMBEDDING_MODEL}': {e}\nFalling back to 'sentence-transformers/all-MiniLM-L6-v2'")
+            if os.getenv("SPLADE_SERVICE_URL"):
+                self.splade_client = AsyncSpladeServiceClient(timeout=RAG_ENCODE_TIMEOUT)
             self.connected = True
             print(f"Successfully connected to Qdrant at {mongo.constants.QDRANT_URL}")
             # Lightweight verification that sparse vectors are configured and present
             try:
-                col = self.qdrant_client.get_collection(mongo.constants.QDRANT_COLLECTION_NAME)
+                col = await self.qdrant_client.get_collection(mongo.constants.QDRANT_COLLECTION_NAME)
                 # If call succeeds, we assume sparse config exists as we create it during indexing
                 print(f"ℹ Collection loaded: {getattr(col, 'name', mongo.constants.QDRANT_COLLECTION_NAME)}")
             except Exception as e:
@@ -110,6 +135,21 @@ class RAGTool:
             raise
 
 
+    async def close(self):
+        """Release pooled connections held by the async Qdrant and service clients."""
+        for client in (self.embedding_client, self.splade_client):
+            aclose = getattr(client, "aclose", None)
+            if aclose is not None:
+                try:
+                    await aclose()
+                except Exception as e:
+                    logger.warning(f"Failed to close RAG client: {e}")
+        if self.qdrant_client is not None:
+            try:
+                await self.qdrant_client.close()
+            except Exception as e:
+                logger.warning(f"Failed to close Qdrant client: {e}")
+
     # ... all other methods like search_content() and get_content_context() remain unchanged ...
     async def search_content(self, query: str, content_type: str = None, limit: int = 5) -> List[Dict[str, Any]]:
         """Search for relevant content in Qdrant with dense+SPLADE hybrid fusion."""
@@ -117,11 +157,9 @@ class RAGTool:
             await self.connect()
 
         try:
-            # Generate embedding for the query
-            query_vectors = self.embedding_client.encode([query])
-            if not query_vectors:
-                return []
-            query_embedding = query_vectors[0]
+            # Generate dense and sparse query vectors concurrently
+            from qdrant.retrieval import encode_query
+            query_embedding, splade_vec = await encode_query(query, self.embedding_client, self.splade_client)
             # Build filter if content_type is specified
             from mongo.constants import BUSINESS_UUID, MEMBER_UUID
             must_conditions = []
@@ -182,11 +220,7 @@ class RAGTool:
 
             sparse_added = False
             try:
-                from qdrant.encoder import get_splade_encoder
-                from qdrant.retrieval import extract_keywords
-                splade = get_splade_encoder()
-                splade_vec = splade.encode_text(query)
-                if splade_vec.get("indices"):
+                if splade_vec and splade_vec.get("indices"):
                     prefetch_list.append(
                         Prefetch(
                             query=NearestQuery(
@@ -217,7 +251,7 @@ class RAGTool:
                 )
 
             fusion = FusionQuery(fusion=Fusion.RRF)
-            response = self.qdrant_client.query_points(
+            response = await self.qdrant_client.query_points(
                 collection_name=mongo.constants.QDRANT_COLLECTION_NAME,
                 prefetch=prefetch_list,
                 query=fusion,
@@ -317,71 +351,16 @@ class RAGTool:
         """
         Get list of project IDs that the member has access to.
 
+        Served from the shared member-projects cache (in-process + Redis), which
+        falls back to the ``members`` aggregation on a miss.
+
         Args:
             member_uuid: The member's UUID
             business_uuid: The business UUID for additional scoping
 
         Returns:
-            List of project IDs the member can access
+            List of project IDs the member can access (normalized like Qdrant expects)
         """
-        try:
-            # Import here to avoid circular imports
-            from mongo.client import direct_mongo_client
-            from mongo.constants import uuid_str_to_mongo_binary
-
-            # Query MongoDB to get projects the member is associated with
-            # memberId is the staff ID (staff identifier)
-            member_bin = uuid_str_to_mongo_binary(member_uuid)
-            pipeline = [
-                {
-                    "$match": {
-                        "$or": [
-                            {"memberId": member_bin},
-                            {"staff._id": member_bin}
-                        ]
-                    }
-                }
-            ]
-
-            # Add business scoping if available - need to join with project collection first
-            if business_uuid:
-                biz_bin = uuid_str_to_mongo_binary(business_uuid)
-                pipeline.extend([
-                    {
-                        "$lookup": {
-                            "from": "project",
-                            "localField": "project._id",
-                            "foreignField": "_id",
-                            "as": "__biz_proj__"
-                        }
-                    },
-                    {
-                        "$match": {
-                            "__biz_proj__.business._id": biz_bin
-                        }
-                    },
-                    {
-                        "$unset": "__biz_proj__"
-                    }
-                ])
-
-            # Project the project_id
-            pipeline.append({
-                "$project": {
-                    "project_id": "$project._id"
-                }
-            })
-
-            results = await direct_mongo_client.aggregate("ProjectManagement", "members", pipeline)
+        from mongo.member_projects import member_projects_cache
 
-            # Extract project IDs and convert back to string format using same normalization as Qdrant
-            project_ids = []
-            for result in results:
-                if result.get("project_id"):
-                    project_ids.append(self._normalize_mongo_id(result["project_id"]))
-
-            return project_ids
-
-        except Exception as e:
-            logger.error(f"Error querying member projects: {e}")
-            return [] 
\ No newline at end of file
+        return await member_projects_cache.get(member_uuid, business_uuid) 
\ No newline at end of file
@@ -3,6 +3,8 @@ import sys
 import json
 import uuid
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from itertools import islice
 from bson.binary import Binary
 from bson.objectid import ObjectId
@@ -17,7 +19,7 @@ from qdrant_client.http.models import (
 )
 from embedding.service_client import EmbeddingServiceClient, EmbeddingServiceError
 from collections import defaultdict
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional, Tuple
 
 # Add the parent directory to sys.path so we can import from qdrant
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -38,6 +40,8 @@ from huggingface_hub import login
 import re
 import html as html_lib
 from qdrant.encoder import get_splade_encoder
+from qdrant.checkpoints import CheckpointStore, resume_query
+from bson import json_util
 
 # Load .env file and authenticate HuggingFace
 load_dotenv()
@@ -63,6 +67,8 @@ class ChunkingStats:
     """Track and display chunking statistics during indexing."""
     
     def __init__(self):
+        # Shards of the concurrent reindex driver record into the same instance
+        self.lock = threading.Lock()
         self.by_type = defaultdict(lambda: {
             "total_docs": 0,
             "single_chunk": 0,
@@ -76,20 +82,21 @@ class ChunkingStats:
     
     def record(self, content_type: str, doc_id: str, title: str, chunk_count: int, word_count: int):
         """Record chunking info for a document."""
-        stats = self.by_type[content_type]
-        stats["total_docs"] += 1
-        stats["total_chunks"] += chunk_count
-        stats["total_words"] += word_count
-        stats["chunk_distribution"][chunk_count] += 1
-        
-        if chunk_count == 1:
-            stats["single_chunk"] += 1
-        else:
-            stats["multi_chunk"] += 1
-        
-        if chunk_count > stats["max_chunks"]:
-            stats["max_chunks"] = chunk_count
-            stats["max_chunks_doc"] = (doc_id, title[:50])
+        with self.lock:
+            stats = self.by_type[content_type]
+            stats["total_docs"] += 1
+            stats["total_chunks"] += chunk_count
+            stats["total_words"] += word_count
+            stats["chunk_distribution"][chunk_count] += 1
+
+            if chunk_count == 1:
+                stats["single_chunk"] += 1
+            else:
+                stats["multi_chunk"] += 1
+
+            if chunk_count > stats["max_chunks"]:
+                stats["max_chunks"] = chunk_count
+                stats["max_chunks_doc"] = (doc_id, title[:50])
     
 
 # Global stats instance
@@ -438,6 +445,243 @@ def upload_in_batches(points, collection_name, batch_size=20):
             logger.error(f"Failed to upload batch: {e}")
     return total_indexed
 
+
+# Streaming indexer sizing: documents per Mongo cursor batch, chunks per encode call,
+# points per upsert and how many upserts may be in flight before encoding blocks
+INDEX_BATCH_DOCS = int(os.getenv("INDEX_BATCH_DOCS", "64"))
+INDEX_BATCH_CHUNKS = int(os.getenv("INDEX_BATCH_CHUNKS", "128"))
+INDEX_UPLOAD_BATCH = int(os.getenv("INDEX_UPLOAD_BATCH", "64"))
+INDEX_UPLOAD_WORKERS = int(os.getenv("INDEX_UPLOAD_WORKERS", "2"))
+INDEX_MAX_PENDING_UPLOADS = int(os.getenv("INDEX_MAX_PENDING_UPLOADS", "4"))
+# Encode calls in flight across all indexers in this process; size to what the
+# embedding and SPLADE services can serve concurrently
+INDEX_ENCODE_CONCURRENCY = int(os.getenv("INDEX_ENCODE_CONCURRENCY", "2"))
+_encode_slots = threading.BoundedSemaphore(max(INDEX_ENCODE_CONCURRENCY, 1))
+
+# Resume interrupted runs from the last _id whose points reached Qdrant
+INDEX_CHECKPOINTS = os.getenv("INDEX_CHECKPOINTS", "true").lower() == "true"
+INDEX_CHECKPOINT_PATH = os.getenv("INDEX_CHECKPOINT_PATH", os.path.join(".checkpoints", "insertdocs.json"))
+_checkpoints = CheckpointStore(INDEX_CHECKPOINT_PATH) if INDEX_CHECKPOINTS else None
+
+
+def _scan_key(content_type: str, query: Optional[Dict[str, Any]]) -> str:
+    return content_type if not query else f"{content_type}:{json_util.dumps(query, sort_keys=True)}"
+
+
+def _open_scan(content_type: str, query: Optional[Dict[str, Any]]) -> Tuple[Optional[str], Dict[str, Any]]:
+    """Checkpoint key and Mongo filter for a (possibly resumed) scan of one content type or shard."""
+    if _checkpoints is None:
+        return None, dict(query or {})
+    key = _scan_key(content_type, query)
+    last_id = _checkpoints.get(key).get("last_id")
+    if last_id is not None:
+        logger.info(f"Resuming {content_type} indexing after _id {last_id}")
+    return key, resume_query(query, last_id)
+
+
+def load_shard_plan(
+    content_type: str,
+    plan_shards: Callable[[], List[Optional[Dict[str, Any]]]],
+) -> List[Optional[Dict[str, Any]]]:
+    """Shard filters for ``content_type``, reusing the plan of an interrupted run.
+
+    Shard checkpoints are keyed by their ``_id`` range, and freshly computed
+    ranges move as documents are written, so a resumed run must scan the
+    same ranges it started with to find its checkpoints.
+    """
+    if _checkpoints is None:
+        return plan_shards()
+    key = f"{content_type}:shard_plan"
+    saved = _checkpoints.get(key).get("shards")
+    if saved:
+        logger.info(f"Resuming {content_type} with the {len(saved)}-shard plan of the interrupted run")
+        return saved
+    shards = plan_shards()
+    if len(shards) > 1:
+        _checkpoints.save(key, {"shards": shards})
+    return shards
+
+
+def finish_shard_plan(content_type: str, shards: List[Optional[Dict[str, Any]]]) -> None:
+    """Drop the stored shard plan once no shard has a checkpoint left to resume."""
+    if _checkpoints is None:
+        return
+    if not any(_checkpoints.get(_scan_key(content_type, query)) for query in shards):
+        _checkpoints.clear(f"{content_type}:shard_plan")
+
+
+class StreamingIndexer:
+    """Encode and upload chunks in bounded batches as documents stream off a cursor.
+
+    ``add`` buffers one document's chunks; once ``batch_chunks`` chunks (or
+    ``batch_docs`` documents) are buffered they are embedded in one call,
+    SPLADE-encoded in one call and handed to a small upload pool. At most
+    ``max_pending`` upserts may be in flight, so ``add`` blocks when Qdrant
+    falls behind and peak memory no longer grows with the collection.
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        *,
+        batch_docs: int = INDEX_BATCH_DOCS,
+        batch_chunks: int = INDEX_BATCH_CHUNKS,
+        upload_batch: int = INDEX_UPLOAD_BATCH,
+        upload_workers: int = INDEX_UPLOAD_WORKERS,
+        max_pending: int = INDEX_MAX_PENDING_UPLOADS,
+        checkpoint_key: Optional[str] = None,
+    ):
+        self.collection_name = collection_name
+        self.checkpoint_key = checkpoint_key if _checkpoints is not None else None
+        self.batch_docs = max(batch_docs, 1)
+        self.batch_chunks = max(batch_chunks, 1)
+        self.upload_batch = max(upload_batch, 1)
+        self.splade = get_splade_encoder()
+        self.documents = 0
+        self.chunks = 0
+        self.indexed = 0
+        self.failed = 0
+        self._buffer: List[Tuple[str, str, str, List[str], Dict[str, Any]]] = []
+        self._buffered_chunks = 0
+        self._executor = ThreadPoolExecutor(max_workers=max(upload_workers, 1), thread_name_prefix="qdrant-upload")
+        self._slots = threading.BoundedSemaphore(max(max_pending, 1))
+        self._lock = threading.Lock()
+        # Flushes complete out of order; the checkpoint only moves past a flush once
+        # it and every earlier flush are fully uploaded
+        self._buffer_last_id: Any = None
+        self._next_seq = 0
+        self._outstanding: Dict[int, int] = {}
+        self._flush_last_ids: Dict[int, Any] = {}
+        self._upload_failed = False
+
+    def add(
+        self,
+        mongo_id: str,
+        content_type: str,
+        title: str,
+        chunks: List[str],
+        metadata: Dict[str, Any],
+        source_id: Any = None,
+    ) -> None:
+        if not chunks:
+            return
+        if source_id is not None:
+            self._buffer_last_id = source_id
+        self._buffer.append((mongo_id, content_type, title or "", list(chunks), metadata))
+        self._buffered_chunks += len(chunks)
+        self.documents += 1
+        if self._buffered_chunks >= self.batch_chunks or len(self._buffer) >= self.batch_docs:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        buffer, self._buffer, self._buffered_chunks = self._buffer, [], 0
+        last_id, self._buffer_last_id = self._buffer_last_id, None
+
+        all_chunks = [chunk for _, _, _, chunks, _ in buffer for chunk in chunks]
+        full_texts = [f"{title} {chunk}".strip() for _, _, title, chunks, _ in buffer for chunk in chunks]
+        with _encode_slots:
+            # (n, dim) float32 matrix straight from the wire; each row is converted when its point is built
+            vectors = embedder.encode_array(all_chunks)
+            if len(vectors) != len(all_chunks):
+                raise EmbeddingServiceError("Embedding service returned unexpected vector count")
+            if hasattr(self.splade, "encode_texts"):
+                sparse_vectors = self.splade.encode_texts(full_texts)
+            else:
+                sparse_vectors = [self.splade.encode_text(text) for text in full_texts]
+        self.chunks += len(all_chunks)
+
+        points: List[PointStruct] = []
+        position = 0
+        for mongo_id, content_type, title, chunks, metadata in buffer:
+            for idx, chunk in enumerate(chunks):
+                vector = vectors[position]
+                if hasattr(vector, "tolist"):
+                    vector = vector.tolist()
+                payload = {
+                    "mongo_id": mongo_id,
+                    "parent_id": mongo_id,
+                    "chunk_index": idx,
+                    "chunk_count": len(chunks),
+                    "title": title,
+                    "content": chunk,
+                    # Provide a concatenated text field for full-text search
+                    "full_text": full_texts[position],
+                    "content_type": content_type,
+                }
+                # Add metadata, filtering out None values
+                payload.update({k: v for k, v in metadata.items() if v is not None})
+
+                point_kwargs = {
+                    "id": point_id_from_seed(f"{mongo_id}/{content_type}/{idx}"),
+                    "vector": {
+                        "dense": vector,
+                    },
+                    "payload": payload,
+                }
+                splade_vec = sparse_vectors[position]
+                if splade_vec.get("indices"):
+                    point_kwargs["vector"]["sparse"] = SparseVector(
+                        indices=splade_vec["indices"], values=splade_vec["values"]
+                    )
+                points.append(PointStruct(**point_kwargs))
+                position += 1
+
+        batches = list(batch_iterable(points, self.upload_batch))
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._outstanding[seq] = len(batches)
+            self._flush_last_ids[seq] = last_id
+        for batch in batches:
+            # Backpressure: wait for a free upload slot before queueing more vectors
+            self._slots.acquire()
+            future = self._executor.submit(self._upload, batch, seq)
+            future.add_done_callback(lambda _: self._slots.release())
+
+    def _upload(self, batch: List[PointStruct], seq: int) -> None:
+        try:
+            qdrant_client.upsert(collection_name=self.collection_name, points=batch)
+            with self._lock:
+                self.indexed += len(batch)
+                self._outstanding[seq] -= 1
+                self._advance_checkpoint()
+        except Exception as e:
+            logger.error(f"Failed to upload batch: {e}")
+            with self._lock:
+                self.failed += len(batch)
+                # Keep the checkpoint before this batch so a rerun retries it
+                self._upload_failed = True
+
+    def _advance_checkpoint(self) -> None:
+        """Persist the last _id of the longest fully uploaded prefix of flushes (caller holds the lock)."""
+        advanced_to = None
+        while self._outstanding and not self._upload_failed:
+            seq = min(self._outstanding)
+            if self._outstanding[seq] > 0:
+                break
+            del self._outstanding[seq]
+            last_id = self._flush_last_ids.pop(seq)
+            if last_id is not None:
+                advanced_to = last_id
+        if advanced_to is not None and self.checkpoint_key is not None:
+            _checkpoints.save(self.checkpoint_key, {"last_id": advanced_to})
+
+    def finish(self) -> int:
+        """Flush the tail batch, wait for in-flight uploads and return the number of points indexed.
+
+        A scan that completes without upload failures clears its checkpoint, so
+        the next run starts from the beginning again.
+        """
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+        if self.checkpoint_key is not None and not self._upload_failed:
+            _checkpoints.clear(self.checkpoint_key)
+        return self.indexed
+
 def _serialize_text_fields(data: Optional[Dict], prefix_map: Dict[str, str]) -> str:
     """Serializes a dictionary into a 'Key: Value' string format."""
     if not data or not isinstance(data, dict):
@@ -560,7 +804,7 @@ def _get_common_metadata(doc: Dict) -> Dict:
 
 # ------------------ Indexing Functions ------------------
 
-def index_pages_to_qdrant():
+def index_pages_to_qdrant(query: Optional[Dict[str, Any]] = None):
     try:
 
         # Ensure collection and indexes for hybrid search
@@ -580,14 +824,14 @@ def index_pages_to_qdrant():
                 logger.error(f"Failed to ensure index: {e}")
 
         # Fetch pages with rich metadata
-        documents = page_collection.find({}, {
+        checkpoint_key, scan_query = _open_scan("page", query)
+        documents = page_collection.find(scan_query, {
             "_id": 1, "content": 1, "title": 1, "visibility": 1, "isFavourite": 1,
             "createdAt": 1, "updatedAt": 1, "createdTimeStamp": 1, "updatedTimeStamp": 1,
             "project": 1, "business": 1, "createdBy": 1
         })
-        points = []
-
-        splade = get_splade_encoder()
+        documents.sort("_id", 1).batch_size(INDEX_BATCH_DOCS)
+        indexer = StreamingIndexer(QDRANT_COLLECTION, checkpoint_key=checkpoint_key)
         for doc in documents:
             mongo_id = normalize_mongo_id(doc["_id"])
             title = doc.get("title", "")
@@ -645,54 +889,19 @@ def index_pages_to_qdrant():
             word_count = len(combined_text.split()) if combined_text else 0
             _stats.record("page", mongo_id, title, len(chunks), word_count)
 
-            vectors = embedder.encode(chunks)
-            if len(vectors) != len(chunks):
-                raise EmbeddingServiceError("Embedding service returned unexpected vector count")
-
-            for idx, chunk in enumerate(chunks):
-                vector = vectors[idx]
-                full_text = f"{title} {chunk}".strip()
-                splade_vec = splade.encode_text(full_text)
-                payload = {
-                    "mongo_id": mongo_id,
-                    "parent_id": mongo_id,
-                    "chunk_index": idx,
-                    "chunk_count": len(chunks),
-                    "title": title,
-                    "content": chunk,
-                    # Provide a concatenated text field for full-text search
-                    "full_text": full_text,
-                    "content_type": "page"
-                }
-                # Add metadata, filtering out None values
-                payload.update({k: v for k, v in metadata.items() if v is not None})
-                
-                point_kwargs = {
-                    "id": point_id_from_seed(f"{mongo_id}/page/{idx}"),
-                    "vector": {
-                        "dense": vector,
-                    },
-                    "payload": payload,
-                }
-                if splade_vec.get("indices"):
-                    point_kwargs["vector"]["sparse"] = SparseVector(
-                        indices=splade_vec["indices"], values=splade_vec["values"]
-                    )
-                point = PointStruct(**point_kwargs)
-                points.append(point)
+            indexer.add(mongo_id, "page", title, chunks, metadata, source_id=doc["_id"])
 
-        if not points:
+        total_indexed = indexer.finish()
+        if not indexer.documents:
             logger.error("No valid pages to index.")
             return {"status": "warning", "message": "No valid pages found to index."}
-
-        total_indexed = upload_in_batches(points, QDRANT_COLLECTION)
-        return {"status": "success", "indexed_documents": total_indexed}
+        return {"status": "success", "indexed_documents": total_indexed, "documents": indexer.documents}
 
     except Exception as e:
         logger.error(f"Error during page indexing: {e}")
         return {"status": "error", "message": str(e)}
 
-def index_workitems_to_qdrant():
+def index_workitems_to_qdrant(query: Optional[Dict[str, Any]] = None):
     try:
         ensure_collection_with_hybrid(QDRANT_COLLECTION, vector_size=EMBEDDING_DIMENSION)
 
@@ -708,15 +917,16 @@ def index_workitems_to_qdrant():
             else:
                 logger.error(f"Failed to ensure index: {e}")
 
-        documents = workitem_collection.find({}, {
+        checkpoint_key, scan_query = _open_scan("work_item", query)
+
+        documents = workitem_collection.find(scan_query, {
             "_id": 1, "title": 1, "description": 1, "displayBugNo": 1,
             "priority": 1, "status": 1, "state": 1, "assignee": 1,
             "createdAt": 1, "updatedAt": 1, "createdTimeStamp": 1, "updatedTimeStamp": 1,
             "project": 1, "cycle": 1, "modules": 1, "business": 1, "createdBy": 1,"workLogs":1
         })
-        points = []
-
-        splade = get_splade_encoder()
+        documents.sort("_id", 1).batch_size(INDEX_BATCH_DOCS)
+        indexer = StreamingIndexer(QDRANT_COLLECTION, checkpoint_key=checkpoint_key)
         for doc in documents:
             mongo_id = normalize_mongo_id(doc["_id"])
             # Clean HTML/entities before chunking for better retrieval quality
@@ -792,61 +1002,27 @@ def index_workitems_to_qdrant():
             word_count = len(combined_text.split()) if combined_text else 0
             _stats.record("work_item", mongo_id, doc.get("title", ""), len(chunks), word_count)
             
-            vectors = embedder.encode(chunks)
-            if len(vectors) != len(chunks):
-                raise EmbeddingServiceError("Embedding service returned unexpected vector count")
+            indexer.add(mongo_id, "work_item", doc.get("title", ""), chunks, metadata, source_id=doc["_id"])
 
-            for idx, chunk in enumerate(chunks):
-                vector = vectors[idx]
-                full_text = f"{doc.get('title', '')} {chunk}".strip()
-                splade_vec = splade.encode_text(full_text)
-                
-                payload = {
-                    "mongo_id": mongo_id,
-                    "parent_id": mongo_id,
-                    "chunk_index": idx,
-                    "chunk_count": len(chunks),
-                    "title": doc.get("title", ""),
-                    "content": chunk,
-                    "full_text": full_text,
-                    "content_type": "work_item"
-                }
-                # Add metadata, filtering out None values
-                payload.update({k: v for k, v in metadata.items() if v is not None})
-
-                point_kwargs = {
-                    "id": point_id_from_seed(f"{mongo_id}/work_item/{idx}"),
-                    "vector": {
-                        "dense": vector,
-                    },
-                    "payload": payload,
-                }
-                if splade_vec.get("indices"):
-                    point_kwargs["vector"]["sparse"] = SparseVector(
-                        indices=splade_vec["indices"], values=splade_vec["values"]
-                    )
-                point = PointStruct(**point_kwargs)
-                points.append(point)
-
-        if not points:
+        total_indexed = indexer.finish()
+        if not indexer.documents:
             logger.error("No valid work items to index.")
             return {"status": "warning", "message": "No valid work items found to index."}
-
-        total_indexed = upload_in_batches(points, QDRANT_COLLECTION)
-        return {"status": "success", "indexed_documents": total_indexed}
+        return {"status": "success", "indexed_documents": total_indexed, "documents": indexer.documents}
 
     except Exception as e:
         logger.error(f"Error during work item indexing: {e}")
         return {"status": "error", "message": str(e)}
 
-def index_projects_to_qdrant():
+def index_projects_to_qdrant(query: Optional[Dict[str, Any]] = None):
     try:
         ensure_collection_with_hybrid(QDRANT_COLLECTION, vector_size=EMBEDDING_DIMENSION)
 
-        documents = project_collection.find({}, {"_id": 1, "name": 1, "description": 1, "business": 1})
-        points = []
+        checkpoint_key, scan_query = _open_scan("project", query)
 
-        splade = get_splade_encoder()
+        documents = project_collection.find(scan_query, {"_id": 1, "name": 1, "description": 1, "business": 1})
+        documents.sort("_id", 1).batch_size(INDEX_BATCH_DOCS)
+        indexer = StreamingIndexer(QDRANT_COLLECTION, checkpoint_key=checkpoint_key)
         for doc in documents:
             mongo_id = normalize_mongo_id(doc["_id"])
             name = doc.get("name", "")
@@ -894,57 +1070,26 @@ def index_projects_to_qdrant():
             word_count = len(combined_text.split()) if combined_text else 0
             _stats.record("project", mongo_id, name, len(chunks), word_count)
 
-            vectors = embedder.encode(chunks)
-            if len(vectors) != len(chunks):
-                raise EmbeddingServiceError("Embedding service returned unexpected vector count")
+            indexer.add(mongo_id, "project", name, chunks, metadata, source_id=doc["_id"])
 
-            for idx, chunk in enumerate(chunks):
-                vector = vectors[idx]
-                full_text = f"{name} {chunk}".strip()
-                splade_vec = splade.encode_text(full_text)
-                payload = {
-                    "mongo_id": mongo_id,
-                    "parent_id": mongo_id,
-                    "chunk_index": idx,
-                    "chunk_count": len(chunks),
-                    "title": name,
-                    "content": chunk,
-                    "full_text": full_text,
-                    "content_type": "project"
-                }
-                payload.update({k: v for k, v in metadata.items() if v is not None})
-                point_kwargs = {
-                    "id": point_id_from_seed(f"{mongo_id}/project/{idx}"),
-                    "vector": {
-                        "dense": vector,
-                        },
-                        "payload": payload,
-                    }
-                if splade_vec.get("indices"):
-                    point_kwargs["vector"]["sparse"] = SparseVector(
-                        indices=splade_vec["indices"], values=splade_vec["values"]
-                    )
-                point = PointStruct(**point_kwargs)
-                points.append(point)
-
-        if not points:
+        total_indexed = indexer.finish()
+        if not indexer.documents:
             logger.error("No projects with descriptions to index.")
             return {"status": "warning", "message": "No projects to index."}
-
-        total_indexed = upload_in_batches(points, QDRANT_COLLECTION)
-        return {"status": "success", "indexed_documents": total_indexed}
+        return {"status": "success", "indexed_documents": total_indexed, "documents": indexer.documents}
     except Exception as e:
         logger.error(f"Error during project indexing: {e}")
         return {"status": "error", "message": str(e)}
 
-def index_cycles_to_qdrant():
+def index_cycles_to_qdrant(query: Optional[Dict[str, Any]] = None):
     try:
         ensure_collection_with_hybrid(QDRANT_COLLECTION, vector_size=EMBEDDING_DIMENSION)
 
-        documents = cycle_collection.find({}, {"_id": 1, "name": 1, "title": 1, "description": 1, "business": 1})
-        points = []
+        checkpoint_key, scan_query = _open_scan("cycle", query)
 
-        splade = get_splade_encoder()
+        documents = cycle_collection.find(scan_query, {"_id": 1, "name": 1, "title": 1, "description": 1, "business": 1})
+        documents.sort("_id", 1).batch_size(INDEX_BATCH_DOCS)
+        indexer = StreamingIndexer(QDRANT_COLLECTION, checkpoint_key=checkpoint_key)
         for doc in documents:
             mongo_id = normalize_mongo_id(doc["_id"])
             name = doc.get("name") or doc.get("title") or ""
@@ -992,57 +1137,26 @@ def index_cycles_to_qdrant():
                 word_count = len(combined_text.split()) if combined_text else 0
                 _stats.record("cycle", mongo_id, name, len(chunks), word_count)
 
-                vectors = embedder.encode(chunks)
-                if len(vectors) != len(chunks):
-                    raise EmbeddingServiceError("Embedding service returned unexpected vector count")
-
-                for idx, chunk in enumerate(chunks):
-                    vector = vectors[idx]
-                    full_text = f"{name} {chunk}".strip()
-                    splade_vec = splade.encode_text(full_text)
-                    payload = {
-                        "mongo_id": mongo_id,
-                        "parent_id": mongo_id,
-                        "chunk_index": idx,
-                        "chunk_count": len(chunks),
-                        "title": name,
-                        "content": chunk,
-                        "full_text": full_text,
-                        "content_type": "cycle"
-                    }
-                    payload.update({k: v for k, v in metadata.items() if v is not None})
-                    point_kwargs = {
-                        "id": point_id_from_seed(f"{mongo_id}/cycle/{idx}"),
-                        "vector": {
-                            "dense": vector,
-                            },
-                            "payload": payload,
-                        }
-                    if splade_vec.get("indices"):
-                        point_kwargs["vector"]["sparse"] = SparseVector(
-                            indices=splade_vec["indices"], values=splade_vec["values"]
-                        )
-                    point = PointStruct(**point_kwargs)
-                    points.append(point)
-
-        if not points:
+                indexer.add(mongo_id, "cycle", name, chunks, metadata, source_id=doc["_id"])
+
+        total_indexed = indexer.finish()
+        if not indexer.documents:
             logger.error("No cycles with descriptions to index.")
             return {"status": "warning", "message": "No cycles to index."}
-
-        total_indexed = upload_in_batches(points, QDRANT_COLLECTION)
-        return {"status": "success", "indexed_documents": total_indexed}
+        return {"status": "success", "indexed_documents": total_indexed, "documents": indexer.documents}
     except Exception as e:
         logger.error(f"Error during cycle indexing: {e}")
         return {"status": "error", "message": str(e)}
 
-def index_modules_to_qdrant():
+def index_modules_to_qdrant(query: Optional[Dict[str, Any]] = None):
     try:
         ensure_collection_with_hybrid(QDRANT_COLLECTION, vector_size=EMBEDDING_DIMENSION)
 
-        documents = module_collection.find({}, {"_id": 1, "name": 1, "title": 1, "description": 1, "business": 1})
-        points = []
+        checkpoint_key, scan_query = _open_scan("module", query)
 
-        splade = get_splade_encoder()
+        documents = module_collection.find(scan_query, {"_id": 1, "name": 1, "title": 1, "description": 1, "business": 1})
+        documents.sort("_id", 1).batch_size(INDEX_BATCH_DOCS)
+        indexer = StreamingIndexer(QDRANT_COLLECTION, checkpoint_key=checkpoint_key)
         for doc in documents:
             mongo_id = normalize_mongo_id(doc["_id"])
             name = doc.get("name") or doc.get("title") or ""
@@ -1090,50 +1204,18 @@ def index_modules_to_qdrant():
                 word_count = len(combined_text.split()) if combined_text else 0
                 _stats.record("module", mongo_id, name, len(chunks), word_count)
 
-                vectors = embedder.encode(chunks)
-                if len(vectors) != len(chunks):
-                    raise EmbeddingServiceError("Embedding service returned unexpected vector count")
-
-                for idx, chunk in enumerate(chunks):
-                    vector = vectors[idx]
-                    full_text = f"{name} {chunk}".strip()
-                    splade_vec = splade.encode_text(full_text)
-                    payload = {
-                        "mongo_id": mongo_id,
-                        "parent_id": mongo_id,
-                        "chunk_index": idx,
-                        "chunk_count": len(chunks),
-                        "title": name,
-                        "content": chunk,
-                        "full_text": full_text,
-                        "content_type": "module"
-                    }
-                    payload.update({k: v for k, v in metadata.items() if v is not None})
-                    point_kwargs = {
-                        "id": point_id_from_seed(f"{mongo_id}/module/{idx}"),
-                        "vector": {
-                            "dense": vector,
-                            },
-                            "payload": payload,
-                        }
-                    if splade_vec.get("indices"):
-                        point_kwargs["vector"]["sparse"] = SparseVector(
-                            indices=splade_vec["indices"], values=splade_vec["values"]
-                        )
-                    point = PointStruct(**point_kwargs)
-                    points.append(point)
-
-        if not points:
+                indexer.add(mongo_id, "module", name, chunks, metadata, source_id=doc["_id"])
+
+        total_indexed = indexer.finish()
+        if not indexer.documents:
             logger.error("No modules with descriptions to index.")
             return {"status": "warning", "message": "No modules to index."}
-
-        total_indexed = upload_in_batches(points, QDRANT_COLLECTION)
-        return {"status": "success", "indexed_documents": total_indexed}
+        return {"status": "success", "indexed_documents": total_indexed, "documents": indexer.documents}
     except Exception as e:
         logger.error(f"Error during module indexing: {e}")
         return {"status": "error", "message": str(e)}
 
-def index_epic_to_qdrant():
+def index_epic_to_qdrant(query: Optional[Dict[str, Any]] = None):
     try:
         ensure_collection_with_hybrid(QDRANT_COLLECTION, vector_size=EMBEDDING_DIMENSION)
 
@@ -1149,7 +1231,9 @@ def index_epic_to_qdrant():
             else:
                 logger.error(f"Failed to ensure index: {e}")
 
-        documents = epic_collection.find({}, {
+        checkpoint_key, scan_query = _open_scan("epic", query)
+
+        documents = epic_collection.find(scan_query, {
             "_id": 1,
             "title": 1,
             "description": 1,
@@ -1166,9 +1250,8 @@ def index_epic_to_qdrant():
             "stateMaster": 1,
             "createdBy": 1
         })
-        points = []
-
-        splade = get_splade_encoder()
+        documents.sort("_id", 1).batch_size(INDEX_BATCH_DOCS)
+        indexer = StreamingIndexer(QDRANT_COLLECTION, checkpoint_key=checkpoint_key)
         for doc in documents:
             mongo_id = normalize_mongo_id(doc["_id"])
             title_clean = html_to_text(doc.get("title", ""))
@@ -1225,54 +1308,20 @@ def index_epic_to_qdrant():
             word_count = len(combined_text.split()) if combined_text else 0
             _stats.record("epic", mongo_id, doc.get("title", ""), len(chunks), word_count)
 
-            vectors = embedder.encode(chunks)
-            if len(vectors) != len(chunks):
-                raise EmbeddingServiceError("Embedding service returned unexpected vector count")
+            indexer.add(mongo_id, "epic", doc.get("title", ""), chunks, metadata, source_id=doc["_id"])
 
-            for idx, chunk in enumerate(chunks):
-                vector = vectors[idx]
-                full_text = f"{doc.get('title', '')} {chunk}".strip()
-                splade_vec = splade.encode_text(full_text)
-                payload = {
-                    "mongo_id": mongo_id,
-                    "parent_id": mongo_id,
-                    "chunk_index": idx,
-                    "chunk_count": len(chunks),
-                    "title": doc.get("title", ""),
-                    "content": chunk,
-                    "full_text": full_text,
-                    "content_type": "epic"
-                }
-
-                payload.update({k: v for k, v in metadata.items() if v is not None})
-
-                point_kwargs = {
-                    "id": point_id_from_seed(f"{mongo_id}/epic/{idx}"),
-                    "vector": {
-                        "dense": vector,
-                    },
-                    "payload": dict(payload),
-                }
-                if splade_vec.get("indices"):
-                    point_kwargs["vector"]["sparse"] = SparseVector(
-                        indices=splade_vec["indices"], values=splade_vec["values"]
-                    )
-                point = PointStruct(**point_kwargs)
-                points.append(point)
-
-        if not points:
+        total_indexed = indexer.finish()
+        if not indexer.documents:
             logger.error("No valid epics to index.")
             return {"status": "warning", "message": "No valid epics found to index."}
-
-        total_indexed = upload_in_batches(points, QDRANT_COLLECTION)
-        return {"status": "success", "indexed_documents": total_indexed}
+        return {"status": "success", "indexed_documents": total_indexed, "documents": indexer.documents}
 
     except Exception as e:
         logger.error(f"Error during epic indexing: {e}")
         return {"status": "error", "message": str(e)}
     
 #New function to index userStory to qdrant
-def index_userStory_to_qdrant():
+def index_userStory_to_qdrant(query: Optional[Dict[str, Any]] = None):
     try:
         print("🔄 Indexing user stories from MongoDB to Qdrant...")
         ensure_collection_with_hybrid(QDRANT_COLLECTION, vector_size=768)
@@ -1284,9 +1333,10 @@ def index_userStory_to_qdrant():
             "state": 1, "assignees": 1, "assignee": 1, "priority": 1, "label": 1,
             "project": 1, "createdAt": 1, "updatedAt": 1
         }
-        documents = userStory_collection.find({}, projection)
-        points = []
-        splade = get_splade_encoder()
+        checkpoint_key, scan_query = _open_scan("user_story", query)
+        documents = userStory_collection.find(scan_query, projection)
+        documents.sort("_id", 1).batch_size(INDEX_BATCH_DOCS)
+        indexer = StreamingIndexer(QDRANT_COLLECTION, checkpoint_key=checkpoint_key)
 
         for doc in documents:
             mongo_id = normalize_mongo_id(doc["_id"])
@@ -1340,47 +1390,21 @@ def index_userStory_to_qdrant():
             word_count = len(combined_text.split()) if combined_text else 0
             _stats.record("user_story", mongo_id, title, len(chunks), word_count)
 
-            for idx, chunk in enumerate(chunks):
-                vector = embedder.encode(chunk).tolist()
-                full_text = f"{title} {chunk}".strip()
-                splade_vec = splade.encode_text(full_text)
-                
-                payload = {
-                    "mongo_id": mongo_id,
-                    "parent_id": mongo_id,
-                    "chunk_index": idx,
-                    "chunk_count": len(chunks),
-                    "title": title,
-                    "content": chunk,
-                    "full_text": full_text,
-                    "content_type": "user_story"
-                }
-                payload.update({k: v for k, v in metadata.items() if v is not None})
+            indexer.add(mongo_id, "user_story", title, chunks, metadata, source_id=doc["_id"])
 
-                point_kwargs = {
-                    "id": point_id_from_seed(f"{mongo_id}/user_story/{idx}"),
-                    "vector": {"dense": vector},
-                    "payload": payload,
-                }
-                if splade_vec.get("indices"):
-                    point_kwargs["vector"]["sparse"] = SparseVector(
-                        indices=splade_vec["indices"], values=splade_vec["values"]
-                    )
-                points.append(PointStruct(**point_kwargs))
-
-        if not points:
+        total_indexed = indexer.finish()
+        if not indexer.documents:
             print("⚠️ No valid user stories to index.")
             return {"status": "warning", "message": "No valid user stories found to index."}
 
-        total_indexed = upload_in_batches(points, QDRANT_COLLECTION)
         print(f"✅ Indexed {total_indexed} user story chunks to Qdrant.")
-        return {"status": "success", "indexed_documents": total_indexed}
+        return {"status": "success", "indexed_documents": total_indexed, "documents": indexer.documents}
 
     except Exception as e:
         print(f"❌ Error during user story indexing: {e}")
         return {"status": "error", "message": str(e)}
 
-def index_features_to_qdrant():
+def index_features_to_qdrant(query: Optional[Dict[str, Any]] = None):
     try:
         print("🔄 Indexing features from MongoDB to Qdrant...")
         ensure_collection_with_hybrid(QDRANT_COLLECTION, vector_size=768)
@@ -1395,9 +1419,10 @@ def index_features_to_qdrant():
             "label": 1, "estimateSystem": 1, "estimate": 1, "workLogs": 1,
             "createdAt": 1, "updatedAt": 1
         }
-        documents = features_collection.find({}, projection)
-        points = []
-        splade = get_splade_encoder()
+        checkpoint_key, scan_query = _open_scan("feature", query)
+        documents = features_collection.find(scan_query, projection)
+        documents.sort("_id", 1).batch_size(INDEX_BATCH_DOCS)
+        indexer = StreamingIndexer(QDRANT_COLLECTION, checkpoint_key=checkpoint_key)
 
         for doc in documents:
             mongo_id = normalize_mongo_id(doc["_id"])
@@ -1481,41 +1506,15 @@ def index_features_to_qdrant():
             word_count = len(combined_text.split()) if combined_text else 0
             _stats.record("feature", mongo_id, title, len(chunks), word_count)
 
-            for idx, chunk in enumerate(chunks):
-                vector = embedder.encode(chunk).tolist()
-                full_text = f"{title} {chunk}".strip()
-                splade_vec = splade.encode_text(full_text)
-                
-                payload = {
-                    "mongo_id": mongo_id,
-                    "parent_id": mongo_id,
-                    "chunk_index": idx,
-                    "chunk_count": len(chunks),
-                    "title": title,
-                    "content": chunk,
-                    "full_text": full_text,
-                    "content_type": "feature"
-                }
-                payload.update({k: v for k, v in metadata.items() if v is not None})
-
-                point_kwargs = {
-                    "id": point_id_from_seed(f"{mongo_id}/feature/{idx}"),
-                    "vector": {"dense": vector},
-                    "payload": payload,
-                }
-                if splade_vec.get("indices"):
-                    point_kwargs["vector"]["sparse"] = SparseVector(
-                        indices=splade_vec["indices"], values=splade_vec["values"]
-                    )
-                points.append(PointStruct(**point_kwargs))
+            indexer.add(mongo_id, "feature", title, chunks, metadata, source_id=doc["_id"])
 
-        if not points:
+        total_indexed = indexer.finish()
+        if not indexer.documents:
             print("⚠️ No valid features to index.")
             return {"status": "warning", "message": "No valid features found to index."}
 
-        total_indexed = upload_in_batches(points, QDRANT_COLLECTION)
         print(f"✅ Indexed {total_indexed} feature chunks to Qdrant.")
-        return {"status": "success", "indexed_documents": total_indexed}
+        return {"status": "success", "indexed_documents": total_indexed, "documents": indexer.documents}
 
     except Exception as e:
         print(f"❌ Error during feature indexing: {e}")
@@ -0,0 +1,165 @@
+"""
+Query vector cache for RAG retrieval.
+
+Dense and SPLADE query vectors are pure functions of the (normalized) query
+text and the model that produced them, so they can be shared across turns,
+conversations and users. Two tiers:
+
+1. L1: process-wide LRU with TTL (cachetools.TTLCache)
+2. L2: optional Redis tier shared across replicas (QUERY_CACHE_REDIS=true)
+"""
+
+from cachetools import TTLCache
+from threading import Lock
+from typing import Any, Dict, Optional
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCT_RE = re.compile(r"[\s?.!,;:]+$")
+
+
+class QueryVectorCache:
+    """Bounded LRU + TTL cache of query vectors with an optional Redis tier."""
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        redis_url: Optional[str] = None,
+        use_redis: Optional[bool] = None,
+    ):
+        self.ttl_seconds = ttl_seconds or int(os.getenv("QUERY_CACHE_TTL_SECONDS", "3600"))
+        self.l1_cache: TTLCache[str, Any] = TTLCache(
+            maxsize=maxsize or int(os.getenv("QUERY_CACHE_SIZE", "2048")),
+            ttl=self.ttl_seconds,
+        )
+        self.l1_lock = Lock()
+
+        if use_redis is None:
+            use_redis = os.getenv("QUERY_CACHE_REDIS", "false").lower() in {"1", "true", "yes"}
+        self.use_redis = use_redis
+        self.redis_url = redis_url or os.getenv("REDIS_URL") or "redis://redis:6379/0"
+        self.redis_client: Optional[aioredis.Redis] = None
+        self._connection_lock = asyncio.Lock()
+
+        # Vectors depend on the model that produced them; keep keys model-specific
+        self.model_tags = {
+            "dense": os.getenv("EMBEDDING_MODEL") or os.getenv("EMBEDDING_MODEL_NAME") or "default",
+            "sparse": os.getenv("SPLADE_MODEL_NAME") or "default",
+        }
+
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Lowercase, collapse whitespace and drop trailing punctuation."""
+        text = _WHITESPACE_RE.sub(" ", (query or "").strip().lower())
+        return _TRAILING_PUNCT_RE.sub("", text)
+
+    def _key(self, kind: str, query: str) -> str:
+        seed = f"{self.model_tags.get(kind, 'default')}|{self.normalize_query(query)}"
+        digest = hashlib.sha1(seed.encode("utf-8")).hexdigest()
+        return f"rag:qvec:{kind}:{digest}"
+
+    async def _ensure_redis(self) -> Optional[aioredis.Redis]:
+        if not self.use_redis:
+            return None
+        if self.redis_client is not None:
+            return self.redis_client
+        async with self._connection_lock:
+            if self.redis_client is not None or not self.use_redis:
+                return self.redis_client
+            try:
+                client = aioredis.from_url(
+                    self.redis_url,
+                    encoding="utf-8",
+                    decode_responses=True,
+                    max_connections=20,
+                    socket_connect_timeout=2,
+                    socket_timeout=1,
+                )
+                await client.ping()
+                self.redis_client = client
+            except Exception as e:
+                logger.error(f"Query cache Redis tier unavailable, using in-process cache only: {e}")
+                self.use_redis = False
+        return self.redis_client
+
+    async def get(self, kind: str, query: str) -> Optional[Any]:
+        key = self._key(kind, query)
+        with self.l1_lock:
+            value = self.l1_cache.get(key)
+        if value is not None:
+            self.l1_hits += 1
+            return value
+
+        client = await self._ensure_redis()
+        if client is not None:
+            try:
+                raw = await client.get(key)
+                if raw:
+                    value = json.loads(raw)
+                    with self.l1_lock:
+                        self.l1_cache[key] = value
+                    self.l2_hits += 1
+                    return value
+            except (RedisError, ValueError) as e:
+                logger.warning(f"Query cache Redis read failed: {e}")
+
+        self.misses += 1
+        return None
+
+    async def set(self, kind: str, query: str, value: Any) -> None:
+        if value is None:
+            return
+        key = self._key(kind, query)
+        with self.l1_lock:
+            self.l1_cache[key] = value
+
+        client = await self._ensure_redis()
+        if client is not None:
+            try:
+                await client.set(key, json.dumps(value), ex=self.ttl_seconds)
+            except RedisError as e:
+                logger.warning(f"Query cache Redis write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        with self.l1_lock:
+            size = len(self.l1_cache)
+        return {
+            "lookups": lookups,
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.l1_hits + self.l2_hits) / lookups if lookups else 0.0,
+            "l1_size": size,
+            "l1_maxsize": self.l1_cache.maxsize,
+            "ttl_seconds": self.ttl_seconds,
+            "redis_enabled": self.use_redis,
+        }
+
+    async def close(self) -> None:
+        if self.redis_client is not None:
+            try:
+                await self.redis_client.close()
+            except Exception:
+                pass
+            self.redis_client = None
+
+
+# Process-wide instance shared by ChunkAwareRetriever and RAGTool
+query_vector_cache = QueryVectorCache()
@@ -0,0 +1,170 @@
+"""
+Concurrent full reindex driver.
+
+Runs every content type indexer from ``qdrant/insertdocs.py`` at once and
+splits large collections into ``_id`` range shards that index in parallel.
+Work is I/O bound (Mongo, embedding/SPLADE services, Qdrant), so shards run
+on threads; the number of encode calls in flight is capped process-wide by
+INDEX_ENCODE_CONCURRENCY so the model services are not oversubscribed.
+
+Shard ranges are stored with the indexing checkpoints, so an interrupted
+run resumes each shard over the same ``_id`` range it started with.
+
+Usage:
+    python -m qdrant.reindex --types page work_item --shards 4 --workers 8
+"""
+
+import os
+import sys
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Add the parent directory to sys.path so we can import from qdrant
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qdrant import insertdocs
+from qdrant.dbconnection import (
+    page_collection,
+    workitem_collection,
+    cycle_collection,
+    module_collection,
+    project_collection,
+    epic_collection,
+    userStory_collection,
+    features_collection,
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+REINDEX_WORKERS = int(os.getenv("REINDEX_WORKERS", "8"))
+REINDEX_SHARDS = int(os.getenv("REINDEX_SHARDS", "4"))
+# Collections smaller than this are indexed as a single shard
+REINDEX_MIN_SHARD_DOCS = int(os.getenv("REINDEX_MIN_SHARD_DOCS", "2000"))
+
+# content type -> (indexer, source collection)
+CONTENT_TYPES: Dict[str, Tuple[Callable[..., Dict[str, Any]], Any]] = {
+    "page": (insertdocs.index_pages_to_qdrant, page_collection),
+    "work_item": (insertdocs.index_workitems_to_qdrant, workitem_collection),
+    "project": (insertdocs.index_projects_to_qdrant, project_collection),
+    "cycle": (insertdocs.index_cycles_to_qdrant, cycle_collection),
+    "module": (insertdocs.index_modules_to_qdrant, module_collection),
+    "epic": (insertdocs.index_epic_to_qdrant, epic_collection),
+    "user_story": (insertdocs.index_userStory_to_qdrant, userStory_collection),
+    "feature": (insertdocs.index_features_to_qdrant, features_collection),
+}
+
+
+def id_range_shards(collection, shards: int) -> List[Optional[Dict[str, Any]]]:
+    """Split a collection into contiguous ``_id`` ranges of roughly equal size.
+
+    Returns Mongo filters (``None`` means the whole collection). Falls back to
+    one shard for small collections, or when ``_id`` values mix BSON types,
+    since range filters only match values of the bound's own type.
+    """
+    if shards <= 1:
+        return [None]
+    try:
+        total = collection.estimated_document_count()
+        if total < max(REINDEX_MIN_SHARD_DOCS, shards):
+            return [None]
+        buckets = list(collection.aggregate(
+            [{"$bucketAuto": {"groupBy": "$_id", "buckets": shards}}],
+            allowDiskUse=True,
+        ))
+    except Exception as e:
+        logger.error(f"Could not compute _id shards for {getattr(collection, 'name', collection)}: {e}")
+        return [None]
+
+    bounds = [bucket["_id"]["min"] for bucket in buckets]
+    if len(bounds) <= 1 or len({type(bound) for bound in bounds}) > 1:
+        return [None]
+
+    filters: List[Optional[Dict[str, Any]]] = []
+    for idx, lower in enumerate(bounds):
+        condition: Dict[str, Any] = {"$gte": lower}
+        if idx + 1 < len(bounds):
+            condition["$lt"] = bounds[idx + 1]
+        filters.append({"_id": condition})
+    return filters
+
+
+def reindex(
+    content_types: Optional[List[str]] = None,
+    *,
+    shards: int = REINDEX_SHARDS,
+    workers: int = REINDEX_WORKERS,
+) -> Dict[str, Dict[str, Any]]:
+    """Index the given content types concurrently and return per-type throughput."""
+    selected = content_types or list(CONTENT_TYPES)
+    unknown = [name for name in selected if name not in CONTENT_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown content types: {', '.join(unknown)}")
+
+    # Create the collection once up front rather than racing from every shard
+    insertdocs.ensure_collection_with_hybrid(insertdocs.QDRANT_COLLECTION, vector_size=insertdocs.EMBEDDING_DIMENSION)
+
+    report: Dict[str, Dict[str, Any]] = {}
+    tasks: List[Tuple[str, Optional[Dict[str, Any]]]] = []
+    plans: Dict[str, List[Optional[Dict[str, Any]]]] = {}
+    for name in selected:
+        _, collection = CONTENT_TYPES[name]
+        type_shards = insertdocs.load_shard_plan(name, lambda: id_range_shards(collection, shards))
+        plans[name] = type_shards
+        report[name] = {"shards": len(type_shards), "documents": 0, "chunks": 0, "errors": 0, "started": None, "finished": None}
+        tasks.extend((name, query) for query in type_shards)
+
+    def _run(name: str, query: Optional[Dict[str, Any]]) -> Tuple[str, float, float, Dict[str, Any]]:
+        indexer_fn, _ = CONTENT_TYPES[name]
+        started = time.monotonic()
+        result = indexer_fn(query)
+        return name, started, time.monotonic(), result
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="reindex") as pool:
+        futures = [pool.submit(_run, name, query) for name, query in tasks]
+        for future in as_completed(futures):
+            name, started, finished, result = future.result()
+            entry = report[name]
+            entry["started"] = started if entry["started"] is None else min(entry["started"], started)
+            entry["finished"] = finished if entry["finished"] is None else max(entry["finished"], finished)
+            if result.get("status") == "error":
+                entry["errors"] += 1
+                logger.error(f"Reindex shard for {name} failed: {result.get('message')}")
+            entry["documents"] += result.get("documents", 0)
+            entry["chunks"] += result.get("indexed_documents", 0)
+
+    for name, type_shards in plans.items():
+        insertdocs.finish_shard_plan(name, type_shards)
+
+    for name, entry in report.items():
+        elapsed = max((entry.pop("finished") or 0.0) - (entry.pop("started") or 0.0), 1e-9)
+        entry["seconds"] = round(elapsed, 2)
+        entry["docs_per_sec"] = round(entry["documents"] / elapsed, 2)
+        entry["chunks_per_sec"] = round(entry["chunks"] / elapsed, 2)
+    return report
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rebuild the Qdrant index from MongoDB concurrently")
+    parser.add_argument("--types", nargs="*", choices=list(CONTENT_TYPES), help="Content types to reindex (default: all)")
+    parser.add_argument("--shards", type=int, default=REINDEX_SHARDS, help="_id range shards per content type")
+    parser.add_argument("--workers", type=int, default=REINDEX_WORKERS, help="Shards indexed concurrently")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    started = time.monotonic()
+    report = reindex(args.types, shards=args.shards, workers=args.workers)
+    for name, entry in report.items():
+        logger.info(
+            f"{name}: {entry['documents']} docs, {entry['chunks']} chunks in {entry['seconds']}s "
+            f"({entry['docs_per_sec']} docs/sec, {entry['chunks_per_sec']} chunks/sec, "
+            f"{entry['shards']} shard(s), {entry['errors']} failed)"
+        )
+    logger.info(f"Reindex finished in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,9 +17,11 @@ from mongo.constants import BUSINESS_UUID, MEMBER_UUID
 from collections import defaultdict
 from dataclasses import dataclass
 import asyncio
+import inspect
 from qdrant_client.models import (
     Filter, FieldCondition, MatchValue, MatchAny, Prefetch, NearestQuery, FusionQuery, Fusion, SparseVector
 )
+from qdrant.query_cache import query_vector_cache
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -53,14 +55,71 @@ class ReconstructedDocument:
     chunk_coverage: str  # e.g., "chunks 1,2,5 of 10"
 
 
+async def _encode_dense_query(query: str, embedding_client) -> List[float]:
+    if inspect.iscoroutinefunction(embedding_client.encode):
+        vectors = await embedding_client.encode([query])
+    else:
+        # Sync clients (local SentenceTransformer, httpx.Client) must not block the event loop
+        vectors = await asyncio.to_thread(embedding_client.encode, [query])
+    if vectors is None or len(vectors) == 0:
+        raise RuntimeError("Embedding service returned empty vector")
+    vector = vectors[0]
+    return vector.tolist() if hasattr(vector, "tolist") else list(vector)
+
+
+async def _encode_sparse_query(query: str, splade_client=None) -> Dict[str, List[float]]:
+    if splade_client is not None:
+        vectors = await splade_client.encode([query])
+        return vectors[0] if vectors else {"indices": [], "values": []}
+    from qdrant.encoder import get_splade_encoder
+    splade = get_splade_encoder()
+    return await asyncio.to_thread(splade.encode_text, query)
+
+
+async def encode_query(
+    query: str,
+    embedding_client,
+    splade_client=None,
+) -> Tuple[List[float], Optional[Dict[str, List[float]]]]:
+    """Compute dense and SPLADE query vectors concurrently.
+
+    The dense vector is required and its errors propagate; SPLADE is optional,
+    so a sparse failure yields ``None`` and retrieval continues dense-only.
+    Both vectors are served from ``query_vector_cache`` when available.
+    """
+    dense, sparse = await asyncio.gather(
+        query_vector_cache.get("dense", query),
+        query_vector_cache.get("sparse", query),
+    )
+
+    async def _resolve(cached, encode):
+        return cached if cached is not None else await encode()
+
+    dense_result, sparse_result = await asyncio.gather(
+        _resolve(dense, lambda: _encode_dense_query(query, embedding_client)),
+        _resolve(sparse, lambda: _encode_sparse_query(query, splade_client)),
+        return_exceptions=True,
+    )
+    if isinstance(dense_result, BaseException):
+        raise dense_result
+    if isinstance(sparse_result, BaseException):
+        logger.debug(f"SPLADE query encoding failed: {sparse_result}")
+        sparse_result = None
+
+    if dense is None:
+        await query_vector_cache.set("dense", query, dense_result)
+    if sparse is None and sparse_result is not None:
+        await query_vector_cache.set("sparse", query, sparse_result)
+    return dense_result, sparse_result
+
+
 class ChunkAwareRetriever:
     """Enhanced RAG retrieval with chunk awareness and context reconstruction"""
     
-    def __init__(self, qdrant_client, embedding_client):
+    def __init__(self, qdrant_client, embedding_client, splade_client=None):
         self.qdrant_client = qdrant_client
         self.embedding_client = embedding_client
-        # ✅ OPTIMIZED: Cache member projects per request to avoid repeated MongoDB queries
-        self._member_projects_cache: Dict[str, List[str]] = {}
+        self.splade_client = splade_client
         # Minimal English stopword list for lightweight keyword-overlap filtering
         self._STOPWORDS: Set[str] = {
             "a", "an", "the", "and", "or", "but", "if", "then", "else", "when", "at", "by",
@@ -115,10 +174,8 @@ class ChunkAwareRetriever:
         from qdrant_client.models import Filter, FieldCondition, MatchValue
         
         # Step 1: Initial vector search (retrieve more chunks to cover more docs)
-        vectors = self.embedding_client.encode([query])
-        if not vectors:
-            raise RuntimeError("Embedding service returned empty vector")
-        query_embedding = vectors[0]
+        # Dense and sparse query vectors are computed concurrently
+        query_embedding, splade_vec = await encode_query(query, self.embedding_client, self.splade_client)
         
         # Build filter with optional content_type and global business scoping
         must_conditions = []
@@ -134,15 +191,11 @@ class ChunkAwareRetriever:
             must_conditions.append(FieldCondition(key="business_id", match=MatchValue(value=normalized_business_id)))
 
         # Member-level project RBAC scoping
-        # ✅ OPTIMIZED: Cache member projects at request start
+        # ✅ OPTIMIZED: Member projects come from the shared TTL cache (in-process + Redis)
         member_uuid = MEMBER_UUID()
         if member_uuid:
             try:
-                # Check cache first
-                cache_key = f"{member_uuid}:{business_uuid}"
-                if cache_key not in self._member_projects_cache:
-                    self._member_projects_cache[cache_key] = await self._get_member_projects(member_uuid, business_uuid)
-                member_projects = self._member_projects_cache[cache_key]
+                member_projects = await self._get_member_projects(member_uuid, business_uuid)
                 if member_projects:
                     # Only apply member filtering for content types that belong to projects
                     project_content_types = {"page", "work_item", "cycle", "module", "epic", "feature", "user_story"}
@@ -187,10 +240,7 @@ class ChunkAwareRetriever:
         # Try SPLADE for sparse query
         sparse_added = False
         try:
-            from qdrant.encoder import get_splade_encoder
-            splade = get_splade_encoder()
-            splade_vec = splade.encode_text(query)
-            if splade_vec.get("indices"):
+            if splade_vec and splade_vec.get("indices"):
                 sparse_prefetch = Prefetch(
                     query=NearestQuery(
                         nearest=SparseVector(indices=splade_vec["indices"], values=splade_vec["values"]),
@@ -221,12 +271,12 @@ class ChunkAwareRetriever:
         hybrid_query = FusionQuery(fusion=Fusion.RRF)
 
         try:
-            search_results = self.qdrant_client.query_points(
+            search_results = (await self.qdrant_client.query_points(
                 collection_name=collection_name,
                 prefetch=prefetch_list,
                 query=hybrid_query,
                 limit=initial_limit,
-            ).points
+            )).points
         except Exception as e:
             logger.error(f"Hybrid search failed: {e}")
             return []
@@ -376,14 +426,11 @@ class ChunkAwareRetriever:
         business_uuid = BUSINESS_UUID()
         member_uuid = MEMBER_UUID()
         
-        # Get member projects once (use cache if available)
+        # Get member projects once (served from the shared member-projects cache)
         member_projects = None
         if member_uuid:
             try:
-                cache_key = f"{member_uuid}:{business_uuid}"
-                if cache_key not in self._member_projects_cache:
-                    self._member_projects_cache[cache_key] = await self._get_member_projects(member_uuid, business_uuid)
-                member_projects = self._member_projects_cache[cache_key]
+                member_projects = await self._get_member_projects(member_uuid, business_uuid)
             except Exception as e:
                 logger.error(f"Error getting member projects for adjacent chunks '{member_uuid}': {e}")
         
@@ -418,7 +465,7 @@ class ChunkAwareRetriever:
         # Single batch query for all adjacent chunks
         try:
             batch_filter = Filter(should=should_conditions)
-            scroll_result = self.qdrant_client.scroll(
+            scroll_result = await self.qdrant_client.scroll(
                 collection_name=collection_name,
                 scroll_filter=batch_filter,
                 limit=len(all_chunks_to_fetch),
@@ -482,7 +529,7 @@ class ChunkAwareRetriever:
                         elif content_type == "project":
                             filter_conditions.append(FieldCondition(key="mongo_id", match=MatchAny(any=member_projects)))
                     
-                    scroll_result = self.qdrant_client.scroll(
+                    scroll_result = await self.qdrant_client.scroll(
                         collection_name=collection_name,
                         scroll_filter=Filter(must=filter_conditions),
                         limit=1,
@@ -765,6 +812,9 @@ class ChunkAwareRetriever:
         """
         Get list of project IDs that the member has access to.
 
+        Served from the shared member-projects cache (in-process + Redis), which
+        falls back to the ``members`` aggregation on a miss.
+
         Args:
             member_uuid: The member's UUID
             business_uuid: The business UUID for additional scoping
@@ -772,67 +822,9 @@ class ChunkAwareRetriever:
         Returns:
             List of project IDs the member can access (normalized like Qdrant expects)
         """
-        try:
-            # Import here to avoid circular imports
-            from mongo.client import direct_mongo_client
-            from mongo.constants import uuid_str_to_mongo_binary
+        from mongo.member_projects import member_projects_cache
 
-            # Query MongoDB to get projects the member is associated with
-            # memberId is the staff ID (staff identifier)
-            member_bin = uuid_str_to_mongo_binary(member_uuid)
-            pipeline = [
-                {
-                    "$match": {
-                        "$or": [
-                            {"memberId": member_bin},
-                            {"staff._id": member_bin}
-                        ]
-                    }
-                }
-            ]
-
-            # Add business scoping if available - need to join with project collection first
-            if business_uuid:
-                biz_bin = uuid_str_to_mongo_binary(business_uuid)
-                pipeline.extend([
-                    {
-                        "$lookup": {
-                            "from": "project",
-                            "localField": "project._id",
-                            "foreignField": "_id",
-                            "as": "__biz_proj__"
-                        }
-                    },
-                    {
-                        "$match": {
-                            "__biz_proj__.business._id": biz_bin
-                        }
-                    },
-                    {
-                        "$unset": "__biz_proj__"
-                    }
-                ])
-
-            # Project the project_id
-            pipeline.append({
-                "$project": {
-                    "project_id": "$project._id"
-                }
-            })
-
-            results = await direct_mongo_client.aggregate("ProjectManagement", "members", pipeline)
-
-            # Extract project IDs and convert back to string format using same normalization as Qdrant
-            project_ids = []
-            for result in results:
-                if result.get("project_id"):
-                    project_ids.append(self._normalize_mongo_id(result["project_id"]))
-
-            return project_ids
-
-        except Exception as e:
-            logger.error(f"Error querying member projects: {e}")
-            return []
+        return await member_projects_cache.get(member_uuid, business_uuid)
 
 
 def format_reconstructed_results(
@@ -37,11 +37,12 @@ except ImportError:
 from bson import ObjectId, Binary
 # Import necessary modules for RAG and MongoDB operations
 try:
-    from qdrant.retrieval import ChunkAwareRetriever
+    from qdrant.retrieval import ChunkAwareRetriever, encode_query
     from qdrant.initializer import RAGTool
     from mongo.constants import mongodb_tools, DATABASE_NAME, QDRANT_COLLECTION_NAME
 except ImportError:
     ChunkAwareRetriever = None
+    encode_query = None
     RAGTool = None
     mongodb_tools = None
     DATABASE_NAME = os.getenv("MONGODB_DATABASE", "ProjectManagement")
@@ -155,9 +156,10 @@ class SmartFilterTools:
             cls._instance.rag_available = False
         return cls._instance
 
-    def __init__(self, qdrant_client=None, embedding_client=None):
+    def __init__(self, qdrant_client=None, embedding_client=None, splade_client=None):
         self.qdrant_client = qdrant_client
         self.embedding_client = embedding_client
+        self.splade_client = splade_client
         # Minimal English stopword list for lightweight keyword-overlap filtering
         self._STOPWORDS: Set[str] = {
             "a", "an", "the", "and", "or", "but", "if", "then", "else", "when", "at", "by",
@@ -231,7 +233,8 @@ class SmartFilterTools:
             if self.rag_tool and self.rag_tool.connected:
                 self.retriever = ChunkAwareRetriever(
                     qdrant_client=self.rag_tool.qdrant_client,
-                    embedding_client=self.rag_tool.embedding_client
+                    embedding_client=self.rag_tool.embedding_client,
+                    splade_client=self.rag_tool.splade_client,
                 )
                 self.rag_available = True
                 # Only log on first initialization
@@ -520,10 +523,8 @@ class SmartFilterTools:
         from qdrant_client.models import Filter, FieldCondition, MatchValue
         
         # Step 1: Initial vector search (retrieve more chunks to cover more docs)
-        vectors = self.embedding_client.encode([query])
-        if not vectors:
-            raise RuntimeError("Embedding service returned empty vector")
-        query_embedding = vectors[0]
+        # Dense and sparse query vectors are computed concurrently
+        query_embedding, splade_vec = await encode_query(query, self.embedding_client, self.splade_client)
         
         # Build filter with optional content_type and global business scoping
         must_conditions = []
@@ -564,10 +565,7 @@ class SmartFilterTools:
         # Try SPLADE for sparse query
         sparse_added = False
         try:
-            from qdrant.encoder import get_splade_encoder
-            splade = get_splade_encoder()
-            splade_vec = splade.encode_text(query)
-            if splade_vec.get("indices"):
+            if splade_vec and splade_vec.get("indices"):
                 sparse_prefetch = Prefetch(
                     query=NearestQuery(
                         nearest=SparseVector(indices=splade_vec["indices"], values=splade_vec["values"]),
@@ -598,12 +596,12 @@ class SmartFilterTools:
         hybrid_query = FusionQuery(fusion=Fusion.RRF)
 
         try:
-            search_results = self.qdrant_client.query_points(
+            search_results = (await self.qdrant_client.query_points(
                 collection_name=collection_name,
                 prefetch=prefetch_list,
                 query=hybrid_query,
                 limit=initial_limit,
-            ).points
+            )).points
         except Exception as e:
             logger.error(f"Hybrid search failed: {e}")
             return []
@@ -758,7 +756,7 @@ class SmartFilterTools:
 
                     
                     # Use scroll to find specific chunk (more efficient than search for exact match)
-                    scroll_result = self.qdrant_client.scroll(
+                    scroll_result = await self.qdrant_client.scroll(
                         collection_name=collection_name,
                         scroll_filter=Filter(must=filter_conditions),
                         limit=1,
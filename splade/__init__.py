@@ -1,5 +1,5 @@
 """SPLADE service client."""
 
-from .service_client import SpladeServiceClient, SpladeServiceError
+from .service_client import AsyncSpladeServiceClient, SpladeServiceClient, SpladeServiceError
 
-__all__ = ["SpladeServiceClient", "SpladeServiceError"]
+__all__ = ["AsyncSpladeServiceClient", "SpladeServiceClient", "SpladeServiceError"]
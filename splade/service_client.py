@@ -1,10 +1,17 @@
 from __future__ import annotations
 
 from typing import List, Sequence
+import asyncio
+import importlib.util
 import json
 import os
 
 import httpx
+import numpy as np
+
+# Compact response format negotiated via Accept (see splade_service/app.py):
+#   uint32 count | uint32 nnz[count] | uint32 indices[sum(nnz)] | float32 values[sum(nnz)]
+SPARSE_MEDIA_TYPE = "application/x-sparse-float32"
 
 
 class SpladeServiceError(RuntimeError):
@@ -20,6 +27,8 @@ class SpladeServiceClient:
         *,
         timeout: float = 30.0,
         headers: dict[str, str] | None = None,
+        batch_size: int | None = None,
+        binary: bool | None = None,
     ) -> None:
         url = base_url or os.getenv("SPLADE_SERVICE_URL")
         if not url:
@@ -27,23 +36,42 @@ class SpladeServiceClient:
 
         self.base_url = url.rstrip("/")
         self.client = httpx.Client(timeout=timeout, headers=headers)
+        self.batch_size = max(batch_size or int(os.getenv("SPLADE_CLIENT_BATCH_SIZE", "64")), 1)
+        self.request_headers = _accept_headers(binary)
 
     def encode(
         self,
         texts: Sequence[str],
         *,
         max_terms: int | None = None,
+        batch_size: int | None = None,
     ) -> List[dict[str, List[float]]]:
-        """Encode a batch of texts to sparse vectors."""
+        """Encode a batch of texts to sparse vectors.
+
+        Large inputs are split into requests of ``batch_size`` texts; the
+        returned vectors are always in the same order as ``texts``.
+        """
         if not texts:
             return []
 
-        payload: dict[str, object] = {"inputs": list(texts)}
+        texts = list(texts)
+        step = batch_size or self.batch_size
+        vectors: List[dict[str, List[float]]] = []
+        for start in range(0, len(texts), step):
+            vectors.extend(self._encode_request(texts[start : start + step], max_terms))
+        return vectors
+
+    def _encode_request(
+        self,
+        texts: List[str],
+        max_terms: int | None,
+    ) -> List[dict[str, List[float]]]:
+        payload: dict[str, object] = {"inputs": texts}
         if max_terms is not None:
             payload["max_terms"] = int(max_terms)
 
         try:
-            response = self.client.post(f"{self.base_url}/encode", json=payload)
+            response = self.client.post(f"{self.base_url}/encode", json=payload, headers=self.request_headers)
         except Exception as exc:  # pragma: no cover - network failure guard
             raise SpladeServiceError(f"Failed to reach SPLADE service: {exc}") from exc
 
@@ -52,18 +80,12 @@ class SpladeServiceClient:
                 f"SPLADE service returned {response.status_code}: {self._safe_extract_error(response)}"
             )
 
-        data = response.json()
-        vectors = data.get("sparse_vectors")
-        if not isinstance(vectors, list):
-            raise SpladeServiceError("SPLADE service response missing 'sparse_vectors'")
-
-        return [
-            {
-                "indices": [int(i) for i in (vector.get("indices") or [])],
-                "values": [float(v) for v in (vector.get("values") or [])],
-            }
-            for vector in vectors
-        ]
+        vectors = _decode_sparse_vectors(response)
+        if len(vectors) != len(texts):
+            raise SpladeServiceError(
+                f"SPLADE service returned {len(vectors)} vectors for {len(texts)} inputs"
+            )
+        return vectors
 
     def close(self) -> None:
         self.client.close()
@@ -77,3 +99,142 @@ class SpladeServiceClient:
         except Exception:
             pass
         return response.text
+
+
+def _accept_headers(binary: bool | None) -> dict[str, str]:
+    if binary is None:
+        binary = os.getenv("SPLADE_BINARY_WIRE", "true").lower() not in {"0", "false", "no"}
+    if not binary:
+        return {}
+    return {"Accept": f"{SPARSE_MEDIA_TYPE}, application/json;q=0.5"}
+
+
+def _decode_sparse_vectors(response: httpx.Response) -> List[dict[str, List[float]]]:
+    if response.headers.get("content-type", "").startswith(SPARSE_MEDIA_TYPE):
+        body = response.content
+        try:
+            count = int(np.frombuffer(body, dtype="<u4", count=1)[0])
+            nnz = np.frombuffer(body, dtype="<u4", count=count, offset=4)
+            total = int(nnz.sum())
+            indices_offset = 4 * (1 + count)
+            indices = np.frombuffer(body, dtype="<u4", count=total, offset=indices_offset)
+            values = np.frombuffer(body, dtype="<f4", count=total, offset=indices_offset + 4 * total)
+        except ValueError as exc:
+            raise SpladeServiceError(f"Malformed SPLADE binary response: {exc}") from exc
+        bounds = np.concatenate(([0], np.cumsum(nnz))).tolist()
+        index_list = indices.tolist()
+        value_list = values.tolist()
+        return [
+            {"indices": index_list[start:end], "values": value_list[start:end]}
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+
+    data = response.json()
+    vectors = data.get("sparse_vectors")
+    if not isinstance(vectors, list):
+        raise SpladeServiceError("SPLADE service response missing 'sparse_vectors'")
+    return [
+        {
+            "indices": [int(i) for i in (vector.get("indices") or [])],
+            "values": [float(v) for v in (vector.get("values") or [])],
+        }
+        for vector in vectors
+    ]
+
+
+class AsyncSpladeServiceClient:
+    """Asynchronous client for the SPLADE encoding microservice.
+
+    Keeps a pooled keep-alive connection set (HTTP/2 when ``h2`` is
+    installed) and accepts a per-call timeout, for use on the request path.
+    """
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        *,
+        timeout: float = 30.0,
+        headers: dict[str, str] | None = None,
+        batch_size: int | None = None,
+        max_connections: int | None = None,
+        max_keepalive_connections: int | None = None,
+        http2: bool | None = None,
+        binary: bool | None = None,
+    ) -> None:
+        url = base_url or os.getenv("SPLADE_SERVICE_URL")
+        if not url:
+            raise ValueError("SPLADE service URL is not configured (SPLADE_SERVICE_URL)")
+
+        self.base_url = url.rstrip("/")
+        self.batch_size = max(batch_size or int(os.getenv("SPLADE_CLIENT_BATCH_SIZE", "64")), 1)
+        self.request_headers = _accept_headers(binary)
+        limits = httpx.Limits(
+            max_connections=max_connections or int(os.getenv("SPLADE_MAX_CONNECTIONS", "32")),
+            max_keepalive_connections=max_keepalive_connections
+            or int(os.getenv("SPLADE_MAX_KEEPALIVE", "16")),
+        )
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            headers=headers,
+            limits=limits,
+            http2=importlib.util.find_spec("h2") is not None if http2 is None else http2,
+        )
+
+    async def encode(
+        self,
+        texts: Sequence[str],
+        *,
+        max_terms: int | None = None,
+        batch_size: int | None = None,
+        timeout: float | None = None,
+    ) -> List[dict[str, List[float]]]:
+        """Encode texts to sparse vectors, preserving input order.
+
+        Inputs larger than ``batch_size`` are sent as concurrent requests.
+        """
+        if not texts:
+            return []
+
+        texts = list(texts)
+        step = batch_size or self.batch_size
+        batches = await asyncio.gather(
+            *(
+                self._encode_request(texts[start : start + step], max_terms, timeout)
+                for start in range(0, len(texts), step)
+            )
+        )
+        return [vector for batch in batches for vector in batch]
+
+    async def _encode_request(
+        self,
+        texts: List[str],
+        max_terms: int | None,
+        timeout: float | None,
+    ) -> List[dict[str, List[float]]]:
+        payload: dict[str, object] = {"inputs": texts}
+        if max_terms is not None:
+            payload["max_terms"] = int(max_terms)
+
+        request_kwargs = {"timeout": timeout} if timeout is not None else {}
+        try:
+            response = await self.client.post(
+                f"{self.base_url}/encode", json=payload, headers=self.request_headers, **request_kwargs
+            )
+        except Exception as exc:  # pragma: no cover - network failure guard
+            raise SpladeServiceError(f"Failed to reach SPLADE service: {exc}") from exc
+
+        if response.status_code >= 400:
+            raise SpladeServiceError(
+                f"SPLADE service returned {response.status_code}: "
+                f"{SpladeServiceClient._safe_extract_error(response)}"
+            )
+
+        vectors = _decode_sparse_vectors(response)
+        if len(vectors) != len(texts):
+            raise SpladeServiceError(
+                f"SPLADE service returned {len(vectors)} vectors for {len(texts)} inputs"
+            )
+        return vectors
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
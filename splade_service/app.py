@@ -3,7 +3,8 @@ from __future__ import annotations
 from typing import List, Optional
 import os
 
-from fastapi import FastAPI, HTTPException
+import numpy as np
+from fastapi import FastAPI, HTTPException, Request, Response
 from pydantic import BaseModel, Field
 
 from encoder import get_encoder
@@ -11,6 +12,11 @@ from encoder import get_encoder
 
 MAX_TERMS_DEFAULT = int(os.getenv("SPLADE_MAX_TERMS", "200"))
 
+# Compact response format, served only when the client lists it in Accept:
+#   uint32 count | uint32 nnz[count] | uint32 indices[sum(nnz)] | float32 values[sum(nnz)]
+# all little-endian, vectors concatenated in input order. JSON stays the default.
+SPARSE_MEDIA_TYPE = "application/x-sparse-float32"
+
 
 class EncodeRequest(BaseModel):
     inputs: List[str] = Field(default_factory=list)
@@ -36,18 +42,31 @@ async def health() -> dict[str, str]:
 
 
 @app.post("/encode", response_model=EncodeResponse)
-async def encode(request: EncodeRequest) -> EncodeResponse:
+async def encode(request: EncodeRequest, http_request: Request):
     encoder = get_encoder()
+    binary = SPARSE_MEDIA_TYPE in http_request.headers.get("accept", "")
     if not request.inputs:
-        return EncodeResponse(sparse_vectors=[])
+        return _sparse_response([]) if binary else EncodeResponse(sparse_vectors=[])
 
     max_terms = request.max_terms or MAX_TERMS_DEFAULT
     if max_terms <= 0:
         raise HTTPException(status_code=400, detail="max_terms must be > 0")
 
-    vectors = [encoder.encode(text, max_terms=max_terms) for text in request.inputs]
+    vectors = encoder.encode_batch(request.inputs, max_terms=max_terms)
+    if binary:
+        return _sparse_response(vectors)
     return EncodeResponse(sparse_vectors=vectors)
 
 
+def _sparse_response(vectors: List[dict[str, List[float]]]) -> Response:
+    nnz = np.asarray([len(vector["indices"]) for vector in vectors], dtype="<u4")
+    indices = np.asarray([i for vector in vectors for i in vector["indices"]], dtype="<u4")
+    values = np.asarray([v for vector in vectors for v in vector["values"]], dtype="<f4")
+    body = b"".join(
+        (np.asarray([len(vectors)], dtype="<u4").tobytes(), nnz.tobytes(), indices.tobytes(), values.tobytes())
+    )
+    return Response(content=body, media_type=SPARSE_MEDIA_TYPE)
+
+
 def create_app() -> FastAPI:
     return app
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import Dict, List
+from typing import Dict, List, Sequence
 import os
 
 from transformers import AutoModelForMaskedLM, AutoTokenizer  # type: ignore
@@ -10,6 +10,14 @@ import torch  # type: ignore
 
 
 DEFAULT_MODEL_NAME = "naver/splade-cocondenser-ensembledistil"
+MAX_LENGTH = 512
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
 
 
 class SpladeEncoder:
@@ -43,36 +51,140 @@ class SpladeEncoder:
                 print(f"Warning: Hugging Face login failed: {e}")
 
         self.tokenizer = AutoTokenizer.from_pretrained(name)
-        self.model = AutoModelForMaskedLM.from_pretrained(name)
-        self.model.eval()
+        self.model = None
+        self.onnx_session = None
+        self.backend = os.getenv("SPLADE_BACKEND", "torch").lower()
+        if self.backend == "onnx":
+            self._init_onnx(name)
+        else:
+            self.backend = "torch"
+            self._load_torch_model()
+
+        # Upper bounds for a single forward pass. The token budget is measured on the
+        # padded batch (rows * longest row), which is what drives memory and compute.
+        self.max_batch_size = max(_env_int("SPLADE_BATCH_SIZE", 32), 1)
+        self.max_batch_tokens = max(_env_int("SPLADE_MAX_BATCH_TOKENS", 8192), MAX_LENGTH)
 
-    @torch.inference_mode()
     def encode(self, text: str, max_terms: int = 200) -> Dict[str, List[float]]:
-        if not text or not text.strip():
-            return {"indices": [], "values": []}
+        return self.encode_batch([text], max_terms=max_terms)[0]
 
-        inputs = self.tokenizer(
-            text,
-            return_tensors="pt",
-            truncation=True,
-            max_length=512,
-        )
+    def encode_batch(self, texts: Sequence[str], max_terms: int = 200) -> List[Dict[str, List[float]]]:
+        """Encode many texts, running padded batches through the model.
 
-        logits = self.model(**inputs).logits.squeeze(0)
-        activated = torch.relu(logits)
-        aggregated = torch.log1p(torch.sum(activated, dim=0))
+        Output order matches ``texts``; blank inputs yield empty vectors.
+        """
+        results: List[Dict[str, List[float]]] = [{"indices": [], "values": []} for _ in texts]
+        positions = [i for i, text in enumerate(texts) if text and text.strip()]
+        if not positions:
+            return results
 
-        k = min(max_terms, aggregated.numel())
-        values, indices = torch.topk(aggregated, k)
-
-        mask = values > 0
-        values = values[mask]
-        indices = indices[mask]
+        encoded = self.tokenizer(
+            [texts[i] for i in positions],
+            truncation=True,
+            max_length=MAX_LENGTH,
+        )
+        lengths = [len(ids) for ids in encoded["input_ids"]]
+
+        for batch in self._plan_batches(lengths):
+            rows = self._encode_rows(
+                [{key: encoded[key][i] for key in encoded.keys()} for i in batch],
+                max_terms,
+            )
+            for i, row in zip(batch, rows):
+                results[positions[i]] = row
+        return results
+
+    def _load_torch_model(self) -> None:
+        if self.model is None:
+            self.model = AutoModelForMaskedLM.from_pretrained(self.model_name)
+            self.model.eval()
+
+    def _init_onnx(self, name: str) -> None:
+        """Load (exporting on first use) an ONNX graph of the model, optionally int8-quantized."""
+        from onnx_backend import OnnxRuntimeSession, default_onnx_dir, export_onnx, quantize_onnx
+
+        quantize = os.getenv("SPLADE_ONNX_QUANTIZE", "true").lower() in {"1", "true", "yes"}
+        onnx_dir = default_onnx_dir(name)
+        fp32_path = onnx_dir / "model.onnx"
+        path = onnx_dir / ("model.int8.onnx" if quantize else "model.onnx")
+
+        if not fp32_path.exists():
+            self._load_torch_model()
+            export_onnx(self.model, self.tokenizer, fp32_path)
+        if quantize and not path.exists():
+            quantize_onnx(fp32_path, path)
+        self.onnx_session = OnnxRuntimeSession(path, intra_op_threads=_env_int("SPLADE_ONNX_THREADS", 0) or None)
+        # The torch weights were only needed for export; release them
+        self.model = None
+
+    def _plan_batches(self, lengths: Sequence[int]) -> List[List[int]]:
+        """Group inputs of similar length so each padded batch stays within the token budget.
+
+        Inputs are visited shortest-first, so rows in a batch have close lengths
+        and padding waste stays small; callers map results back by index.
+        """
+        batches: List[List[int]] = []
+        current: List[int] = []
+        longest = 0
+        for i in sorted(range(len(lengths)), key=lengths.__getitem__):
+            candidate = max(longest, lengths[i])
+            if current and (
+                len(current) >= self.max_batch_size
+                or candidate * (len(current) + 1) > self.max_batch_tokens
+            ):
+                batches.append(current)
+                current, candidate = [], lengths[i]
+            current.append(i)
+            longest = candidate
+        if current:
+            batches.append(current)
+        return batches
+
+    def _encode_rows(self, features: List[Dict[str, List[int]]], max_terms: int) -> List[Dict[str, List[float]]]:
+        if self.onnx_session is not None:
+            return self._encode_rows_onnx(features, max_terms)
+        return self._encode_rows_torch(features, max_terms)
+
+    def _encode_rows_onnx(self, features: List[Dict[str, List[int]]], max_terms: int) -> List[Dict[str, List[float]]]:
+        from onnx_backend import top_terms
+
+        inputs = self.tokenizer.pad(features, padding=True, return_tensors="np")
+        aggregated = self.onnx_session.run(inputs["input_ids"], inputs["attention_mask"])
+        return top_terms(aggregated, max_terms)
 
-        return {
-            "indices": [int(i) for i in indices.tolist()],
-            "values": [float(v) for v in values.tolist()],
-        }
+    @torch.inference_mode()
+    def _encode_rows_torch(self, features: List[Dict[str, List[int]]], max_terms: int) -> List[Dict[str, List[float]]]:
+        inputs = self.tokenizer.pad(features, padding=True, return_tensors="pt")
+
+        logits = self.model(**inputs).logits
+        # Padding positions must not contribute to the pooled term weights
+        mask = inputs["attention_mask"].unsqueeze(-1).to(logits.dtype)
+        activated = torch.relu(logits) * mask
+        aggregated = torch.log1p(torch.sum(activated, dim=1))
+
+        k = min(max_terms, aggregated.size(-1))
+        values, indices = torch.topk(aggregated, k, dim=-1)
+
+        rows: List[Dict[str, List[float]]] = []
+        for row_values, row_indices in zip(values.tolist(), indices.tolist()):
+            kept = [(int(i), float(v)) for i, v in zip(row_indices, row_values) if v > 0]
+            rows.append({"indices": [i for i, _ in kept], "values": [v for _, v in kept]})
+        return rows
+
+    def validate_against_torch(self, texts: Sequence[str], k: int = 50) -> Dict[str, float]:
+        """Report top-k term overlap of the active backend against the float32 torch reference."""
+        from onnx_backend import term_overlap
+
+        session, self.onnx_session = self.onnx_session, None
+        try:
+            self._load_torch_model()
+            reference = self.encode_batch(texts, max_terms=k)
+        finally:
+            self.onnx_session = session
+        candidate = self.encode_batch(texts, max_terms=k)
+        report = term_overlap(reference, candidate, k)
+        report["backend"] = self.backend
+        return report
 
 
 @lru_cache(maxsize=1)
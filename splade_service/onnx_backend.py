@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+
+def default_onnx_dir(model_name: str) -> Path:
+    """Directory for exported graphs; lives under HF_HOME so it shares the model cache volume."""
+    root = os.getenv("SPLADE_ONNX_DIR") or os.path.join(
+        os.getenv("HF_HOME", os.path.expanduser("~/.cache/huggingface")), "onnx"
+    )
+    return Path(root) / model_name.replace("/", "--")
+
+
+def export_onnx(model: Any, tokenizer: Any, path: Path, *, opset: int = 17) -> Path:
+    """Export the masked-LM head together with SPLADE pooling.
+
+    The graph returns the ``[batch, vocab]`` term weights
+    ``log1p(sum_seq(relu(logits) * mask))`` so the full ``[batch, seq, vocab]``
+    logits tensor never leaves the runtime.
+    """
+    import torch
+
+    class _SpladePooled(torch.nn.Module):
+        def __init__(self) -> None:
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask):
+            logits = self.model(input_ids=input_ids, attention_mask=attention_mask).logits
+            mask = attention_mask.unsqueeze(-1).to(logits.dtype)
+            return torch.log1p(torch.sum(torch.relu(logits) * mask, dim=1))
+
+    sample = tokenizer(["onnx export probe", "a second, longer probe sentence"], padding=True, return_tensors="pt")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with torch.inference_mode():
+        torch.onnx.export(
+            _SpladePooled().eval(),
+            (sample["input_ids"], sample["attention_mask"]),
+            str(path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["term_weights"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "term_weights": {0: "batch"},
+            },
+            opset_version=opset,
+            do_constant_folding=True,
+        )
+    return path
+
+
+def quantize_onnx(source: Path, target: Path) -> Path:
+    """Dynamic (weight-only) int8 quantization; activations stay float at runtime."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    quantize_dynamic(str(source), str(target), weight_type=QuantType.QInt8)
+    return target
+
+
+class OnnxRuntimeSession:
+    """Thin wrapper around an ``onnxruntime.InferenceSession`` tuned for small CPU containers."""
+
+    def __init__(self, path: Path, *, intra_op_threads: int | None = None) -> None:
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = max(intra_op_threads or os.cpu_count() or 1, 1)
+        options.inter_op_num_threads = 1
+        self.path = path
+        self.session = ort.InferenceSession(str(path), sess_options=options, providers=["CPUExecutionProvider"])
+
+    def run(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        feeds = {"input_ids": input_ids.astype(np.int64), "attention_mask": attention_mask.astype(np.int64)}
+        return self.session.run(None, feeds)[0]
+
+
+def top_terms(aggregated: np.ndarray, max_terms: int) -> List[Dict[str, List[float]]]:
+    """Vectorised per-row top-k over ``[batch, vocab]`` weights, dropping non-positive terms."""
+    k = min(max_terms, aggregated.shape[-1])
+    candidates = np.argpartition(-aggregated, k - 1, axis=-1)[:, :k]
+    values = np.take_along_axis(aggregated, candidates, axis=-1)
+    order = np.argsort(-values, axis=-1)
+    indices = np.take_along_axis(candidates, order, axis=-1)
+    values = np.take_along_axis(values, order, axis=-1)
+
+    rows: List[Dict[str, List[float]]] = []
+    for row_values, row_indices in zip(values.tolist(), indices.tolist()):
+        kept = [(int(i), float(v)) for i, v in zip(row_indices, row_values) if v > 0]
+        rows.append({"indices": [i for i, _ in kept], "values": [v for _, v in kept]})
+    return rows
+
+
+def term_overlap(
+    reference: Sequence[Dict[str, List[float]]],
+    candidate: Sequence[Dict[str, List[float]]],
+    k: int,
+) -> Dict[str, float]:
+    """Overlap@k of term ids between two lists of sparse vectors (both sorted by weight)."""
+    overlaps: List[float] = []
+    for ref, cand in zip(reference, candidate):
+        ref_terms = set(ref["indices"][:k])
+        cand_terms = set(cand["indices"][:k])
+        if not ref_terms and not cand_terms:
+            overlaps.append(1.0)
+            continue
+        overlaps.append(len(ref_terms & cand_terms) / max(len(ref_terms), 1))
+    if not overlaps:
+        return {"rows": 0, "k": k, "min_overlap": 1.0, "mean_overlap": 1.0}
+    return {
+        "rows": len(overlaps),
+        "k": k,
+        "min_overlap": float(min(overlaps)),
+        "mean_overlap": float(sum(overlaps) / len(overlaps)),
+    }
@@ -0,0 +1,47 @@
+"""Compare the ONNX SPLADE backend against the float32 torch reference.
+
+Reports overlap@k of the top-weighted term ids per input. Usage (inside the
+SPLADE container):
+    SPLADE_BACKEND=onnx python validate_onnx.py [--k 50] [file-with-one-text-per-line]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+
+os.environ.setdefault("SPLADE_BACKEND", "onnx")
+
+from encoder import SpladeEncoder  # noqa: E402
+
+_SAMPLES = [
+    "Fix login redirect loop on the mobile app",
+    "Sprint planning notes for the payments module",
+    "As a project admin I want to archive completed cycles",
+    "Database migration fails when the workspace has no members",
+    "Export work items to CSV including custom properties and labels",
+]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", nargs="?", help="File with one text per line (defaults to built-in samples)")
+    parser.add_argument("--k", type=int, default=50, help="Number of top terms to compare")
+    args = parser.parse_args()
+
+    texts = _SAMPLES
+    if args.path:
+        with open(args.path, encoding="utf-8") as handle:
+            texts = [line.strip() for line in handle if line.strip()]
+
+    encoder = SpladeEncoder(model_name=os.getenv("SPLADE_MODEL_NAME"))
+    report = encoder.validate_against_torch(texts, k=args.k)
+    report["model"] = encoder.model_name
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
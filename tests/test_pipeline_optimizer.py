@@ -0,0 +1,153 @@
+import pytest
+
+pytest.importorskip("bson")
+
+from mongo.pipeline_optimizer import PipelineOptimizer  # noqa: E402
+
+
+def optimize(pipeline, concise_lookups=True):
+    stages, _ = PipelineOptimizer(concise_lookups=concise_lookups).optimize(pipeline)
+    return stages
+
+
+def lookup(alias, concise=True):
+    if concise:
+        return {"$lookup": {"from": "project", "localField": "projectId", "foreignField": "_id", "as": alias}}
+    return {"$lookup": {
+        "from": "project",
+        "let": {"pid": "$projectId"},
+        "pipeline": [{"$match": {"$expr": {"$eq": ["$_id", "$$pid"]}}}],
+        "as": alias,
+    }}
+
+
+def inner_project(stage):
+    inner = stage["$lookup"].get("pipeline") or []
+    return inner[-1]["$project"] if inner and "$project" in inner[-1] else None
+
+
+def test_nested_inclusion_projection_keeps_parent_field():
+    pipeline = [
+        {"$match": {"a": 1}},
+        {"$sort": {"createdAt": -1}},
+        {"$project": {"project": {"name": 1}, "title": 1}},
+    ]
+    stages = optimize(pipeline)
+    early = stages[1]["$project"]
+    assert early.get("project") == 1
+    assert early.get("title") == 1
+
+
+def test_nested_projection_trims_lookup_to_subfield():
+    pipeline = [
+        lookup("pd"),
+        {"$unwind": "$pd"},
+        {"$project": {"pd": {"name": 1}, "title": 1}},
+    ]
+    stages = optimize(pipeline)
+    assert inner_project(stages[1]) == {"_id": 1, "name": 1}
+
+
+def test_unknown_projection_shape_skips_early_project():
+    pipeline = [
+        {"$match": {"a": 1}},
+        {"$sort": {"createdAt": -1}},
+        {"$project": {"title": 1, "kind": "literal"}},
+    ]
+    assert optimize(pipeline) == pipeline
+
+
+def test_positional_path_drops_array_index_from_lookup_projection():
+    pipeline = [
+        lookup("pd"),
+        {"$match": {"pd.0.name": "x"}},
+        {"$group": {"_id": "$title", "count": {"$sum": 1}}},
+    ]
+    stages = optimize(pipeline)
+    lookup_stage = next(stage for stage in stages if "$lookup" in stage)
+    assert inner_project(lookup_stage) == {"_id": 1, "name": 1}
+
+
+def test_positional_whole_element_keeps_joined_document():
+    pipeline = [
+        lookup("pd"),
+        {"$project": {"first": {"$arrayElemAt": ["$pd", 0]}}},
+        {"$match": {"pd.0": {"$exists": True}}},
+        {"$count": "total"},
+    ]
+    stages = optimize(pipeline)
+    lookup_stage = next(stage for stage in stages if "$lookup" in stage)
+    assert inner_project(lookup_stage) is None
+
+
+def test_unwound_lookup_is_not_dropped():
+    pipeline = [
+        lookup("pd"),
+        {"$unwind": "$pd"},
+        {"$count": "total"},
+    ]
+    stages = optimize(pipeline)
+    assert any("$lookup" in stage for stage in stages)
+    assert any("$unwind" in stage for stage in stages)
+
+
+def test_unused_lookup_before_group_is_dropped():
+    pipeline = [
+        lookup("pd"),
+        {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+    ]
+    stages = optimize(pipeline)
+    assert not any("$lookup" in stage for stage in stages)
+
+
+def test_count_tail_projects_only_match_fields():
+    pipeline = [
+        lookup("pd"),
+        {"$unwind": "$pd"},
+        {"$match": {"pd.status": "open"}},
+        {"$count": "total"},
+    ]
+    stages = optimize(pipeline)
+    assert stages[0] == {"$project": {"_id": 1, "pd": 1, "projectId": 1}}
+    assert inner_project(stages[1]) == {"_id": 1, "status": 1}
+
+
+def test_group_tail_reads_grouped_fields():
+    pipeline = [
+        {"$sort": {"createdAt": -1}},
+        {"$group": {"_id": "$state.name", "total": {"$sum": "$estimate"}}},
+    ]
+    stages = optimize(pipeline)
+    assert stages[0] == {"$project": {"_id": 1, "createdAt": 1, "estimate": 1, "state": 1}}
+
+
+def test_match_is_pushed_ahead_of_unrelated_lookup():
+    pipeline = [
+        lookup("pd"),
+        {"$match": {"status": "open"}},
+        {"$count": "total"},
+    ]
+    stages = optimize(pipeline)
+    assert stages[0] == {"$match": {"status": "open"}}
+
+
+def test_concise_lookup_projection_disabled_for_old_servers():
+    pipeline = [
+        lookup("pd"),
+        {"$unwind": "$pd"},
+        {"$project": {"name": "$pd.name"}},
+    ]
+    assert inner_project(optimize(pipeline, concise_lookups=False)[1]) is None
+    assert inner_project(optimize(pipeline, concise_lookups=True)[1]) == {"_id": 1, "name": 1}
+
+
+def test_pipeline_lookup_gets_inner_projection_regardless_of_server_mode():
+    pipeline = [
+        lookup("pd", concise=False),
+        {"$unwind": "$pd"},
+        {"$project": {"name": "$pd.name"}},
+    ]
+    stages = optimize(pipeline, concise_lookups=False)
+    lookup_stage = next(stage for stage in stages if "$lookup" in stage)
+    assert lookup_stage["$lookup"]["pipeline"][0] == {"$match": {"$expr": {"$eq": ["$_id", "$$pid"]}}}
+    assert inner_project(lookup_stage) == {"_id": 1, "name": 1}
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+# Importing agent.* loads the whole agent package (LLM clients, Mongo, Redis)
+plan_cache = pytest.importorskip("agent.plan_cache")
+ResultCache = plan_cache.ResultCache
+pipeline_collections = plan_cache.pipeline_collections
+
+
+class FakeRedis:
+    def __init__(self):
+        self.reads = []
+
+    async def mget(self, keys):
+        self.reads.append(keys)
+        return ["3" for _ in keys]
+
+
+def result_cache():
+    cache = ResultCache(enabled=True)
+    cache.redis_client = FakeRedis()
+    return cache
+
+
+def test_streamed_collections_get_a_versioned_key():
+    cache = result_cache()
+    collections = pipeline_collections("workItem", [{"$lookup": {"from": "project", "as": "p"}}]) | {"members"}
+    key = asyncio.run(cache.make_key("open items", ("biz", "member"), collections))
+    assert key is not None
+    assert cache.redis_client.reads == [[
+        "mongo:collection_version:members",
+        "mongo:collection_version:project",
+        "mongo:collection_version:workItem",
+    ]]
+
+
+def test_unstreamed_lookup_source_bypasses_the_cache():
+    cache = result_cache()
+    pipeline = [{"$lookup": {"from": "projectState", "localField": "state._id", "foreignField": "_id", "as": "s"}}]
+    key = asyncio.run(cache.make_key("items by state", ("biz", "member"), pipeline_collections("workItem", pipeline)))
+    assert key is None
+    assert cache.redis_client.reads == []
+    cache.set(key, [{"count": 1}])
+    assert cache.get(key) is None
@@ -14,7 +14,9 @@ from dotenv import load_dotenv
 import logging
 from mongo.constants import DATABASE_NAME
 from agent.planner import plan_and_execute_query
-from mongo.conversations import save_user_message
+from mongo.conversations import save_user_message, conversation_write_buffer
+from mongo.request_context import set_request_context
+from agent.token_stream import TokenCoalescer, get_token_stream_options, negotiate_token_coalescing, set_token_stream_options
 import os
 import contextlib
 from time import perf_counter
@@ -32,10 +34,13 @@ class StreamingCallbackHandler(AsyncCallbackHandler):
         # Optional: allow showing raw tool outputs if explicitly enabled
         import os as _os
         self.stream_tool_outputs = _os.getenv("STREAM_TOOL_OUTPUTS", "false").lower() == "true"
+        self._tokens = TokenCoalescer(websocket.send_json, get_token_stream_options(websocket))
 
     async def on_llm_start(self, *args, **kwargs):
         """Called when LLM starts generating"""
         self.start_time = time.time()
+        await self._tokens.flush()
+        self._tokens.reset()
         await self.websocket.send_json({
             "type": "llm_start",
             "timestamp": datetime.now().isoformat()
@@ -43,15 +48,12 @@ class StreamingCallbackHandler(AsyncCallbackHandler):
 
     async def on_llm_new_token(self, token: str, **kwargs):
         """Stream each token as it's generated"""
-        await self.websocket.send_json({
-            "type": "token",
-            "content": token,
-            "timestamp": datetime.now().isoformat()
-        })
+        await self._tokens.add(token)
 
     async def on_llm_end(self, *args, **kwargs):
         """Called when LLM finishes generating"""
         elapsed_time = time.time() - self.start_time if self.start_time else 0
+        await self._tokens.close()
         await self.websocket.send_json({
             "type": "llm_end",
             "elapsed_time": elapsed_time,
@@ -61,6 +63,7 @@ class StreamingCallbackHandler(AsyncCallbackHandler):
     async def on_tool_start(self, serialized: Dict[str, Any], input_str: str, **kwargs):
         """Called when a tool starts executing"""
         tool_name = serialized.get("name", "Unknown Tool")
+        await self._tokens.flush()
         await self.websocket.send_json({
             "type": "tool_start",
             "tool_name": tool_name,
@@ -70,6 +73,7 @@ class StreamingCallbackHandler(AsyncCallbackHandler):
 
     async def on_tool_end(self, output: str, **kwargs):
         """Called when a tool finishes executing"""
+        await self._tokens.flush()
         # Suppress raw tool outputs unless explicitly enabled
         if self.stream_tool_outputs:
             payload = {
@@ -121,12 +125,8 @@ class WebSocketManager:
 # Global WebSocket manager instance
 ws_manager = WebSocketManager()
 
-user_id_global = None
-business_id_global = None
-
 async def handle_chat_websocket(websocket: WebSocket, mongodb_agent):
     """Handle WebSocket chat connections with streaming"""
-    global user_id_global, business_id_global
     user_id = None
     try:
         await websocket.accept()
@@ -200,9 +200,8 @@ async def handle_chat_websocket(websocket: WebSocket, mongodb_agent):
                 if handshake_timer:
                     handshake_timer.cancel()
 
-                # Set globals for access in other files
-                user_id_global = user_context["user_id"]
-                business_id_global = user_context["businessId"]
+                # Scope this connection's task (and everything it spawns) to the member/business
+                set_request_context(user_context["user_id"], user_context["businessId"])
 
                 # Connect with the actual user_id (no placeholder "connecting" needed)
                 await ws_manager.connect(websocket, user_context["user_id"])
@@ -210,10 +209,15 @@ async def handle_chat_websocket(websocket: WebSocket, mongodb_agent):
                 # Mark as authenticated now that handshake is complete
                 authenticated = True
 
+                # Opt-in batching of token frames; echoed back so the client knows what applies
+                token_coalescing = negotiate_token_coalescing(data.get("token_coalescing"))
+                set_token_stream_options(websocket, token_coalescing)
+
                 await websocket.send_json({
                     "type": "handshake_ack",
                     "user_id": user_context["user_id"],
                     "business_id": user_context["businessId"],
+                    "token_coalescing": token_coalescing,
                     "timestamp": datetime.now().isoformat()
                 })
                 continue
@@ -231,14 +235,13 @@ async def handle_chat_websocket(websocket: WebSocket, mongodb_agent):
             user_id = data.get("member_id") or user_context["user_id"]
             business_id = data.get("business_id") or user_context["businessId"]
 
-            # Update global context if new values are provided
+            # Update the connection's request context if new values are provided
             if data.get("member_id") and user_id != user_context["user_id"]:
                 user_context["user_id"] = user_id
-                user_id_global = user_id
 
             if data.get("business_id") and business_id != user_context["businessId"]:
                 user_context["businessId"] = business_id
-                business_id_global = business_id
+            set_request_context(user_context["user_id"], user_context["businessId"])
 
             message = data.get("message", "")
             conversation_id = data.get("conversation_id") or f"conv_{user_id}"
@@ -251,10 +254,10 @@ async def handle_chat_websocket(websocket: WebSocket, mongodb_agent):
                 "timestamp": datetime.now().isoformat()
             })
 
-            # ✅ OPTIMIZED: Persist user message to ProjectManagement.conversations (fire-and-forget)
+            # ✅ OPTIMIZED: Persist user message to ProjectManagement.conversations (write-behind buffer)
             try:
-                # Fire-and-forget: don't block request processing
-                asyncio.create_task(save_user_message(conversation_id, message))
+                # Only buffers the message; the Mongo write happens on the next flush
+                await save_user_message(conversation_id, message)
             except Exception as e:
                 # Non-fatal: log error, continue processing
                 logger.error(f"Failed to save user message: {e}")
@@ -316,7 +319,9 @@ async def handle_chat_websocket(websocket: WebSocket, mongodb_agent):
                         async for _ in mongodb_agent.run_streaming(
                             query=message,
                             websocket=websocket,
-                            conversation_id=conversation_id
+                            conversation_id=conversation_id,
+                            member_id=user_context["user_id"],
+                            business_id=user_context["businessId"],
                         ):
                             # The streaming is handled internally by the callback handler
                             # Just iterate through the generator to complete the streaming
@@ -332,6 +337,8 @@ async def handle_chat_websocket(websocket: WebSocket, mongodb_agent):
                 "conversation_id": conversation_id,
                 "timestamp": datetime.now().isoformat()
             })
+            # Turn is over: persist its buffered messages now rather than at the next interval
+            conversation_write_buffer.end_turn(conversation_id)
 
     except WebSocketDisconnect:
         # Cancel handshake timer if it exists